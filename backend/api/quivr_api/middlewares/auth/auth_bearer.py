@@ -1,10 +1,15 @@
 import os
+import time
 from typing import Optional
 
 import structlog
 from fastapi import Depends, HTTPException, Request
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
+from quivr_api.middlewares.auth.identity_cache import (
+    auth_latency,
+    get_identity_cache,
+)
 from quivr_api.middlewares.auth.jwt_token_handler import (
     decode_access_token,
     verify_token,
@@ -50,9 +55,21 @@ class AuthBearer(HTTPBearer):
         if os.environ.get("AUTHENTICATE") == "false":
             return self.get_test_user()
 
+        start = time.perf_counter()
+        source, identity = await self._resolve(token)
+        auth_latency.record(source, time.perf_counter() - start)
+        return identity
+
+    async def _resolve(self, token: str) -> tuple[str, UserIdentity]:
         # 1. Check if it's a standard JWT token (Supabase auth)
         if verify_token(token):
-            return decode_access_token(token)
+            return "jwt", decode_access_token(token)
+
+        # API keys and chat tokens without an email claim need the database
+        identity_cache = get_identity_cache()
+        cached = identity_cache.get(token)
+        if cached is not None:
+            return "cached", cached
 
         # 2. Check if it's a scoped chat token
         chat_payload = chat_token_service.verify_chat_token(token)
@@ -60,22 +77,31 @@ class AuthBearer(HTTPBearer):
             logger.info(
                 f"Chat token authenticated for brain {chat_payload.brain_id}, user_id={chat_payload.user_id}"
             )
+            identity = UserIdentity(
+                id=chat_payload.user_id,
+                email=chat_payload.email,
+                scoped_brain_id=chat_payload.brain_id,
+            )
+            if identity.email:
+                return "chat_token", identity
+
             # Fetch user email for usage tracking
             try:
-                user_email = await api_key_service.get_user_email_by_id(chat_payload.user_id)
+                identity.email = await api_key_service.get_user_email_by_id(
+                    chat_payload.user_id
+                )
             except Exception as e:
                 logger.error(f"Failed to fetch user email for user_id={chat_payload.user_id}: {e}")
-                user_email = None
+                return "chat_token", identity
 
-            return UserIdentity(
-                id=chat_payload.user_id,
-                email=user_email,
-                scoped_brain_id=chat_payload.brain_id,
-            )
+            identity_cache.set(token, identity, chat_payload.exp.timestamp())
+            return "chat_token", identity
 
         # 3. Check if it's an API key
         if await api_key_service.verify_api_key(token):
-            return await api_key_service.get_user_from_api_key(token)
+            identity = await api_key_service.get_user_from_api_key(token)
+            identity_cache.set(token, identity)
+            return "api_key", identity
 
         raise HTTPException(status_code=401, detail="Invalid token or api key.")
 
@@ -0,0 +1,143 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Dict, Set, Tuple
+from uuid import UUID
+
+from quivr_api.logger import get_logger
+from quivr_api.models.settings import AuthCacheSettings
+from quivr_api.modules.user.entity.user_identity import UserIdentity
+
+logger = get_logger(__name__)
+
+
+def _token_key(token: str) -> str:
+    # Tokens are secrets, only their digest is kept in memory
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+class IdentityCache:
+    """
+    Per-process cache of the identities resolved from API keys and chat tokens,
+    so repeated requests with the same token skip the database.
+
+    Entries live for `ttl_seconds`, or until the token expires if sooner. The
+    least recently used entries are dropped above `max_entries`. Deleting an API
+    key or a user calls `invalidate_user` in the process handling the deletion,
+    other processes see it once their entries expire.
+    """
+
+    def __init__(self, ttl_seconds: float = 60, max_entries: int = 10_000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, Tuple[UserIdentity, float]] = OrderedDict()
+        self._by_user: Dict[UUID, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> UserIdentity | None:
+        key = _token_key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            identity, expires_at = entry
+            if time.monotonic() >= expires_at:
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return identity
+
+    def set(
+        self, token: str, identity: UserIdentity, token_expires_at: float | None = None
+    ) -> None:
+        """`token_expires_at` is the token's own expiry, as a unix timestamp."""
+        ttl = self.ttl_seconds
+        if token_expires_at is not None:
+            ttl = min(ttl, token_expires_at - time.time())
+        if ttl <= 0:
+            return
+        key = _token_key(token)
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (identity, time.monotonic() + ttl)
+            self._by_user.setdefault(identity.id, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate_user(self, user_id: UUID | str) -> None:
+        with self._lock:
+            for key in list(self._by_user.get(UUID(str(user_id)), ())):
+                self._remove(key)
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        keys = self._by_user.get(entry[0].id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_user[entry[0].id]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class AuthLatencyStats:
+    """
+    Authentication latencies of the last `window` requests, per resolution path
+    (jwt, chat_token, api_key, cached). Percentiles are logged every `report_every`
+    authentications.
+    """
+
+    def __init__(self, window: int = 1000, report_every: int = 1000):
+        self.window = window
+        self.report_every = report_every
+        self._samples: Dict[str, Deque[float]] = {}
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def record(self, source: str, seconds: float) -> None:
+        with self._lock:
+            self._samples.setdefault(source, deque(maxlen=self.window)).append(
+                seconds
+            )
+            self._count += 1
+            report = self._count % self.report_every == 0
+        if report:
+            logger.info(f"Auth latency: {self}")
+
+    def percentiles(self) -> Dict[str, Dict[str, float]]:
+        """p50, p95 and p99 in milliseconds, per source."""
+        with self._lock:
+            samples = {source: sorted(s) for source, s in self._samples.items() if s}
+        return {
+            source: {
+                f"p{p}": values[min(len(values) - 1, len(values) * p // 100)] * 1000
+                for p in (50, 95, 99)
+            }
+            for source, values in samples.items()
+        }
+
+    def __str__(self) -> str:
+        return ", ".join(
+            f"{source} "
+            + " ".join(f"{name}={ms:.1f}ms" for name, ms in values.items())
+            for source, values in self.percentiles().items()
+        )
+
+
+_identity_cache: IdentityCache | None = None
+auth_latency = AuthLatencyStats()
+
+
+def get_identity_cache() -> IdentityCache:
+    global _identity_cache
+    if _identity_cache is None:
+        settings = AuthCacheSettings()
+        _identity_cache = IdentityCache(
+            ttl_seconds=settings.auth_cache_ttl_seconds,
+            max_entries=settings.auth_cache_max_entries,
+        )
+    return _identity_cache
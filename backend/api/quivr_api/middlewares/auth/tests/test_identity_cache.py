@@ -0,0 +1,112 @@
+import time
+from uuid import uuid4
+
+import pytest
+
+from quivr_api.middlewares.auth import auth_bearer
+from quivr_api.middlewares.auth.identity_cache import (
+    AuthLatencyStats,
+    IdentityCache,
+)
+from quivr_api.modules.chat_token.service.chat_token_service import chat_token_service
+from quivr_api.modules.user.entity.user_identity import UserIdentity
+
+
+class CountingApiKeyService:
+    def __init__(self, identity: UserIdentity):
+        self.identity = identity
+        self.lookups = 0
+
+    async def verify_api_key(self, api_key: str) -> bool:
+        self.lookups += 1
+        return api_key == "valid-key"
+
+    async def get_user_from_api_key(self, api_key: str) -> UserIdentity:
+        return self.identity
+
+    async def get_user_email_by_id(self, user_id) -> str:
+        self.lookups += 1
+        return self.identity.email  # type: ignore
+
+
+@pytest.fixture
+def identity():
+    return UserIdentity(id=uuid4(), email="teacher@example.com")
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = IdentityCache()
+    monkeypatch.setattr(auth_bearer, "get_identity_cache", lambda: cache)
+    return cache
+
+
+@pytest.fixture
+def api_key_service(monkeypatch, identity):
+    service = CountingApiKeyService(identity)
+    monkeypatch.setattr(auth_bearer, "api_key_service", service)
+    return service
+
+
+def test_identity_cache_expiry_and_bounds(identity):
+    cache = IdentityCache(ttl_seconds=60, max_entries=2)
+    cache.set("a", identity)
+    cache.set("b", identity)
+    assert cache.get("a") == identity
+    cache.set("c", identity)
+    # "b" was the least recently used
+    assert cache.get("b") is None
+    assert len(cache) == 2
+
+    # Expired tokens are never cached past their expiry
+    cache.set("d", identity, token_expires_at=time.time() - 1)
+    assert cache.get("d") is None
+
+    cache.invalidate_user(identity.id)
+    assert cache.get("a") is None and cache.get("c") is None
+
+
+@pytest.mark.asyncio
+async def test_api_key_resolved_once(cache, api_key_service, identity):
+    bearer = auth_bearer.AuthBearer()
+    for _ in range(3):
+        assert await bearer.authenticate("valid-key") == identity
+    assert api_key_service.lookups == 1
+
+    # Deleting the key drops it from the cache
+    cache.invalidate_user(identity.id)
+    await bearer.authenticate("valid-key")
+    assert api_key_service.lookups == 2
+
+
+@pytest.mark.asyncio
+async def test_chat_token_email_claim_skips_database(
+    cache, api_key_service, identity
+):
+    bearer = auth_bearer.AuthBearer()
+    brain_id = uuid4()
+    token = chat_token_service.create_chat_token(
+        identity.id, brain_id, email=identity.email
+    ).token
+    user = await bearer.authenticate(token)
+    assert (user.id, user.email, user.scoped_brain_id) == (
+        identity.id,
+        identity.email,
+        brain_id,
+    )
+    assert api_key_service.lookups == 0
+
+    # Tokens issued before the claim existed look the email up once
+    legacy = chat_token_service.create_chat_token(identity.id, brain_id).token
+    for _ in range(2):
+        assert (await bearer.authenticate(legacy)).email == identity.email
+    assert api_key_service.lookups == 1
+
+
+def test_auth_latency_percentiles():
+    stats = AuthLatencyStats(window=100)
+    for ms in range(1, 101):
+        stats.record("api_key", ms / 1000)
+    percentiles = stats.percentiles()["api_key"]
+    assert percentiles["p50"] == pytest.approx(51)
+    assert percentiles["p99"] == pytest.approx(100)
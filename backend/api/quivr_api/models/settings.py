@@ -117,6 +117,56 @@ class BrainSettings(BaseSettings):
     embedding_dim: int = 1536
 
 
+class EmbeddingSettings(BaseSettings):
+    model_config = SettingsConfigDict(validate_default=False)
+    embedding_batch_max_tokens: int = 100_000
+    embedding_batch_max_size: int = 512
+    embedding_max_concurrency: int = 4
+    embedding_max_retries: int = 5
+    embedding_coalesce_ms: int = 20
+    # memory | sqlite | postgres
+    embedding_cache_backend: str = "memory"
+    embedding_cache_max_entries: int = 50_000
+    embedding_cache_path: str = "/tmp/quivr_embedding_cache.sqlite"
+    # Query embeddings: per-process LRU, optionally backed by redis for all replicas
+    query_embedding_cache_backend: str = "memory"
+    query_embedding_cache_redis_url: str | None = None
+    query_embedding_cache_max_entries: int = 10_000
+    query_embedding_cache_ttl_seconds: int = 24 * 3600
+
+
+class AnswerCacheSettings(BaseSettings):
+    model_config = SettingsConfigDict(validate_default=False)
+    answer_cache_enabled: bool = False
+    answer_cache_similarity_threshold: float = 0.95
+    answer_cache_ttl_seconds: int = 24 * 3600
+    answer_cache_max_entries_per_brain: int = 500
+
+
+class SyncSchedulerSettings(BaseSettings):
+    model_config = SettingsConfigDict(validate_default=False)
+    # Maximum number of periodic syncs running at the same time across all workers
+    sync_max_running: int = 8
+    # A sync whose worker died is claimed again once its lease expires
+    sync_lease_seconds: int = 3600
+
+
+class AuthCacheSettings(BaseSettings):
+    model_config = SettingsConfigDict(validate_default=False)
+    # Per process: a deleted api key stays usable on other replicas for up to the TTL
+    auth_cache_ttl_seconds: int = 60
+    auth_cache_max_entries: int = 10_000
+    # Brain authorization decisions, per (user, brain)
+    brain_access_cache_ttl_seconds: int = 30
+    brain_access_cache_max_entries: int = 10_000
+
+
+class AnalyticsSettings(BaseSettings):
+    model_config = SettingsConfigDict(validate_default=False)
+    # Read usages from the brain_usage_daily rollup instead of counting chat_history
+    analytics_daily_rollup: bool = True
+
+
 class ResendSettings(BaseSettings):
     model_config = SettingsConfigDict(validate_default=False)
     resend_api_key: str = "null"
@@ -1,8 +1,8 @@
-from collections import defaultdict
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from typing import Optional
 from uuid import UUID
 
+from quivr_api.models.settings import AnalyticsSettings
 from quivr_api.modules.analytics.entity.analytics import BrainsUsages, Range, Usage
 from quivr_api.modules.brain.service.brain_user_service import BrainUserService
 from quivr_api.modules.dependencies import get_supabase_client
@@ -14,6 +14,7 @@ class Analytics:
     def __init__(self):
         supabase_client = get_supabase_client()
         self.db = supabase_client
+        self.settings = AnalyticsSettings()
 
     def get_brains_usages(
         self, user_id: UUID, graph_range: Range, brain_id: Optional[UUID] = None
@@ -22,35 +23,28 @@ class Analytics:
         if brain_id is not None:
             user_brains = [brain for brain in user_brains if brain.id == brain_id]
 
-        usage_per_day = defaultdict(int)
-
-        brain_ids = [brain.id for brain in user_brains]
-        chat_history = (
-            self.db.from_("chat_history")
-            .select("*")
-            .in_("brain_id", brain_ids)
-            .execute()
-        ).data
-
-        for chat in chat_history:
-            message_time = datetime.strptime(
-                chat["message_time"], "%Y-%m-%dT%H:%M:%S.%f"
-            )
-            usage_per_day[message_time.date()] += 1
-
-        start_date = datetime.now().date() - timedelta(days=graph_range)
-        all_dates = [start_date + timedelta(days=i) for i in range(graph_range)]
-
-        for date in all_dates:
-            usage_per_day[date] += 0
-
-        usages = sorted(
-            [
-                Usage(date=date, usage_count=count)
-                for date, count in usage_per_day.items()
-                if start_date <= date <= datetime.now().date()
-            ],
-            key=lambda usage: usage.date,
-        )
+        today = datetime.now().date()
+        start_date = today - timedelta(days=graph_range)
+        usage_per_day = {start_date + timedelta(days=i): 0 for i in range(graph_range)}
+
+        brain_ids = [str(brain.id) for brain in user_brains]
+        if brain_ids:
+            # Counted per day in the database, only the range is sent back
+            rows = self.db.rpc(
+                "get_brains_usages",
+                {
+                    "brain_ids": brain_ids,
+                    "start_date": start_date.isoformat(),
+                    "end_date": today.isoformat(),
+                    "use_rollup": self.settings.analytics_daily_rollup,
+                },
+            ).execute()
+            for row in rows.data:
+                usage_per_day[date.fromisoformat(row["day"])] = row["usage_count"]
+
+        usages = [
+            Usage(date=day, usage_count=count)
+            for day, count in sorted(usage_per_day.items())
+        ]
 
         return BrainsUsages(usages=usages)
@@ -0,0 +1,55 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from uuid import uuid4
+
+from quivr_api.models.settings import AnalyticsSettings
+from quivr_api.modules.analytics.entity.analytics import Range
+from quivr_api.modules.analytics.repository import analytics
+from quivr_api.modules.analytics.repository.analytics import Analytics
+
+
+class FakeRpc:
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+
+    def rpc(self, name, params):
+        self.calls.append((name, params))
+        return SimpleNamespace(execute=lambda: SimpleNamespace(data=self.rows))
+
+
+def test_brains_usages_counted_in_database(monkeypatch):
+    brains = [SimpleNamespace(id=uuid4()), SimpleNamespace(id=uuid4())]
+    monkeypatch.setattr(
+        analytics.brain_user_service, "get_user_brains", lambda user_id: brains
+    )
+    today = datetime.now().date()
+    yesterday = today - timedelta(days=1)
+    db = FakeRpc(
+        [
+            {"day": yesterday.isoformat(), "usage_count": 12},
+            {"day": today.isoformat(), "usage_count": 3},
+        ]
+    )
+    repository = Analytics.__new__(Analytics)
+    repository.db = db
+    repository.settings = AnalyticsSettings()
+
+    usages = repository.get_brains_usages(uuid4(), Range.WEEK).usages
+
+    [(name, params)] = db.calls
+    assert name == "get_brains_usages"
+    assert params["brain_ids"] == [str(brain.id) for brain in brains]
+    assert params["start_date"] == (today - timedelta(days=7)).isoformat()
+    assert params["end_date"] == today.isoformat()
+    # Days without messages are filled with zeros
+    assert [usage.date for usage in usages] == [
+        today - timedelta(days=7 - i) for i in range(8)
+    ]
+    assert [usage.usage_count for usage in usages[-2:]] == [12, 3]
+    assert sum(usage.usage_count for usage in usages) == 15
+
+    # Unknown brain: nothing to count
+    usages = repository.get_brains_usages(uuid4(), Range.WEEK, brain_id=uuid4()).usages
+    assert len(db.calls) == 1
+    assert len(usages) == 7
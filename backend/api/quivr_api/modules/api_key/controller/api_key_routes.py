@@ -6,6 +6,7 @@ from fastapi import APIRouter, Depends
 
 from quivr_api.logger import get_logger
 from quivr_api.middlewares.auth import AuthBearer, get_current_user
+from quivr_api.middlewares.auth.identity_cache import get_identity_cache
 from quivr_api.modules.api_key.dto.outputs import ApiKeyInfo
 from quivr_api.modules.api_key.entity.api_key import ApiKey
 from quivr_api.modules.api_key.repository.api_keys import ApiKeys
@@ -68,6 +69,7 @@ async def delete_api_key(
 
     """
     api_keys_repository.delete_api_key(key_id, current_user.id)
+    get_identity_cache().invalidate_user(current_user.id)
 
     return {"message": "API key deleted."}
 
@@ -113,6 +113,14 @@ class BrainUser(BaseModel):
     default_brain: bool = False
 
 
+class BrainAccess(BaseModel):
+    """What a user may do on a brain: its public status and the user's role."""
+
+    brain_id: UUID
+    is_public: bool = False
+    rights: Optional[RoleEnum] = None
+
+
 class MinimalUserBrainEntity(BaseModel):
     id: UUID
     name: str
@@ -1,7 +1,9 @@
+from typing import List
 from uuid import UUID
 
 from quivr_api.logger import get_logger
 from quivr_api.modules.brain.entity.brain_entity import (
+    BrainAccess,
     BrainUser,
     MinimalUserBrainEntity,
 )
@@ -208,3 +210,26 @@ class BrainsUsers(BrainsUsersInterface):
         self.db.table("brains_users").update({"rights": rights}).match(
             {"brain_id": brain_id, "user_id": user_id}
         ).execute()
+
+    def get_brains_access(
+        self, user_id: UUID, brain_ids: List[UUID]
+    ) -> dict[UUID, BrainAccess]:
+        response = (
+            self.db.table("brains")
+            .select("brain_id, status, brains_users(rights)")
+            .in_("brain_id", [str(brain_id) for brain_id in brain_ids])
+            .eq("brains_users.user_id", str(user_id))
+            .execute()
+        )
+        # Unknown brains get no access
+        accesses = {brain_id: BrainAccess(brain_id=brain_id) for brain_id in brain_ids}
+        for item in response.data:
+            brain_id = UUID(item["brain_id"])
+            accesses[brain_id] = BrainAccess(
+                brain_id=brain_id,
+                is_public=item["status"] == "public",
+                rights=(
+                    item["brains_users"][0]["rights"] if item["brains_users"] else None
+                ),
+            )
+        return accesses
@@ -3,6 +3,7 @@ from typing import List
 from uuid import UUID
 
 from quivr_api.modules.brain.entity.brain_entity import (
+    BrainAccess,
     BrainUser,
     MinimalUserBrainEntity,
 )
@@ -93,3 +94,12 @@ class BrainsUsersInterface(ABC):
         Update the rights for a user in a brain
         """
         pass
+
+    @abstractmethod
+    def get_brains_access(
+        self, user_id: UUID, brain_ids: List[UUID]
+    ) -> dict[UUID, BrainAccess]:
+        """
+        Get the public status of brains and the rights of a user on them, in one query
+        """
+        pass
@@ -0,0 +1,94 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Tuple
+from uuid import UUID
+
+from quivr_api.models.settings import AuthCacheSettings
+from quivr_api.modules.brain.entity.brain_entity import BrainAccess
+
+
+class BrainAccessCache:
+    """
+    Per-process cache of brain authorization decisions, keyed by (user_id, brain_id).
+
+    Decisions live `ttl_seconds`. Changes of rights, membership or status made by
+    this process invalidate them right away, other processes see the change once
+    their entries expire. Every invalidation bumps `generation`, so a decision read
+    from the database before it is never stored.
+    """
+
+    def __init__(self, ttl_seconds: float = 30, max_entries: int = 10_000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.generation = 0
+        self._entries: OrderedDict[Tuple[UUID, UUID], Tuple[BrainAccess, float]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def get_many(
+        self, user_id: UUID, brain_ids: Iterable[UUID]
+    ) -> Tuple[Dict[UUID, BrainAccess], List[UUID]]:
+        """The cached decisions, and the brains that must be looked up."""
+        found: Dict[UUID, BrainAccess] = {}
+        missing: List[UUID] = []
+        now = time.monotonic()
+        with self._lock:
+            for brain_id in brain_ids:
+                entry = self._entries.get((user_id, brain_id))
+                if entry is None or now >= entry[1]:
+                    missing.append(brain_id)
+                    continue
+                self._entries.move_to_end((user_id, brain_id))
+                found[brain_id] = entry[0]
+        return found, missing
+
+    def set_many(
+        self, user_id: UUID, accesses: Iterable[BrainAccess], generation: int
+    ) -> None:
+        if self.ttl_seconds <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            if generation != self.generation:
+                return
+            for access in accesses:
+                key = (user_id, access.brain_id)
+                self._entries[key] = (access, expires_at)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, brain_id: UUID | str, user_id: UUID | str | None = None):
+        """Drop the decisions of a brain, for one user or all of them."""
+        brain_id = UUID(str(brain_id))
+        user_id = UUID(str(user_id)) if user_id is not None else None
+        with self._lock:
+            self.generation += 1
+            if user_id is not None:
+                self._entries.pop((user_id, brain_id), None)
+                return
+            for key in [k for k in self._entries if k[1] == brain_id]:
+                del self._entries[key]
+
+    def invalidate_user(self, user_id: UUID | str) -> None:
+        user_id = UUID(str(user_id))
+        with self._lock:
+            self.generation += 1
+            for key in [k for k in self._entries if k[0] == user_id]:
+                del self._entries[key]
+
+
+_brain_access_cache: BrainAccessCache | None = None
+
+
+def get_brain_access_cache() -> BrainAccessCache:
+    global _brain_access_cache
+    if _brain_access_cache is None:
+        settings = AuthCacheSettings()
+        _brain_access_cache = BrainAccessCache(
+            ttl_seconds=settings.brain_access_cache_ttl_seconds,
+            max_entries=settings.brain_access_cache_max_entries,
+        )
+    return _brain_access_cache
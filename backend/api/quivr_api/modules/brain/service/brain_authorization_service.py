@@ -1,16 +1,15 @@
-from typing import List, Optional, Union
+from typing import Dict, List, Optional, Union
 from uuid import UUID
 
 from fastapi import Depends, HTTPException, status
 
 from quivr_api.middlewares.auth.auth_bearer import get_current_user
-from quivr_api.modules.brain.entity.brain_entity import RoleEnum
-from quivr_api.modules.brain.service.brain_service import BrainService
+from quivr_api.modules.brain.entity.brain_entity import BrainAccess, RoleEnum
+from quivr_api.modules.brain.service.brain_access_cache import get_brain_access_cache
 from quivr_api.modules.brain.service.brain_user_service import BrainUserService
 from quivr_api.modules.user.entity.user_identity import UserIdentity
 
 brain_user_service = BrainUserService()
-brain_service = BrainService()
 
 
 def has_brain_authorization(
@@ -35,22 +34,35 @@ def has_brain_authorization(
     return wrapper
 
 
-def validate_brain_authorization(
-    brain_id: UUID,
-    user_id: UUID,
+def get_brains_access(
+    user_id: UUID, brain_ids: List[UUID]
+) -> Dict[UUID, BrainAccess]:
+    """
+    Get the authorization decisions of a user on several brains, looking up the
+    ones that aren't cached in a single query.
+    """
+    brain_ids = [UUID(str(brain_id)) for brain_id in brain_ids]
+    cache = get_brain_access_cache()
+    accesses, missing = cache.get_many(user_id, brain_ids)
+    if missing:
+        generation = cache.generation
+        fetched = brain_user_service.get_brains_access(user_id, missing)
+        cache.set_many(user_id, fetched.values(), generation)
+        accesses.update(fetched)
+    return accesses
+
+
+def check_brain_access(
+    access: BrainAccess,
     required_roles: Optional[Union[RoleEnum, List[RoleEnum]]] = RoleEnum.Owner,
 ):
     """
-    Function to check if the user has the required role(s) for the brain
-    param: brain_id: The id of the brain
-    param: user_id: The id of the user
+    Raise if the decision doesn't grant one of the required role(s)
+    param: access: The authorization decision of the user on the brain
     param: required_roles: The role(s) required to access the brain
     return: None
     """
-
-    brain = brain_service.get_brain_details(brain_id, user_id)
-
-    if brain and brain.status == "public":
+    if access.is_public:
         return
 
     if required_roles is None:
@@ -59,8 +71,7 @@ def validate_brain_authorization(
             detail="Missing required role",
         )
 
-    user_brain = brain_user_service.get_brain_for_user(user_id, brain_id)
-    if user_brain is None:
+    if access.rights is None:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You don't have permission for this brain",
@@ -71,8 +82,25 @@ def validate_brain_authorization(
         required_roles = [required_roles]
 
     # Check if the user has at least one of the required roles
-    if user_brain.rights not in required_roles:
+    if access.rights not in required_roles:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You don't have the required role(s) for this brain",
         )
+
+
+def validate_brain_authorization(
+    brain_id: UUID,
+    user_id: UUID,
+    required_roles: Optional[Union[RoleEnum, List[RoleEnum]]] = RoleEnum.Owner,
+):
+    """
+    Function to check if the user has the required role(s) for the brain
+    param: brain_id: The id of the brain
+    param: user_id: The id of the user
+    param: required_roles: The role(s) required to access the brain
+    return: None
+    """
+    brain_id = UUID(str(brain_id))
+    check_brain_access(get_brains_access(user_id, [brain_id])[brain_id], required_roles)
+
@@ -18,6 +18,7 @@ from quivr_api.modules.brain.repository import (
     IntegrationBrain,
     IntegrationDescription,
 )
+from quivr_api.modules.brain.service.brain_access_cache import get_brain_access_cache
 from quivr_api.modules.dependencies import get_service
 from quivr_api.modules.knowledge.service.knowledge_service import KnowledgeService
 from quivr_api.vectorstore.supabase import CustomSupabaseVectorStore
@@ -157,6 +158,7 @@ class BrainService:
         self.brain_vector.delete_brain_vector(str(brain_id))
         self.brain_user_repository.delete_brain_users(str(brain_id))
         self.brain_repository.delete_brain(str(brain_id))  # type: ignore
+        get_brain_access_cache().invalidate(brain_id)
 
         return {"message": "Brain deleted."}
 
@@ -198,10 +200,16 @@ class BrainService:
             )
 
         self.brain_repository.update_brain_last_update_time(brain_id)
+        # The status may have changed between public and private
+        get_brain_access_cache().invalidate(brain_id)
         return brain_update_answer
 
     def update_brain_last_update_time(self, brain_id: UUID):
         self.brain_repository.update_brain_last_update_time(brain_id)
+        # The brain content changed, its cached answers may be wrong now
+        from quivr_api.modules.rag_service.answer_cache import invalidate_brain_answers
+
+        invalidate_brain_answers(brain_id)
 
     def get_brain_details(
         self, brain_id: UUID, user_id: UUID | None = None
@@ -5,6 +5,7 @@ from fastapi import HTTPException
 
 from quivr_api.logger import get_logger
 from quivr_api.modules.brain.entity.brain_entity import (
+    BrainAccess,
     BrainEntity,
     BrainUser,
     MinimalUserBrainEntity,
@@ -18,6 +19,7 @@ from quivr_api.modules.brain.repository.interfaces.brains_interface import (
 from quivr_api.modules.brain.repository.interfaces.brains_users_interface import (
     BrainsUsersInterface,
 )
+from quivr_api.modules.brain.service.brain_access_cache import get_brain_access_cache
 from quivr_api.modules.brain.service.brain_service import BrainService
 
 logger = get_logger(__name__)
@@ -50,11 +52,13 @@ class BrainUserService:
             user_id=user_id,
             brain_id=brain_id,
         )
+        get_brain_access_cache().invalidate(brain_id, user_id)
 
     def delete_brain_users(self, brain_id: UUID) -> None:
         self.brain_user_repository.delete_brain_subscribers(
             brain_id=brain_id,
         )
+        get_brain_access_cache().invalidate(brain_id)
 
     def create_brain_user(
         self, user_id: UUID, brain_id: UUID, rights: RoleEnum, is_default_brain: bool
@@ -65,10 +69,16 @@ class BrainUserService:
             rights=rights,
             default_brain=is_default_brain,
         )
+        get_brain_access_cache().invalidate(brain_id, user_id)
 
     def get_brain_for_user(self, user_id: UUID, brain_id: UUID):
         return self.brain_user_repository.get_brain_for_user(user_id, brain_id)  # type: ignore
 
+    def get_brains_access(
+        self, user_id: UUID, brain_ids: List[UUID]
+    ) -> dict[UUID, BrainAccess]:
+        return self.brain_user_repository.get_brains_access(user_id, brain_ids)
+
     def get_user_brains(self, user_id: UUID) -> list[MinimalUserBrainEntity]:
         results = self.brain_user_repository.get_user_brains(user_id)  # type: ignore
 
@@ -85,3 +95,4 @@ class BrainUserService:
             user_id=user_id,
             rights=rights,
         )
+        get_brain_access_cache().invalidate(brain_id, user_id)
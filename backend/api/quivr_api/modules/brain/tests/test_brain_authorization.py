@@ -0,0 +1,85 @@
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+
+from quivr_api.modules.brain.entity.brain_entity import BrainAccess, RoleEnum
+from quivr_api.modules.brain.service import brain_authorization_service
+from quivr_api.modules.brain.service.brain_access_cache import BrainAccessCache
+from quivr_api.modules.brain.service.brain_authorization_service import (
+    get_brains_access,
+    validate_brain_authorization,
+)
+
+
+class FakeBrainUserService:
+    def __init__(self):
+        self.accesses: dict = {}
+        self.queries: list[list] = []
+
+    def get_brains_access(self, user_id, brain_ids):
+        self.queries.append(list(brain_ids))
+        return {
+            brain_id: self.accesses.get(brain_id, BrainAccess(brain_id=brain_id))
+            for brain_id in brain_ids
+        }
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = BrainAccessCache()
+    monkeypatch.setattr(
+        brain_authorization_service, "get_brain_access_cache", lambda: cache
+    )
+    return cache
+
+
+@pytest.fixture
+def service(monkeypatch):
+    service = FakeBrainUserService()
+    monkeypatch.setattr(brain_authorization_service, "brain_user_service", service)
+    return service
+
+
+def test_decisions_cached_until_invalidated(cache, service):
+    user_id, brain_id = uuid4(), uuid4()
+    service.accesses[brain_id] = BrainAccess(brain_id=brain_id, rights=RoleEnum.Viewer)
+
+    for _ in range(3):
+        validate_brain_authorization(brain_id, user_id, RoleEnum.Viewer)
+    with pytest.raises(HTTPException) as e:
+        validate_brain_authorization(brain_id, user_id, RoleEnum.Owner)
+    assert e.value.status_code == 403
+    assert len(service.queries) == 1
+
+    # Rights changed
+    service.accesses[brain_id] = BrainAccess(brain_id=brain_id, rights=RoleEnum.Owner)
+    cache.invalidate(brain_id, user_id)
+    validate_brain_authorization(brain_id, user_id, RoleEnum.Owner)
+    assert len(service.queries) == 2
+
+
+def test_batched_check_in_one_query(cache, service):
+    user_id = uuid4()
+    owned, public, other = uuid4(), uuid4(), uuid4()
+    service.accesses[owned] = BrainAccess(brain_id=owned, rights=RoleEnum.Owner)
+    service.accesses[public] = BrainAccess(brain_id=public, is_public=True)
+
+    validate_brain_authorization(owned, user_id)
+    accesses = get_brains_access(user_id, [owned, public, other])
+    assert accesses == {
+        owned: service.accesses[owned],
+        public: service.accesses[public],
+        other: BrainAccess(brain_id=other),
+    }
+    # Only the brains that weren't cached are looked up
+    assert service.queries == [[owned], [public, other]]
+
+
+def test_stale_decision_not_stored(cache):
+    user_id, brain_id = uuid4(), uuid4()
+    generation = cache.generation
+    # Membership changed while the decision was being read
+    cache.invalidate(brain_id)
+    cache.set_many(user_id, [BrainAccess(brain_id=brain_id)], generation)
+    assert cache.get_many(user_id, [brain_id]) == ({}, [brain_id])
@@ -1,4 +1,5 @@
 import os
+from datetime import datetime
 from typing import Annotated, List, Optional
 from uuid import UUID
 
@@ -391,8 +392,28 @@ async def create_stream_question_handler(
 async def get_chat_history_handler(
     chat_id: UUID,
     chat_service: ChatServiceDep,
+    limit: Annotated[int | None, Query(ge=1, le=500)] = None,
+    before_time: Annotated[datetime | None, Query()] = None,
+    before_message_id: Annotated[UUID | None, Query()] = None,
 ) -> List[ChatItem]:
-    return await chat_service.get_chat_history_with_notifications(chat_id)
+    """
+    Chat history, oldest first. With `limit`, only the most recent messages are returned.
+    Older pages are fetched by passing the `message_time` and `message_id` of the
+    oldest message received as `before_time` and `before_message_id`.
+    """
+    if (before_time is None) != (before_message_id is None):
+        raise HTTPException(
+            status_code=422,
+            detail="before_time and before_message_id must be provided together",
+        )
+    before = (
+        (before_time, before_message_id)
+        if before_time and before_message_id
+        else None
+    )
+    return await chat_service.get_chat_history_with_notifications(
+        chat_id, limit=limit, before=before
+    )
 
 
 @chat_router.post(
@@ -1,10 +1,13 @@
-from typing import Sequence
+from datetime import datetime
+from typing import Sequence, Tuple
 from uuid import UUID
 
-from sqlalchemy import exc
+from sqlalchemy import exc, tuple_
+from sqlalchemy.orm import joinedload
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from quivr_api.modules.brain.entity.brain_entity import Brain
 from quivr_api.modules.chat.dto.inputs import ChatMessageProperties, QuestionAndAnswer
 from quivr_api.modules.chat.entity.chat import Chat, ChatHistory
 from quivr_api.modules.dependencies import BaseRepository, get_supabase_client
@@ -38,15 +41,51 @@ class ChatRepository(BaseRepository):
         response = await self.session.exec(query)
         return response.one()
 
-    async def get_chat_history(self, chat_id: UUID) -> Sequence[ChatHistory]:
+    async def get_chat_history(
+        self,
+        chat_id: UUID,
+        limit: int | None = None,
+        before: Tuple[datetime, UUID] | None = None,
+    ) -> Sequence[ChatHistory]:
+        """
+        Load the messages of a chat, oldest first, with their brain and brain prompt.
+
+        Args:
+            chat_id (UUID): The chat.
+            limit (int | None): Only return the `limit` most recent messages.
+            before (Tuple[datetime, UUID] | None): Keyset cursor, only return
+                messages older than this (message_time, message_id).
+
+        Returns:
+            Sequence[ChatHistory]: The messages in chronological order.
+        """
         query = (
             select(ChatHistory)
             .where(ChatHistory.chat_id == chat_id)
-            # TODO: type hints of sqlmodel arent stable for order_by
-            .order_by(ChatHistory.message_time)  # type: ignore
+            .options(joinedload(ChatHistory.brain).joinedload(Brain.prompt))  # type: ignore
         )
+        if before is not None:
+            query = query.where(
+                tuple_(ChatHistory.message_time, ChatHistory.message_id) < tuple_(*before)  # type: ignore
+            )
+        if limit is None:
+            # TODO: type hints of sqlmodel arent stable for order_by
+            query = query.order_by(ChatHistory.message_time)  # type: ignore
+            response = await self.session.exec(query)
+            return response.all()
+
+        # Window on the newest messages DB side, then restore chronological order
+        query = query.order_by(
+            ChatHistory.message_time.desc(),  # type: ignore
+            ChatHistory.message_id.desc(),  # type: ignore
+        ).limit(limit)
         response = await self.session.exec(query)
-        return response.all()
+        return list(reversed(response.all()))
+
+    async def has_chat_history(self, chat_id: UUID) -> bool:
+        query = select(ChatHistory.message_id).where(ChatHistory.chat_id == chat_id)
+        response = await self.session.exec(query.limit(1))
+        return response.first() is not None
 
     async def add_question_and_answer(
         self, chat_id: UUID, question_and_answer: QuestionAndAnswer
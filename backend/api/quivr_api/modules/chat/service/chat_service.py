@@ -1,5 +1,6 @@
 import random
-from typing import List
+from datetime import datetime
+from typing import List, Tuple
 from uuid import UUID
 
 from fastapi import HTTPException
@@ -82,20 +83,24 @@ class ChatService(BaseService[ChatRepository]):
         chat = await self.repository.get_chat_by_id(chat_id)
         return chat
 
-    async def get_chat_history(self, chat_id: UUID) -> List[GetChatHistoryOutput]:
-        history = await self.repository.get_chat_history(chat_id)
+    async def get_chat_history(
+        self,
+        chat_id: UUID,
+        limit: int | None = None,
+        before: Tuple[datetime, UUID] | None = None,
+    ) -> List[GetChatHistoryOutput]:
+        """
+        Chat messages with their brain name and prompt title, loaded in a single query.
+        `limit` keeps the most recent messages, `before` is a (message_time, message_id) keyset cursor.
+        """
+        history = await self.repository.get_chat_history(
+            chat_id, limit=limit, before=before
+        )
         enriched_history: List[GetChatHistoryOutput] = []
-        if len(history) == 0:
-            return enriched_history
         for message in history:
-            brain: Brain | None = (
-                await message.awaitable_attrs.brain if message.brain_id else None
-            )
-            prompt: Prompt | None = None
-            if brain:
-                prompt = (
-                    await brain.awaitable_attrs.prompt if message.prompt_id else None
-                )
+            # brain and its prompt are eagerly loaded by the repository
+            brain: Brain | None = message.brain if message.brain_id else None
+            prompt: Prompt | None = brain.prompt if brain and message.prompt_id else None
             enriched_history.append(
                 # TODO : WHY bother with having ids here ??
                 GetChatHistoryOutput(
@@ -113,11 +118,17 @@ class ChatService(BaseService[ChatRepository]):
             )
         return enriched_history
 
+    async def has_chat_history(self, chat_id: UUID) -> bool:
+        """Whether the chat has any message, whatever the history window."""
+        return await self.repository.has_chat_history(chat_id)
+
     async def get_chat_history_with_notifications(
         self,
         chat_id: UUID,
+        limit: int | None = None,
+        before: Tuple[datetime, UUID] | None = None,
     ) -> List[ChatItem]:
-        chat_history = await self.get_chat_history(chat_id)
+        chat_history = await self.get_chat_history(chat_id, limit=limit, before=before)
         chat_notifications = []
         return merge_chat_history_and_notifications(chat_history, chat_notifications)
 
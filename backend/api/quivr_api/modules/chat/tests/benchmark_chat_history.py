@@ -0,0 +1,92 @@
+"""
+Benchmark ChatService.get_chat_history latency against the number of messages.
+
+Fills a throwaway chat in the local Supabase Postgres and times the full
+history load (UI), the windowed load used by the RAG pipeline and the number
+of statements each one issues. Everything is rolled back at the end.
+
+    python -m quivr_api.modules.chat.tests.benchmark_chat_history --sizes 10 200 2000
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from functools import partial
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import select, text
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from quivr_api.models.settings import settings
+from quivr_api.modules.brain.entity.brain_entity import Brain, BrainType
+from quivr_api.modules.chat.entity.chat import Chat
+from quivr_api.modules.chat.repository.chats import ChatRepository
+from quivr_api.modules.chat.service.chat_service import ChatService
+from quivr_api.modules.user.entity.user_identity import User
+
+FILL_QUERY = text("""
+    INSERT INTO chat_history (chat_id, user_message, assistant, brain_id, message_time)
+    SELECT :chat_id, 'question ' || i, 'answer ' || i, :brain_id,
+           now() - make_interval(secs => :n - i)
+    FROM generate_series(1, :n) AS i
+""")
+
+
+async def _time_ms(fn, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+async def benchmark(size: int, window: int, runs: int) -> None:
+    engine = create_async_engine(settings.pg_database_async_url)
+    statements = []
+    event.listen(
+        engine.sync_engine,
+        "before_cursor_execute",
+        lambda *args, **kwargs: statements.append(args),
+    )
+    async with engine.connect() as conn:
+        trans = await conn.begin()
+        session = AsyncSession(conn, expire_on_commit=False)
+        user = (
+            await session.exec(select(User).where(User.email == "admin@quivr.app"))
+        ).one()
+        brain = Brain(name="benchmark", brain_type=BrainType.integration)
+        chat = Chat(chat_name="benchmark", user_id=user.id)
+        session.add(brain)
+        session.add(chat)
+        await session.flush()
+        await session.execute(
+            FILL_QUERY, {"chat_id": chat.chat_id, "brain_id": brain.brain_id, "n": size}
+        )
+
+        service = ChatService(ChatRepository(session))
+        for label, kwargs in (("full", {}), (f"last {window}", {"limit": window})):
+            statements.clear()
+            await service.get_chat_history(chat.chat_id, **kwargs)  # type: ignore
+            n_statements = len(statements)
+            load = partial(service.get_chat_history, chat.chat_id, **kwargs)
+            latency = await _time_ms(load, runs)
+            print(
+                f"{size} messages, {label}: {latency:.1f} ms, "
+                f"{n_statements} statement(s) (median of {runs})"
+            )
+        await session.close()
+        await trans.rollback()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 200, 2000])
+    parser.add_argument("--window", type=int, default=10)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    for size in args.sizes:
+        asyncio.run(benchmark(size, args.window, args.runs))
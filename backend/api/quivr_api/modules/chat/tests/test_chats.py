@@ -9,6 +9,7 @@ from quivr_api.modules.chat.entity.chat import Chat, ChatHistory
 from quivr_api.modules.chat.repository.chats import ChatRepository
 from quivr_api.modules.chat.service.chat_service import ChatService
 from quivr_api.modules.user.entity.user_identity import User
+from sqlalchemy import event
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
@@ -135,3 +136,62 @@ async def test_service_get_chat_history(session: AsyncSession, test_data: TestDa
     assert all(h.chat_id == chat.chat_id for h in history)
     assert history[0].brain_name == brain.name
     assert history[0].brain_id == brain.brain_id
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_get_chat_history_window_and_keyset(
+    session: AsyncSession, test_data: TestData
+):
+    brain, _, [_, chat, *_], __ = test_data
+    assert chat.chat_id
+    repo = ChatRepository(session)
+    for idx in range(5):
+        await repo.add_question_and_answer(
+            chat.chat_id, QuestionAndAnswer(question=f"q{idx}", answer=f"a{idx}")
+        )
+    full_history = await repo.get_chat_history(chat.chat_id)
+    keyset = sorted(full_history, key=lambda m: (m.message_time, m.message_id))
+
+    window = await repo.get_chat_history(chat.chat_id, limit=2)
+    assert [m.message_id for m in window] == [m.message_id for m in keyset[-2:]]
+
+    oldest = window[0]
+    assert oldest.message_time and oldest.message_id
+    page = await repo.get_chat_history(
+        chat.chat_id, limit=2, before=(oldest.message_time, oldest.message_id)
+    )
+    assert [m.message_id for m in page] == [m.message_id for m in keyset[-4:-2]]
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_has_chat_history(session: AsyncSession, test_data: TestData):
+    _, _, [chat_1, chat_2], __ = test_data
+    assert chat_1.chat_id and chat_2.chat_id
+    repo = ChatRepository(session)
+    assert await repo.has_chat_history(chat_1.chat_id)
+    assert not await repo.has_chat_history(chat_2.chat_id)
+    # An empty history window doesn't make a follow-up a first turn
+    assert await repo.get_chat_history(chat_1.chat_id, limit=0) == []
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_service_get_chat_history_single_query(
+    session: AsyncSession, test_data: TestData
+):
+    brain, _, [chat, *_], __ = test_data
+    assert chat.chat_id
+    service = ChatService(ChatRepository(session))
+    statements = []
+
+    def count(*args, **kwargs):
+        statements.append(args)
+
+    sync_engine = session.bind.sync_engine  # type: ignore
+    event.listen(sync_engine, "before_cursor_execute", count)
+    try:
+        history = await service.get_chat_history(chat.chat_id)
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", count)
+
+    assert len(statements) == 1
+    assert all(h.brain_name == brain.name for h in history)
@@ -64,4 +64,5 @@ async def create_chat_token(
         user_id=current_user.id,
         brain_id=request.brain_id,
         ttl_minutes=ttl_minutes,
+        email=current_user.email,
     )
@@ -24,6 +24,7 @@ class ChatTokenPayload(BaseModel):
     brain_id: UUID
     token_type: str = "chat_token"
     exp: datetime
+    email: Optional[str] = None
 
     @property
     def is_expired(self) -> bool:
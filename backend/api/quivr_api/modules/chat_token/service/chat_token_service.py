@@ -26,6 +26,7 @@ class ChatTokenService:
         user_id: UUID,
         brain_id: UUID,
         ttl_minutes: int = 10,
+        email: Optional[str] = None,
     ) -> ChatTokenResponse:
         """
         Create a scoped chat token for a specific brain.
@@ -34,6 +35,8 @@ class ChatTokenService:
             user_id: The user ID requesting the token
             brain_id: The brain ID this token is scoped to
             ttl_minutes: Token validity in minutes (default: 10)
+            email: The user's email, carried in the token so that requests
+                authenticated with it don't look it up
 
         Returns:
             ChatTokenResponse with token, brain_id, and expiry
@@ -47,6 +50,8 @@ class ChatTokenService:
             "exp": expires_at,
             "iat": datetime.utcnow(),
         }
+        if email:
+            payload["email"] = email
 
         token = jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
 
@@ -88,6 +93,7 @@ class ChatTokenService:
                 brain_id=UUID(payload["brain_id"]),
                 token_type=payload["token_type"],
                 exp=datetime.fromtimestamp(payload["exp"]),
+                email=payload.get("email"),
             )
 
         except JWTError as e:
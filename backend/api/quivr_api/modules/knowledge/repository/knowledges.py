@@ -5,7 +5,7 @@ from fastapi import HTTPException
 from quivr_core.models import KnowledgeStatus
 from sqlalchemy.exc import IntegrityError, NoResultFound
 from sqlalchemy.orm import joinedload
-from sqlmodel import select, text
+from sqlmodel import select, text, update
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from quivr_api.logger import get_logger
@@ -21,6 +21,7 @@ from quivr_api.modules.knowledge.service.knowledge_exceptions import (
     KnowledgeNotFoundException,
     KnowledgeUpdateError,
 )
+from quivr_api.modules.upload.service.storage_index import get_storage_index
 
 logger = get_logger(__name__)
 
@@ -218,6 +219,28 @@ class KnowledgeRepository(BaseRepository):
 
         return knowledge_list
 
+    async def get_knowledges_by_ids(
+        self, knowledge_ids: Sequence[UUID]
+    ) -> list[KnowledgeDB]:
+        """
+        Load several knowledges with their brains in a single query.
+
+        Args:
+            knowledge_ids (Sequence[UUID]): The knowledge ids, unknown ids are skipped.
+
+        Returns:
+            list[KnowledgeDB]: The knowledges found, with `brains` loaded.
+        """
+        if not knowledge_ids:
+            return []
+        query = (
+            select(KnowledgeDB)
+            .where(KnowledgeDB.id.in_(knowledge_ids))  # type: ignore
+            .options(joinedload(KnowledgeDB.brains))  # type: ignore
+        )
+        result = await self.session.exec(query)
+        return list(result.unique().all())
+
     async def get_root_knowledge_user(self, user_id: UUID) -> list[KnowledgeDB]:
         query = (
             select(KnowledgeDB)
@@ -277,6 +300,7 @@ class KnowledgeRepository(BaseRepository):
         if knowledge_to_delete_list:
             # FIXME: Can we bypass db ? @Amine
             self.db.storage.from_("quivr").remove(knowledge_to_delete_list)
+            get_storage_index().remove_storage_paths(knowledge_to_delete_list)
 
         for item in all_knowledge:
             await self.session.delete(item)
@@ -303,6 +327,23 @@ class KnowledgeRepository(BaseRepository):
             await self.session.rollback()
             raise NoResultFound("Knowledge not found")
 
+    async def update_status_knowledges(
+        self, knowledge_ids: Sequence[UUID], status: KnowledgeStatus
+    ) -> None:
+        """Set the status of several knowledges in a single statement."""
+        if not knowledge_ids:
+            return
+        try:
+            await self.session.exec(
+                update(KnowledgeDB)  # type: ignore
+                .where(KnowledgeDB.id.in_(knowledge_ids))  # type: ignore
+                .values(status=status)
+            )
+            await self.session.commit()
+        except Exception:
+            await self.session.rollback()
+            raise
+
     async def update_source_link_knowledge(
         self, knowledge_id: UUID, source_link: str
     ) -> KnowledgeDB:
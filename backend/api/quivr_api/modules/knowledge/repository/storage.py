@@ -5,6 +5,7 @@ from quivr_api.logger import get_logger
 from quivr_api.modules.dependencies import get_supabase_async_client
 from quivr_api.modules.knowledge.entity.knowledge import KnowledgeDB
 from quivr_api.modules.knowledge.repository.storage_interface import StorageInterface
+from quivr_api.modules.upload.service.storage_index import get_storage_index
 
 logger = get_logger(__name__)
 
@@ -82,6 +83,7 @@ class SupabaseS3Storage(StorageInterface):
         assert self.client
         try:
             response = await self.client.storage.from_("quivr").remove([storage_path])
+            get_storage_index().remove_storage_paths([storage_path])
             return response
         except Exception as e:
             logger.error(e)
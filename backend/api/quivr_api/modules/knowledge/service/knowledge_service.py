@@ -33,7 +33,10 @@ from quivr_api.modules.sync.entity.sync_models import (
     DownloadedSyncFile,
     SyncFile,
 )
-from quivr_api.modules.upload.service.upload_file import check_file_exists
+from quivr_api.modules.upload.service.upload_file import (
+    check_file_exists,
+    check_files_exist,
+)
 
 logger = get_logger(__name__)
 
@@ -97,6 +100,36 @@ class KnowledgeService(BaseService[KnowledgeRepository]):
         except NoResultFound:
             return None
 
+    async def get_knowledge_storage_paths_by_ids(
+        self, knowledge_ids: list[UUID]
+    ) -> dict[UUID, tuple[str, str]]:
+        """
+        Batched `get_knowledge_storage_path_by_id`: one query for all the knowledges.
+        Returns a mapping of knowledge id to (storage_path, file_name), unknown ids are left out.
+        """
+        knowledges = [
+            km
+            for km in await self.repository.get_knowledges_by_ids(knowledge_ids)
+            if km.id and km.file_name and km.brains
+        ]
+        # One index query for all the files, off the event loop
+        existing = await asyncio.to_thread(
+            check_files_exist,
+            [(str(b.brain_id), km.file_name) for km in knowledges for b in km.brains],
+        )
+        paths: dict[UUID, tuple[str, str]] = {}
+        for km in knowledges:
+            brain_id = next(
+                (
+                    b.brain_id
+                    for b in km.brains
+                    if (str(b.brain_id), km.file_name) in existing
+                ),
+                km.brains[0].brain_id,
+            )
+            paths[km.id] = (f"{brain_id}/{km.file_name}", km.file_name)
+        return paths
+
     async def list_knowledge(
         self, knowledge_id: UUID | None, user_id: UUID | None = None
     ) -> list[KnowledgeDB]:
@@ -261,6 +294,11 @@ class KnowledgeService(BaseService[KnowledgeRepository]):
 
         return knowledge
 
+    async def update_status_knowledges(
+        self, knowledge_ids: list[UUID], status: KnowledgeStatus
+    ):
+        await self.repository.update_status_knowledges(knowledge_ids, status)
+
     async def update_file_sha1_knowledge(self, knowledge_id: UUID, file_sha1: str):
         return await self.repository.update_file_sha1_knowledge(knowledge_id, file_sha1)
 
@@ -199,6 +199,19 @@ async def test_updates_knowledge_status(session: AsyncSession, test_data: TestDa
     assert knowledge.status == KnowledgeStatus.ERROR
 
 
+@pytest.mark.asyncio(loop_scope="session")
+async def test_updates_knowledges_status_bulk(
+    session: AsyncSession, test_data: TestData
+):
+    _, knowledges = test_data
+    knowledge_ids = [k.id for k in knowledges if k.id]
+    repo = KnowledgeRepository(session)
+    await repo.update_status_knowledges(knowledge_ids, KnowledgeStatus.UPLOADED)
+    for knowledge_id in knowledge_ids:
+        knowledge = await repo.get_knowledge_by_id(knowledge_id)
+        assert knowledge.status == KnowledgeStatus.UPLOADED
+
+
 @pytest.mark.asyncio(loop_scope="session")
 async def test_updates_knowledge_status_no_knowledge(
     session: AsyncSession, test_data: TestData
@@ -23,6 +23,24 @@ class Notifications(NotificationInterface):
         ).data
         return Notification(**response[0])
 
+    def add_notifications(self, notifications: list[CreateNotification]):
+        """
+        Add notifications in a single insert, returned in the same order
+        """
+        if not notifications:
+            return []
+        response = (
+            self.db.from_("notifications")
+            .insert(
+                [
+                    notification.model_dump(exclude_unset=True, exclude_none=True)
+                    for notification in notifications
+                ]
+            )
+            .execute()
+        ).data
+        return [Notification(**notification) for notification in response]
+
     def update_notification_by_id(
         self,
         notification_id,
@@ -46,6 +64,17 @@ class Notifications(NotificationInterface):
 
         return Notification(**response[0])
 
+    def update_notifications_by_ids(self, notification_ids, notification):
+        """Apply the same update to several notifications"""
+        if not notification_ids:
+            return
+        (
+            self.db.from_("notifications")
+            .update(notification.model_dump(exclude_unset=True))
+            .in_("id", [str(notification_id) for notification_id in notification_ids])
+            .execute()
+        )
+
     def remove_notification_by_id(self, notification_id):
         """
         Remove a notification by id
@@ -16,6 +16,15 @@ class NotificationInterface(ABC):
         """
         pass
 
+    @abstractmethod
+    def add_notifications(
+        self, notifications: list[CreateNotification]
+    ) -> list[Notification]:
+        """
+        Add notifications in a single insert, returned in the same order
+        """
+        pass
+
     @abstractmethod
     def update_notification_by_id(
         self, notification_id: UUID, notification: NotificationUpdatableProperties
@@ -23,6 +32,15 @@ class NotificationInterface(ABC):
         """Update a notification by id"""
         pass
 
+    @abstractmethod
+    def update_notifications_by_ids(
+        self,
+        notification_ids: list[UUID],
+        notification: NotificationUpdatableProperties,
+    ) -> None:
+        """Apply the same update to several notifications"""
+        pass
+
     @abstractmethod
     def remove_notification_by_id(self, notification_id: UUID):
         """
@@ -24,6 +24,12 @@ class NotificationService:
         """
         return self.repository.add_notification(notification)
 
+    def add_notifications(self, notifications: list[CreateNotification]):
+        """
+        Add notifications in a single insert
+        """
+        return self.repository.add_notifications(notifications)
+
     def update_notification_by_id(
         self, notification_id, notification: NotificationUpdatableProperties
     ):
@@ -35,6 +41,16 @@ class NotificationService:
                 notification_id, notification
             )
 
+    def update_notifications_by_ids(
+        self, notification_ids, notification: NotificationUpdatableProperties
+    ):
+        """
+        Apply the same update to several notifications
+        """
+        return self.repository.update_notifications_by_ids(
+            notification_ids, notification
+        )
+
     def remove_notification_by_id(self, notification_id):
         """
         Remove a notification
@@ -0,0 +1,103 @@
+import asyncio
+from collections import OrderedDict
+from uuid import UUID
+
+from quivr_api.logger import get_logger
+from quivr_api.modules.notification.dto.inputs import (
+    CreateNotification,
+    NotificationUpdatableProperties,
+)
+from quivr_api.modules.notification.entity.notification import Notification
+from quivr_api.modules.notification.service.notification_service import (
+    NotificationService,
+)
+
+logger = get_logger(__name__)
+
+
+class NotificationWriter:
+    """
+    Buffers notification creations and status transitions, and writes them in bulk.
+
+    Creations are inserted by batches of `max_batch_size`. Updates are kept per
+    notification, only the latest transition of a notification is written, and a
+    flush issues one update per distinct (status, description). Flushes are
+    serialized, so the transitions of a notification are written in order.
+    """
+
+    def __init__(
+        self,
+        notification_service: NotificationService,
+        max_batch_size: int = 100,
+        max_delay_seconds: float = 0.05,
+    ):
+        self.notification_service = notification_service
+        self.max_batch_size = max_batch_size
+        self.max_delay_seconds = max_delay_seconds
+        self._pending: OrderedDict[UUID, NotificationUpdatableProperties] = (
+            OrderedDict()
+        )
+        # Last state written, so repeating a transition doesn't issue a write
+        self._written: dict[UUID, NotificationUpdatableProperties] = {}
+
+    def add_notifications(
+        self, notifications: list[CreateNotification]
+    ) -> list[Notification]:
+        created = []
+        for start in range(0, len(notifications), self.max_batch_size):
+            created.extend(
+                self.notification_service.add_notifications(
+                    notifications[start : start + self.max_batch_size]
+                )
+            )
+        return created
+
+    async def update(
+        self,
+        notification_id: UUID | str | None,
+        properties: NotificationUpdatableProperties,
+        wait: bool = False,
+    ) -> None:
+        """
+        Buffer a transition. With `wait`, return once it is written: transitions
+        buffered by concurrent callers within `max_delay_seconds` share the write.
+        """
+        if notification_id is None:
+            return
+        notification_id = UUID(str(notification_id))
+        self._pending.pop(notification_id, None)
+        if self._written.get(notification_id) == properties:
+            return
+        self._pending[notification_id] = properties
+        if len(self._pending) >= self.max_batch_size:
+            await self.flush()
+        elif wait:
+            await asyncio.sleep(self.max_delay_seconds)
+            await self.flush()
+
+    async def flush(self) -> None:
+        # Writes don't yield to the event loop, so flushes never interleave
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, OrderedDict()
+        groups: dict[tuple, list[UUID]] = {}
+        for notification_id, properties in pending.items():
+            key = (properties.status, properties.description)
+            groups.setdefault(key, []).append(notification_id)
+        try:
+            for notification_ids in groups.values():
+                properties = pending[notification_ids[0]]
+                self.notification_service.update_notifications_by_ids(
+                    notification_ids, properties
+                )
+                for notification_id in notification_ids:
+                    self._written[notification_id] = properties
+                    del pending[notification_id]
+        except Exception:
+            # Transitions that weren't written are kept, unless a newer one was buffered
+            for notification_id, properties in self._pending.items():
+                pending.pop(notification_id, None)
+                pending[notification_id] = properties
+            self._pending = pending
+            raise
+        logger.debug(f"Flushed notification updates in {len(groups)} writes")
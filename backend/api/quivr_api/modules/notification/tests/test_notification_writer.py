@@ -0,0 +1,119 @@
+import asyncio
+from datetime import datetime
+from uuid import UUID, uuid4
+
+import pytest
+
+from quivr_api.modules.notification.dto.inputs import (
+    CreateNotification,
+    NotificationUpdatableProperties,
+)
+from quivr_api.modules.notification.entity.notification import (
+    Notification,
+    NotificationsStatusEnum,
+)
+from quivr_api.modules.notification.service.notification_writer import (
+    NotificationWriter,
+)
+
+DOWNLOADED = NotificationUpdatableProperties(
+    status=NotificationsStatusEnum.SUCCESS, description="File downloaded successfully"
+)
+FAILED = NotificationUpdatableProperties(
+    status=NotificationsStatusEnum.ERROR, description="Error downloading file"
+)
+
+
+class RecordingNotificationService:
+    def __init__(self):
+        self.inserts: list[int] = []
+        self.updates: list[tuple[list[UUID], NotificationUpdatableProperties]] = []
+
+    def add_notifications(self, notifications: list[CreateNotification]):
+        self.inserts.append(len(notifications))
+        return [
+            Notification(
+                id=uuid4(),
+                user_id=notification.user_id,
+                status=notification.status,
+                title=notification.title,
+                description=notification.description,
+                category=notification.category,
+                brain_id=notification.brain_id,
+                datetime=datetime.now(),
+            )
+            for notification in notifications
+        ]
+
+    def update_notifications_by_ids(self, notification_ids, notification):
+        self.updates.append((list(notification_ids), notification))
+
+
+@pytest.fixture
+def service():
+    return RecordingNotificationService()
+
+
+def test_add_notifications_in_batches(service):
+    writer = NotificationWriter(service, max_batch_size=200)  # type: ignore
+    user_id = uuid4()
+    created = writer.add_notifications(
+        [
+            CreateNotification(
+                user_id=user_id,
+                status=NotificationsStatusEnum.INFO,
+                title=f"file_{idx}",
+            )
+            for idx in range(500)
+        ]
+    )
+    assert service.inserts == [200, 200, 100]
+    assert [n.title for n in created] == [f"file_{idx}" for idx in range(500)]
+
+
+@pytest.mark.asyncio
+async def test_updates_grouped_and_ordered(service):
+    writer = NotificationWriter(service)  # type: ignore
+    ids = [uuid4() for _ in range(5)]
+    for notification_id in ids:
+        await writer.update(notification_id, DOWNLOADED)
+    # The latest transition of a notification wins
+    await writer.update(ids[2], FAILED)
+    await writer.flush()
+
+    assert service.updates == [
+        ([ids[0], ids[1], ids[3], ids[4]], DOWNLOADED),
+        ([ids[2]], FAILED),
+    ]
+
+    # Repeating a written transition is a no-op
+    await writer.update(ids[0], DOWNLOADED)
+    await writer.flush()
+    assert len(service.updates) == 2
+
+
+@pytest.mark.asyncio
+async def test_wait_coalesces_concurrent_updates(service):
+    writer = NotificationWriter(service, max_delay_seconds=0.01)  # type: ignore
+    ids = [uuid4() for _ in range(10)]
+
+    await asyncio.gather(*(writer.update(id, DOWNLOADED, wait=True) for id in ids))
+    assert service.updates == [(ids, DOWNLOADED)]
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_transitions(service):
+    writer = NotificationWriter(service)  # type: ignore
+    notification_id = uuid4()
+    await writer.update(notification_id, FAILED)
+
+    def fail(*args):
+        raise ConnectionError("supabase down")
+
+    service.update_notifications_by_ids = fail
+    with pytest.raises(ConnectionError):
+        await writer.flush()
+
+    del service.update_notifications_by_ids
+    await writer.flush()
+    assert service.updates == [([notification_id], FAILED)]
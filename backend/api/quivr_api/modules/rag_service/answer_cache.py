@@ -0,0 +1,180 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Tuple
+from uuid import UUID
+
+import numpy as np
+from quivr_core.models import RAGResponseMetadata
+
+from quivr_api.logger import get_logger
+from quivr_api.models.settings import AnswerCacheSettings
+
+logger = get_logger(__name__)
+
+# (brain_id, brain content version, model, prompt digest)
+AnswerCacheKey = Tuple[str, str, str, str]
+
+
+def answer_cache_key(
+    brain_id: UUID,
+    last_update: datetime | None,
+    model: str,
+    prompt: str | None,
+) -> AnswerCacheKey:
+    """
+    Answers are only shared within one version of a brain's content, for the
+    same model and instructions. `update_brain_last_update_time` bumps the
+    version whenever knowledge is added or removed.
+    """
+    prompt_digest = hashlib.sha256((prompt or "").encode("utf-8")).hexdigest()[:16]
+    version = last_update.isoformat() if last_update else ""
+    return (str(brain_id), version, model, prompt_digest)
+
+
+@dataclass
+class CachedAnswer:
+    embedding: np.ndarray
+    answer: str
+    metadata: RAGResponseMetadata
+    generation_seconds: float
+    created_at: float
+
+
+@dataclass
+class AnswerCacheStats:
+    hits: int = 0
+    misses: int = 0
+    saved_seconds: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.hits}/{self.hits + self.misses} hits ({self.hit_rate:.0%}), "
+            f"{self.saved_seconds:.1f}s of generation saved"
+        )
+
+
+def _normalize(embedding: List[float]) -> np.ndarray:
+    vector = np.asarray(embedding, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class SemanticAnswerCache:
+    """
+    Per-process cache of generated answers, matched on question similarity.
+
+    A question whose embedding has a cosine similarity of at least `threshold`
+    with a cached question of the same brain version, model and prompt gets the
+    cached answer and its source documents back, skipping rewrite, retrieval,
+    reranking and generation.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.95,
+        ttl_seconds: float = 24 * 3600,
+        max_entries_per_key: int = 500,
+        max_keys: int = 1000,
+    ):
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries_per_key = max_entries_per_key
+        self.max_keys = max_keys
+        self.stats = AnswerCacheStats()
+        self._entries: OrderedDict[AnswerCacheKey, List[CachedAnswer]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def lookup(
+        self, key: AnswerCacheKey, embedding: List[float]
+    ) -> Tuple[CachedAnswer, float] | None:
+        query = _normalize(embedding)
+        now = time.monotonic()
+        best: Tuple[CachedAnswer, float] | None = None
+        with self._lock:
+            entries = self._entries.get(key)
+            if entries:
+                entries[:] = [
+                    entry
+                    for entry in entries
+                    if now - entry.created_at <= self.ttl_seconds
+                ]
+                for entry in entries:
+                    similarity = float(np.dot(query, entry.embedding))
+                    if similarity >= self.threshold and (
+                        best is None or similarity > best[1]
+                    ):
+                        best = (entry, similarity)
+                self._entries.move_to_end(key)
+            if best is None:
+                self.stats.misses += 1
+            else:
+                self.stats.hits += 1
+                self.stats.saved_seconds += best[0].generation_seconds
+        return best
+
+    def store(
+        self,
+        key: AnswerCacheKey,
+        embedding: List[float],
+        answer: str,
+        metadata: RAGResponseMetadata,
+        generation_seconds: float,
+    ) -> None:
+        entry = CachedAnswer(
+            embedding=_normalize(embedding),
+            answer=answer,
+            metadata=metadata,
+            generation_seconds=generation_seconds,
+            created_at=time.monotonic(),
+        )
+        with self._lock:
+            # Answers of older versions of the brain can never be served again
+            for stale in [k for k in self._entries if k[0] == key[0] and k != key]:
+                del self._entries[stale]
+            entries = self._entries.setdefault(key, [])
+            entries.append(entry)
+            del entries[: -self.max_entries_per_key]
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_keys:
+                self._entries.popitem(last=False)
+
+    def invalidate_brain(self, brain_id: UUID) -> None:
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == str(brain_id)]:
+                del self._entries[key]
+
+
+_answer_cache: SemanticAnswerCache | None = None
+_answer_cache_settings: AnswerCacheSettings | None = None
+
+
+def get_answer_cache() -> SemanticAnswerCache | None:
+    """The process-wide answer cache, None unless enabled with ANSWER_CACHE_ENABLED."""
+    global _answer_cache, _answer_cache_settings
+    if _answer_cache_settings is None:
+        _answer_cache_settings = AnswerCacheSettings()
+    if not _answer_cache_settings.answer_cache_enabled:
+        return None
+    if _answer_cache is None:
+        _answer_cache = SemanticAnswerCache(
+            threshold=_answer_cache_settings.answer_cache_similarity_threshold,
+            ttl_seconds=_answer_cache_settings.answer_cache_ttl_seconds,
+            max_entries_per_key=_answer_cache_settings.answer_cache_max_entries_per_brain,
+        )
+    return _answer_cache
+
+
+def invalidate_brain_answers(brain_id: UUID) -> None:
+    if _answer_cache is not None:
+        _answer_cache.invalidate_brain(brain_id)
@@ -1,12 +1,19 @@
+import asyncio
 import datetime
 import os
+import time
 from uuid import UUID, uuid4
 
 from quivr_core.brain import Brain as BrainCore
 from quivr_core.chat import ChatHistory as ChatHistoryCore
 from quivr_core.config import LLMEndpointConfig, RetrievalConfig
-from quivr_core.llm.llm_endpoint import LLMEndpoint
-from quivr_core.models import ChatLLMMetadata, ParsedRAGResponse, RAGResponseMetadata
+from quivr_core.llm import LLMEndpoint, get_llm_endpoint
+from quivr_core.models import (
+    ChatLLMMetadata,
+    ParsedRAGChunkResponse,
+    ParsedRAGResponse,
+    RAGResponseMetadata,
+)
 from quivr_core.quivr_rag_langgraph import QuivrQARAGLangGraph
 
 from quivr_api.logger import get_logger
@@ -27,10 +34,14 @@ from quivr_api.modules.models.service.model_service import ModelService
 from quivr_api.modules.prompt.entity.prompt import Prompt
 from quivr_api.modules.prompt.service.prompt_service import PromptService
 from quivr_api.modules.user.entity.user_identity import UserIdentity
+from quivr_api.modules.vector.service.embedding_cache import (
+    get_query_embedding_cache,
+)
 from quivr_api.modules.vector.service.vector_service import VectorService
 from quivr_api.utils.uuid_generator import generate_uuid_from_string
 from quivr_api.vectorstore.supabase import CustomSupabaseVectorStore
 
+from .answer_cache import CachedAnswer, answer_cache_key, get_answer_cache
 from .utils import generate_source
 
 logger = get_logger(__name__)
@@ -132,8 +143,9 @@ class RAGService:
         )
         return retrieval_config
 
-    def get_llm(self, retrieval_config: RetrievalConfig):
-        return LLMEndpoint.from_config(retrieval_config.llm_config)
+    def get_llm(self, retrieval_config: RetrievalConfig) -> LLMEndpoint:
+        # Endpoints (chat model, HTTP client, tokenizer) are shared across requests
+        return get_llm_endpoint(retrieval_config.llm_config)
 
     def create_vector_store(
         self, brain_id: UUID, max_input: int
@@ -152,6 +164,21 @@ class RAGService:
             vector_service=self.vector_service,
         )
 
+    @staticmethod
+    def _embed_question(embedder, question: str) -> list[float]:
+        # Shared with retrieval, so a question the rewrite leaves unchanged is embedded once
+        return get_query_embedding_cache(embedder).embed_query(question)
+
+    @staticmethod
+    async def _replay_cached_answer(cached: CachedAnswer):
+        yield ParsedRAGChunkResponse(
+            answer=cached.answer, metadata=RAGResponseMetadata()
+        )
+        # Same last chunk as the original answer, so its sources are rebuilt with fresh URLs
+        yield ParsedRAGChunkResponse(
+            answer="", metadata=cached.metadata.model_copy(), last_chunk=True
+        )
+
     def save_answer(self, question: str, answer: ParsedRAGResponse):
         metadata = answer.metadata.model_dump() if answer.metadata else {}
         metadata["snippet_color"] = self.brain.snippet_color if self.brain else None
@@ -180,7 +207,10 @@ class RAGService:
         )
         retrieval_config = await self._get_retrieval_config()
         logger.debug(f"generate_answer with config : {retrieval_config.model_dump()}")
-        history = await self.chat_service.get_chat_history(self.chat_id)
+        # Only the turns the pipeline can use are loaded
+        history = await self.chat_service.get_chat_history(
+            self.chat_id, limit=retrieval_config.max_history
+        )
         #  Format the history, sanitize the input
         chat_history = self._build_chat_history(history)
 
@@ -251,8 +281,10 @@ class RAGService:
         )
         # Build the rag config
         retrieval_config = await self._get_retrieval_config()
-        # Get chat history
-        history = await self.chat_service.get_chat_history(self.chat_id)
+        # Get chat history, only the turns the pipeline can use
+        history = await self.chat_service.get_chat_history(
+            self.chat_id, limit=retrieval_config.max_history
+        )
         #  Format the history, sanitize the input
         chat_history = self._build_chat_history(history)
 
@@ -311,13 +343,46 @@ class RAGService:
                 brain_name=self.model_to_use,
             )
 
-        async for response in brain_core.ask_streaming(
-            question=question,
-            retrieval_config=retrieval_config,
-            rag_pipeline=QuivrQARAGLangGraph,
-            chat_history=chat_history,
-            list_files=list_files,
+        # Opt-in semantic answer cache. Only standalone questions (first turn of a
+        # chat) are cached: without history the rewritten question is the question.
+        # `history` is windowed by max_history, it can be empty on a follow-up.
+        answer_cache = get_answer_cache()
+        cache_key, question_embedding, cached = None, None, None
+        lookup_start = time.perf_counter()
+        if (
+            answer_cache
+            and vector_store
+            and not history
+            and not await self.chat_service.has_chat_history(self.chat_id)
         ):
+            cache_key = answer_cache_key(
+                self.brain.brain_id,
+                self.brain.last_update,
+                retrieval_config.llm_config.model,
+                retrieval_config.prompt,
+            )
+            question_embedding = await asyncio.to_thread(
+                self._embed_question, vector_store.embeddings, question
+            )
+            cached = answer_cache.lookup(cache_key, question_embedding)
+            logger.info(
+                f"Answer cache {'hit' if cached else 'miss'} for brain {self.brain.brain_id} "
+                f"in {(time.perf_counter() - lookup_start) * 1000:.0f}ms ({answer_cache.stats})"
+            )
+
+        generation_start = time.perf_counter()
+        responses = (
+            self._replay_cached_answer(cached[0])
+            if cached
+            else brain_core.ask_streaming(
+                question=question,
+                retrieval_config=retrieval_config,
+                rag_pipeline=QuivrQARAGLangGraph,
+                chat_history=chat_history,
+                list_files=list_files,
+            )
+        )
+        async for response in responses:
             # Format output to be correct servicedf;j
             if not response.last_chunk:
                 streamed_chat_history = GetChatHistoryOutput(
@@ -374,6 +439,17 @@ class RAGService:
         if streamed_chat_history.metadata:
             streamed_chat_history.metadata["sources"] = sources_urls
 
+        # Empty answers (e.g. a failed generation) are not worth serving again
+        should_cache = cache_key and question_embedding and full_answer
+        if answer_cache and should_cache and not cached:
+            answer_cache.store(
+                cache_key,
+                question_embedding,
+                full_answer,
+                response.metadata,
+                generation_seconds=time.perf_counter() - generation_start,
+            )
+
         self.save_answer(
             question,
             ParsedRAGResponse(
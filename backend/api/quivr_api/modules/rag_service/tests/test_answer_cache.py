@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+from langchain_core.documents import Document
+from quivr_core.models import RAGResponseMetadata
+
+from quivr_api.modules.rag_service.answer_cache import (
+    SemanticAnswerCache,
+    answer_cache_key,
+)
+from quivr_api.modules.rag_service.rag_service import RAGService
+
+
+@pytest.fixture
+def metadata():
+    return RAGResponseMetadata(
+        citations=[0],
+        sources=[Document(page_content="exam on june 3rd", metadata={"file_name": "a"})],
+    )
+
+
+def test_answer_cache_hit_above_threshold(metadata):
+    cache = SemanticAnswerCache(threshold=0.95)
+    brain_id, updated_at = uuid4(), datetime.now()
+    key = answer_cache_key(brain_id, updated_at, "gpt-4o", None)
+    cache.store(key, [1.0, 0.0, 0.0], "June 3rd", metadata, generation_seconds=4.0)
+
+    hit = cache.lookup(key, [0.99, 0.05, 0.0])
+    assert hit is not None
+    assert hit[0].answer == "June 3rd"
+    assert hit[0].metadata.sources == metadata.sources
+
+    assert cache.lookup(key, [0.0, 1.0, 0.0]) is None
+    other_prompt = answer_cache_key(brain_id, updated_at, "gpt-4o", "be brief")
+    assert cache.lookup(other_prompt, [1.0, 0.0, 0.0]) is None
+
+    assert (cache.stats.hits, cache.stats.misses) == (1, 2)
+    assert cache.stats.saved_seconds == 4.0
+
+
+def test_answer_cache_invalidated_by_brain_update(metadata):
+    cache = SemanticAnswerCache()
+    brain_id, updated_at = uuid4(), datetime.now()
+    old_key = answer_cache_key(brain_id, updated_at, "gpt-4o", None)
+    cache.store(old_key, [1.0, 0.0], "old", metadata, generation_seconds=1.0)
+
+    # New content version: old answers are unreachable and dropped on next store
+    new_key = answer_cache_key(
+        brain_id, updated_at + timedelta(seconds=1), "gpt-4o", None
+    )
+    assert cache.lookup(new_key, [1.0, 0.0]) is None
+    cache.store(new_key, [1.0, 0.0], "new", metadata, generation_seconds=1.0)
+    assert cache.lookup(old_key, [1.0, 0.0]) is None
+
+    cache.invalidate_brain(brain_id)
+    assert cache.lookup(new_key, [1.0, 0.0]) is None
+
+
+def test_answer_cache_ttl(metadata):
+    cache = SemanticAnswerCache(ttl_seconds=0)
+    key = answer_cache_key(uuid4(), None, "gpt-4o", None)
+    cache.store(key, [1.0, 0.0], "answer", metadata, generation_seconds=1.0)
+    assert cache.lookup(key, [1.0, 0.0]) is None
+
+
+@pytest.mark.asyncio
+async def test_replay_cached_answer_streams_sources(metadata):
+    cache = SemanticAnswerCache()
+    key = answer_cache_key(uuid4(), None, "gpt-4o", None)
+    cache.store(key, [1.0], "June 3rd", metadata, generation_seconds=1.0)
+    cached, _ = cache.lookup(key, [1.0])  # type: ignore
+
+    chunks = [c async for c in RAGService._replay_cached_answer(cached)]
+    assert "".join(c.answer for c in chunks) == "June 3rd"
+    assert chunks[-1].last_chunk
+    assert chunks[-1].metadata.sources == metadata.sources
+    assert chunks[-1].metadata.citations == [0]
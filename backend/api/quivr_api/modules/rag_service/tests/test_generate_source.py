@@ -0,0 +1,96 @@
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from langchain_core.documents import Document
+
+from quivr_api.modules.rag_service.utils import generate_source
+from quivr_api.modules.upload.service import generate_file_signed_url as signing
+
+
+class FakeKnowledgeService:
+    def __init__(self, paths):
+        self.paths = paths
+        self.batched_calls = 0
+
+    async def get_knowledge_storage_paths_by_ids(self, knowledge_ids):
+        self.batched_calls += 1
+        return {kid: self.paths[kid] for kid in knowledge_ids if kid in self.paths}
+
+    async def get_knowledge_storage_path(self, file_name, brain_id):
+        return f"{brain_id}/{file_name}"
+
+
+class FakeBucket:
+    def __init__(self, missing=()):
+        self.missing = set(missing)
+        self.requests = []
+
+    def create_signed_urls(self, paths, expires_in, options):
+        self.requests.append(list(paths))
+        return [
+            {"path": path, "signedURL": None, "error": "Not found"}
+            if path in self.missing
+            else {"path": path, "signedURL": f"http://signed/{path}", "error": None}
+            for path in paths
+        ]
+
+
+@pytest.fixture
+def bucket(monkeypatch):
+    bucket = FakeBucket(missing={"brain/missing.pdf"})
+    client = SimpleNamespace(storage=SimpleNamespace(from_=lambda _: bucket))
+    monkeypatch.setattr(signing, "get_supabase_client", lambda: client)
+    signing.signed_url_cache.clear()
+    yield bucket
+    signing.signed_url_cache.clear()
+
+
+def _doc(file_name, knowledge_id=None, original_file_name=None):
+    return Document(
+        page_content=f"content of {file_name}",
+        metadata={
+            "file_name": file_name,
+            "knowledge_id": str(knowledge_id) if knowledge_id else None,
+            "original_file_name": original_file_name,
+            "integration": "",
+            "integration_link": "",
+        },
+    )
+
+
+@pytest.mark.asyncio
+async def test_generate_source_batches_paths_and_signing(bucket):
+    kids = [uuid4() for _ in range(20)]
+    service = FakeKnowledgeService(
+        {kid: (f"brain/file_{i}.pdf", f"file_{i}.pdf") for i, kid in enumerate(kids)}
+    )
+    docs = [_doc(f"chunk_{i}", kid) for i, kid in enumerate(kids)]
+    docs += [
+        _doc("web", original_file_name="https://quivr.app"),
+        _doc("missing.pdf"),
+        _doc("fallback.pdf"),
+    ]
+
+    sources = await generate_source(service, "brain", docs)
+
+    assert service.batched_calls == 1
+    assert len(bucket.requests) == 1
+    assert len(sources) == 22
+    assert sources[0].name == "file_0.pdf"
+    assert sources[0].source_url == "http://signed/brain/file_0.pdf"
+    assert sources[20].type == "url"
+    assert sources[21].source_url == "http://signed/brain/fallback.pdf"
+
+    # Second answer citing the same files is served from the signed URL cache
+    await generate_source(service, "brain", docs[:20], citations=[0, 1, 2])
+    assert len(bucket.requests) == 1
+
+
+def test_signed_url_cache_expires_before_urls():
+    cache = signing.SignedUrlCache(ttl_seconds=0)
+    cache.set_many({"brain/a.pdf": "http://signed/brain/a.pdf"})
+    assert cache.get_many(["brain/a.pdf"]) == {}
+    assert signing.SIGNED_URL_CACHE_TTL_IN_SECONDS < (
+        signing.SIGNED_URL_EXPIRATION_PERIOD_IN_SECONDS
+    )
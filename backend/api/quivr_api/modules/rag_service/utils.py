@@ -1,11 +1,12 @@
 import logging
+import time
 from typing import Any, List
 from uuid import UUID
 
 from quivr_api.modules.chat.dto.chats import Sources
 from quivr_api.modules.knowledge.service.knowledge_service import KnowledgeService
 from quivr_api.modules.upload.service.generate_file_signed_url import (
-    generate_file_signed_url,
+    generate_file_signed_urls,
 )
 
 logger = logging.getLogger(__name__)
@@ -31,102 +32,107 @@ async def generate_source(
     """
     Generate the sources list for the answer
     It takes in a list of sources documents and citations that points to the docs index that was used in the answer
+
+    Storage paths of all the cited knowledges are loaded in one query and their
+    URLs are signed in one storage request (or served from the signed URL cache).
     """
     # Initialize an empty list for sources
     sources_list: List[Sources] = []
 
-    # Initialize a dictionary for storing generated URLs
-    generated_urls = {}
-
-    # remove duplicate sources with same name and create a list of unique sources
-    sources_url_cache = {}
-
-    # Get source documents from the result, default to an empty list if not found
-    # If source documents exist
-    if source_documents:
-        logger.debug(f"Citations {citations}")
-        for index, doc in enumerate(source_documents):
-            logger.debug(f"Processing source document {doc.metadata['file_name']}")
-            if citations is not None:
-                if index not in citations:
-                    logger.debug(
-                        f"Skipping source document {doc.metadata['file_name']}"
-                    )
-                    continue
-            # Check if 'url' is in the document metadata
-            is_url = (
-                "original_file_name" in doc.metadata
-                and doc.metadata["original_file_name"] is not None
-                and doc.metadata["original_file_name"].startswith("http")
+    if not source_documents:
+        logger.debug("No source documents found or source_documents is not a list.")
+        return sources_list
+
+    start = time.perf_counter()
+    logger.debug(f"Citations {citations}")
+    documents = []
+    for index, doc in enumerate(source_documents):
+        logger.debug(f"Processing source document {doc.metadata['file_name']}")
+        if citations is not None and index not in citations:
+            logger.debug(f"Skipping source document {doc.metadata['file_name']}")
+            continue
+        documents.append(doc)
+
+    def _is_url(doc: Any) -> bool:
+        return (
+            "original_file_name" in doc.metadata
+            and doc.metadata["original_file_name"] is not None
+            and doc.metadata["original_file_name"].startswith("http")
+        )
+
+    # First try to use knowledge_id if available (more reliable), for all files at once
+    knowledge_ids = list(
+        {
+            knowledge_id
+            for doc in documents
+            if not _is_url(doc)
+            and (knowledge_id := _parse_uuid(doc.metadata.get("knowledge_id")))
+        }
+    )
+    knowledge_paths = {}
+    if knowledge_ids:
+        try:
+            knowledge_paths = await knowledge_service.get_knowledge_storage_paths_by_ids(
+                knowledge_ids
             )
-
-            # Determine the name based on whether it's a URL or a file
-            name = (
-                doc.metadata["original_file_name"]
-                if is_url
-                else doc.metadata["file_name"]
+        except Exception as e:
+            logger.error(f"Error loading knowledge storage paths: {e}")
+
+    # (storage path, display name) of every file document, None if it can't be resolved
+    file_paths: dict[int, tuple[str, str] | None] = {}
+    for position, doc in enumerate(documents):
+        if _is_url(doc):
+            continue
+        knowledge_id = _parse_uuid(doc.metadata.get("knowledge_id"))
+        if knowledge_id in knowledge_paths:
+            file_paths[position] = knowledge_paths[knowledge_id]
+            continue
+        # Fall back to file_name lookup if knowledge_id didn't work
+        try:
+            file_name = doc.metadata["file_name"]
+            file_path = await knowledge_service.get_knowledge_storage_path(
+                file_name=file_name, brain_id=brain_id
             )
-
-            # Determine the type based on whether it's a URL or a file
-            type_ = "url" if is_url else "file"
-
-            # Determine the source URL based on whether it's a URL or a file
-            if is_url:
-                source_url = doc.metadata["original_file_name"]
-            else:
-                # Check if the URL has already been generated
-                try:
-                    file_path = None
-                    actual_file_name = doc.metadata.get("file_name", "")
-
-                    # First try to use knowledge_id if available (more reliable)
-                    knowledge_id = _parse_uuid(doc.metadata.get("knowledge_id"))
-                    if knowledge_id:
-                        result = await knowledge_service.get_knowledge_storage_path_by_id(
-                            knowledge_id
-                        )
-                        if result:
-                            file_path, actual_file_name = result
-                            # Update name to use the actual file name from knowledge
-                            name = actual_file_name
-
-                    # Fall back to file_name lookup if knowledge_id didn't work
-                    if not file_path:
-                        file_name = doc.metadata["file_name"]
-                        file_path = await knowledge_service.get_knowledge_storage_path(
-                            file_name=file_name, brain_id=brain_id
-                        )
-
-                    if file_path in generated_urls:
-                        source_url = generated_urls[file_path]
-                    else:
-                        # Generate the URL
-                        if file_path in sources_url_cache:
-                            source_url = sources_url_cache[file_path]
-                        else:
-                            generated_url = generate_file_signed_url(file_path)
-                            if generated_url is not None:
-                                source_url = generated_url.get("signedURL", "")
-                            else:
-                                source_url = ""
-                        # Store the generated URL
-                        generated_urls[file_path] = source_url
-                except Exception as e:
-                    logger.error(f"Error generating file signed URL: {e}")
-                    continue
-
-            # Append a new Sources object to the list
-            sources_list.append(
-                Sources(
-                    name=name,
-                    type=type_,
-                    source_url=source_url,
-                    original_file_name=name,
-                    citation=doc.page_content,
-                    integration=doc.metadata["integration"],
-                    integration_link=doc.metadata["integration_link"],
+            file_paths[position] = (file_path, file_name) if file_path else None
+        except Exception as e:
+            logger.error(f"Error generating file signed URL: {e}")
+            file_paths[position] = None
+
+    signed_urls = generate_file_signed_urls(
+        [path[0] for path in file_paths.values() if path]
+    )
+
+    for position, doc in enumerate(documents):
+        if _is_url(doc):
+            name = doc.metadata["original_file_name"]
+            type_ = "url"
+            source_url = name
+        else:
+            resolved = file_paths[position]
+            if resolved is None or resolved[0] not in signed_urls:
+                logger.error(
+                    f"Error generating file signed URL for {doc.metadata['file_name']}"
                 )
+                continue
+            file_path, name = resolved
+            type_ = "file"
+            source_url = signed_urls[file_path]
+
+        # Append a new Sources object to the list
+        sources_list.append(
+            Sources(
+                name=name,
+                type=type_,
+                source_url=source_url,
+                original_file_name=name,
+                citation=doc.page_content,
+                integration=doc.metadata["integration"],
+                integration_link=doc.metadata["integration_link"],
             )
-    else:
-        logger.debug("No source documents found or source_documents is not a list.")
+        )
+
+    logger.info(
+        f"Generated {len(sources_list)} sources from {len(documents)} documents "
+        f"({len(signed_urls)} signed URLs) in {(time.perf_counter() - start) * 1000:.1f}ms"
+    )
     return sources_list
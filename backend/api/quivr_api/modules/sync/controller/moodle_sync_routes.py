@@ -1,7 +1,7 @@
 import os
 from uuid import UUID
 
-import requests
+import httpx
 from fastapi import APIRouter, Depends, HTTPException, Request
 from pydantic import BaseModel
 
@@ -12,6 +12,10 @@ from quivr_api.modules.sync.dto.inputs import (
     SyncsUserStatus,
 )
 from quivr_api.modules.sync.service.sync_service import SyncService, SyncUserService
+from quivr_api.modules.sync.utils.moodle_client import (
+    MoodleAPIError,
+    get_moodle_client,
+)
 from quivr_api.modules.user.entity.user_identity import UserIdentity
 
 # Initialize logger
@@ -403,8 +407,9 @@ def connect_moodle(
     try:
         # Request token from Moodle
         logger.info(f"Requesting token from: {token_endpoint}")
-        token_response = requests.post(token_endpoint, data=token_data, timeout=10)
-        token_response.raise_for_status()
+        token_response = get_moodle_client().request(
+            "POST", token_endpoint, data=token_data, timeout=10
+        )
         token_json = token_response.json()
 
         # Check for errors in response
@@ -428,23 +433,14 @@ def connect_moodle(
         logger.info(f"Successfully obtained token for user: {current_user.id}")
 
         # Get user info from Moodle Web Services
-        webservice_endpoint = f"{moodle_url.rstrip('/')}/webservice/rest/server.php"
-        webservice_params = {
-            "wstoken": wstoken,
-            "wsfunction": "core_webservice_get_site_info",
-            "moodlewsrestformat": "json"
-        }
-
-        user_info_response = requests.get(webservice_endpoint, params=webservice_params, timeout=10)
-        user_info_response.raise_for_status()
-        user_info = user_info_response.json()
-
-        # Check for API errors
-        if isinstance(user_info, dict) and "exception" in user_info:
-            logger.error(f"Moodle API error: {user_info}")
+        try:
+            user_info = get_moodle_client().call(
+                moodle_url, wstoken, "core_webservice_get_site_info", timeout=10
+            )
+        except MoodleAPIError as e:
             raise HTTPException(
                 status_code=500,
-                detail=f"Moodle API error: {user_info.get('message', 'Unknown error')}"
+                detail=f"Moodle API error: {e.message}"
             )
 
         user_email = user_info.get("useremail", connection_input.username)
@@ -487,7 +483,7 @@ def connect_moodle(
             "fullname": user_fullname,
         }
 
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         logger.error(f"Error connecting to Moodle: {e}")
         raise HTTPException(
             status_code=500,
@@ -558,29 +554,19 @@ def get_moodle_courses(
 
     try:
         # Call Moodle Web Services API to get user's enrolled courses
-        webservice_endpoint = f"{moodle_url.rstrip('/')}/webservice/rest/server.php"
-        webservice_params = {
-            "wstoken": wstoken,
-            "wsfunction": "core_enrol_get_users_courses",
-            "moodlewsrestformat": "json",
-            "userid": str(user_id)  # Must be a valid user ID
-        }
-
-        logger.debug(f"Calling Moodle API with params: {webservice_params}")
-        logger.debug(f"Endpoint: {webservice_endpoint}")
-
-        courses_response = requests.get(webservice_endpoint, params=webservice_params, timeout=10)
-        logger.info(f"Courses response status: {courses_response.status_code}")
-        logger.debug(f"Courses response: {courses_response.text[:500]}")
-        courses_response.raise_for_status()
-        courses = courses_response.json()
-
-        # Check for error in response
-        if isinstance(courses, dict) and "exception" in courses:
-            logger.error(f"Moodle API error: {courses}")
+        logger.debug(f"Fetching enrolled courses of Moodle user {user_id} from {moodle_url}")
+        try:
+            courses = get_moodle_client().call(
+                moodle_url,
+                wstoken,
+                "core_enrol_get_users_courses",
+                {"userid": str(user_id)},  # Must be a valid user ID
+                timeout=10,
+            )
+        except MoodleAPIError as e:
             raise HTTPException(
                 status_code=500,
-                detail=f"Moodle API error: {courses.get('message', 'Unknown error')}"
+                detail=f"Moodle API error: {e.message}"
             )
 
         logger.info(f"Retrieved {len(courses)} courses for user: {current_user.id}")
@@ -591,7 +577,7 @@ def get_moodle_courses(
             "sync_id": moodle_sync.get("id"),
         }
 
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         logger.error(f"Error fetching courses from Moodle: {e}")
         raise HTTPException(
             status_code=500, detail=f"Failed to fetch courses from Moodle: {str(e)}"
@@ -652,26 +638,18 @@ def get_moodle_course_files(
 
     try:
         # Call Moodle Web Services API to get course contents
-        webservice_endpoint = f"{moodle_url.rstrip('/')}/webservice/rest/server.php"
-        webservice_params = {
-            "wstoken": wstoken,
-            "wsfunction": "core_course_get_contents",
-            "moodlewsrestformat": "json",
-            "courseid": course_id
-        }
-
-        contents_response = requests.get(webservice_endpoint, params=webservice_params, timeout=10)
-        logger.info(f"Course contents response status: {contents_response.status_code}")
-        logger.debug(f"Course contents response: {contents_response.text[:500]}")
-        contents_response.raise_for_status()
-        contents = contents_response.json()
-
-        # Check for error in response
-        if isinstance(contents, dict) and "exception" in contents:
-            logger.error(f"Moodle API error: {contents}")
+        try:
+            contents = get_moodle_client().call(
+                moodle_url,
+                wstoken,
+                "core_course_get_contents",
+                {"courseid": course_id},
+                timeout=10,
+            )
+        except MoodleAPIError as e:
             raise HTTPException(
                 status_code=500,
-                detail=f"Moodle API error: {contents.get('message', 'Unknown error')}"
+                detail=f"Moodle API error: {e.message}"
             )
 
         # Transform Moodle content structure to include ALL content types
@@ -737,7 +715,7 @@ def get_moodle_course_files(
             "total_files": total_files,
         }
 
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         logger.error(f"Error fetching course contents from Moodle: {e}")
         raise HTTPException(
             status_code=500, detail=f"Failed to fetch course contents: {str(e)}"
@@ -116,6 +116,7 @@ class SyncFileInput(BaseModel):
     last_modified: str
     brain_id: str
     supported: Optional[bool] = True
+    content_hash: Optional[str] = None
 
 
 class SyncFileUpdateInput(BaseModel):
@@ -128,3 +129,4 @@ class SyncFileUpdateInput(BaseModel):
 
     last_modified: Optional[str] = None
     supported: Optional[bool] = None
+    content_hash: Optional[str] = None
@@ -18,14 +18,17 @@ class DownloadedSyncFile:
     extension: str
     file_data: io.BufferedReader
 
-    def file_sha1(self) -> str:
+    def file_sha1(self, chunk_size: int = 1024 * 1024) -> str:
         m = hashlib.sha1()
         self.file_data.seek(0)
-        data = self.file_data.read()
-        m.update(data)
+        for chunk in iter(lambda: self.file_data.read(chunk_size), b""):
+            m.update(chunk)
         self.file_data.seek(0)
         return m.hexdigest()
 
+    def close(self) -> None:
+        self.file_data.close()
+
 
 class DBSyncFile(BaseModel):
     id: int
@@ -34,6 +37,7 @@ class DBSyncFile(BaseModel):
     last_modified: str
     brain_id: str
     supported: bool
+    content_hash: str | None = None
 
 
 class SyncFile(BaseModel):
@@ -48,6 +52,9 @@ class SyncFile(BaseModel):
     icon: Optional[str] = None
     parent_id: Optional[str] = None
     type: Optional[str] = None
+    # Set by providers that generate their content (e.g. Moodle sections) and
+    # have no reliable modification time: changes are detected on the hash
+    content_hash: Optional[str] = None
 
 
 class SyncsUser(BaseModel):
@@ -75,6 +82,12 @@ class SyncsActive(BaseModel):
     notification_id: Optional[str] = None
 
 
+class SyncClaim(BaseModel):
+    sync_id: int
+    # Time the sync has been due for when it was claimed
+    lag_seconds: float
+
+
 # TODO: all of this should be rewritten
 class SyncsActiveDetails(BaseModel):
     pass
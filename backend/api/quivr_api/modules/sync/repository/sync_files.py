@@ -38,6 +38,7 @@ class SyncFilesRepository(SyncFileInterface):
                     "syncs_active_id": sync_file_input.syncs_active_id,
                     "last_modified": sync_file_input.last_modified,
                     "brain_id": sync_file_input.brain_id,
+                    "content_hash": sync_file_input.content_hash,
                 }
             )
             .execute()
@@ -102,6 +103,8 @@ class SyncFilesRepository(SyncFileInterface):
                 SyncFileUpdateInput(
                     last_modified=file.last_modified,
                     supported=previous_file.supported or supported,
+                    # Failed files keep no hash so the next sync retries them
+                    content_hash=file.content_hash if supported else None,
                 ),
             )
         else:
@@ -113,6 +116,7 @@ class SyncFilesRepository(SyncFileInterface):
                     last_modified=file.last_modified,
                     brain_id=str(sync_active.brain_id),
                     supported=supported,
+                    content_hash=file.content_hash if supported else None,
                 )
             )
         return sync_file
@@ -12,6 +12,7 @@ from quivr_api.modules.sync.dto.inputs import (
 )
 from quivr_api.modules.sync.entity.sync_models import (
     DBSyncFile,
+    SyncClaim,
     SyncFile,
     SyncsActive,
 )
@@ -94,6 +95,22 @@ class SyncInterface(ABC):
     async def get_syncs_active_in_interval(self) -> List[SyncsActive]:
         pass
 
+    @abstractmethod
+    def get_sync_active(self, sync_active_id: int) -> SyncsActive | None:
+        pass
+
+    @abstractmethod
+    def claim_due_syncs(self, max_running: int, lease_seconds: int) -> List[SyncClaim]:
+        pass
+
+    @abstractmethod
+    def claim_sync_lease(self, sync_active_id: int, lease_seconds: int) -> bool:
+        pass
+
+    @abstractmethod
+    def release_sync_lease(self, sync_active_id: int) -> None:
+        pass
+
 
 class SyncFileInterface(ABC):
     @abstractmethod
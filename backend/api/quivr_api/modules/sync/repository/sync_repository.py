@@ -13,7 +13,11 @@ from quivr_api.modules.notification.service.notification_service import (
     NotificationService,
 )
 from quivr_api.modules.sync.dto.inputs import SyncsActiveInput, SyncsActiveUpdateInput
-from quivr_api.modules.sync.entity.sync_models import NotionSyncFile, SyncsActive
+from quivr_api.modules.sync.entity.sync_models import (
+    NotionSyncFile,
+    SyncClaim,
+    SyncsActive,
+)
 from quivr_api.modules.sync.repository.sync_interfaces import SyncInterface
 
 notification_service = NotificationService()
@@ -205,6 +209,46 @@ class Sync(SyncInterface):
         logger.info("No active syncs found due for synchronization")
         return []
 
+    def get_sync_active(self, sync_active_id: int) -> SyncsActive | None:
+        response = (
+            self.db.table("syncs_active")
+            .select("*")
+            .eq("id", sync_active_id)
+            .execute()
+        )
+        if response.data:
+            return SyncsActive(**response.data[0])
+        logger.warning("No active sync found with sync_active_id: %s", sync_active_id)
+        return None
+
+    def claim_due_syncs(self, max_running: int, lease_seconds: int) -> List[SyncClaim]:
+        """
+        Lease the active syncs that are due for synchronization.
+
+        Rows are locked with `FOR UPDATE SKIP LOCKED`, so concurrent schedulers never
+        claim the same sync, and at most `max_running` leases are alive at any time.
+
+        Returns:
+            list: The claimed syncs, with how long they have been due for.
+        """
+        response = self.db.rpc(
+            "claim_due_syncs",
+            {"max_running": max_running, "lease_seconds": lease_seconds},
+        ).execute()
+        return [SyncClaim(**claim) for claim in response.data or []]
+
+    def claim_sync_lease(self, sync_active_id: int, lease_seconds: int) -> bool:
+        response = self.db.rpc(
+            "claim_sync_lease",
+            {"p_sync_id": sync_active_id, "lease_seconds": lease_seconds},
+        ).execute()
+        return bool(response.data)
+
+    def release_sync_lease(self, sync_active_id: int) -> None:
+        self.db.table("syncs_active").update({"lease_until": None}).eq(
+            "id", sync_active_id
+        ).execute()
+
 
 class NotionRepository(BaseRepository):
     def __init__(self, session: AsyncSession):
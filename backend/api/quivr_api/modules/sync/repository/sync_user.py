@@ -192,6 +192,25 @@ class SyncUserRepository:
         ).execute()
         logger.info("Sync user status updated successfully")
 
+    def update_sync_user_additional_data(
+        self, sync_user_id: int, additional_data: dict
+    ):
+        """
+        Replace the additional data of a sync user in the database.
+
+        Args:
+            sync_user_id (int): The ID of the sync user.
+            additional_data (dict): The new additional data of the sync user.
+        """
+        logger.info(
+            "Updating sync user additional data with sync_user_id: %s", sync_user_id
+        )
+
+        self.db.from_("syncs_user").update({"additional_data": additional_data}).eq(
+            "id", str(sync_user_id)
+        ).execute()
+        logger.info("Sync user additional data updated successfully")
+
     def get_all_notion_user_syncs(self):
         """
         Retrieve all Notion sync users from the database.
@@ -2,7 +2,6 @@
 Moodle sync service for processing course content.
 """
 import html2text
-import requests
 from datetime import datetime
 from io import BytesIO
 from typing import Any, Dict, List, Union
@@ -11,6 +10,10 @@ from uuid import UUID
 from quivr_api.logger import get_logger
 from quivr_api.modules.dependencies import BaseService
 from quivr_api.modules.sync.entity.sync_models import SyncFile
+from quivr_api.modules.sync.utils.moodle_client import (
+    MoodleAPIError,
+    get_moodle_client,
+)
 
 logger = get_logger(__name__)
 
@@ -57,26 +60,10 @@ class SyncMoodleService:
         Returns:
             List of sections with modules
         """
-        endpoint = f"{moodle_url.rstrip('/')}/webservice/rest/server.php"
-        params = {
-            "wstoken": wstoken,
-            "wsfunction": "core_course_get_contents",
-            "moodlewsrestformat": "json",
-            "courseid": course_id,
-        }
-
         try:
-            response = requests.get(endpoint, params=params, timeout=30)
-            response.raise_for_status()
-            contents = response.json()
-
-            # Check for API errors
-            if isinstance(contents, dict) and "exception" in contents:
-                error_msg = contents.get("message", "Unknown error")
-                logger.error(f"Moodle API error: {error_msg}")
-                raise Exception(f"Moodle API error: {error_msg}")
-
-            return contents
+            return get_moodle_client().call(
+                moodle_url, wstoken, "core_course_get_contents", {"courseid": course_id}
+            )
         except Exception as e:
             logger.error(f"Error fetching course contents: {e}")
             raise
@@ -246,21 +233,17 @@ class MoodleSync:
 
     def _get_courses(self, credentials: Dict, moodle_url: str, wstoken: str) -> List[SyncFile]:
         """Get list of enrolled courses."""
-        endpoint = f"{moodle_url.rstrip('/')}/webservice/rest/server.php"
-        params = {
-            "wstoken": wstoken,
-            "wsfunction": "core_enrol_get_users_courses",
-            "moodlewsrestformat": "json",
-            "userid": credentials.get("user_id", ""),
-        }
-
         try:
-            response = requests.get(endpoint, params=params, timeout=10)
-            response.raise_for_status()
-            courses = response.json()
-
-            if isinstance(courses, dict) and "exception" in courses:
-                logger.error(f"Moodle API error: {courses}")
+            try:
+                courses = get_moodle_client().call(
+                    moodle_url,
+                    wstoken,
+                    "core_enrol_get_users_courses",
+                    {"userid": credentials.get("user_id", "")},
+                    timeout=10,
+                )
+            except MoodleAPIError as e:
+                logger.error(f"Moodle API error: {e.payload}")
                 return []
 
             logger.info(f"Found {len(courses)} Moodle courses")
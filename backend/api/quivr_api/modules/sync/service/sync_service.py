@@ -10,7 +10,7 @@ from quivr_api.modules.sync.dto.inputs import (
     SyncsUserStatus,
     SyncUserUpdateInput,
 )
-from quivr_api.modules.sync.entity.sync_models import SyncsActive, SyncsUser
+from quivr_api.modules.sync.entity.sync_models import SyncClaim, SyncsActive, SyncsUser
 from quivr_api.modules.sync.repository.sync_repository import Sync
 from quivr_api.modules.sync.repository.sync_user import SyncUserRepository
 from quivr_api.modules.sync.service.sync_notion import SyncNotionService
@@ -113,6 +113,13 @@ class SyncUserService(ISyncUserService):
     def update_sync_user_status(self, sync_user_id: int, status: str):
         return self.repository.update_sync_user_status(sync_user_id, status)
 
+    def update_sync_user_additional_data(
+        self, sync_user_id: int, additional_data: dict
+    ):
+        return self.repository.update_sync_user_additional_data(
+            sync_user_id, additional_data
+        )
+
     def get_all_notion_user_syncs(self):
         return self.repository.get_all_notion_user_syncs()
 
@@ -162,6 +169,22 @@ class ISyncService(ABC):
     def get_details_sync_active(self, sync_active_id: int):
         pass
 
+    @abstractmethod
+    def get_sync_active(self, sync_active_id: int) -> SyncsActive | None:
+        pass
+
+    @abstractmethod
+    def claim_due_syncs(self, max_running: int, lease_seconds: int) -> List[SyncClaim]:
+        pass
+
+    @abstractmethod
+    def claim_sync_lease(self, sync_active_id: int, lease_seconds: int) -> bool:
+        pass
+
+    @abstractmethod
+    def release_sync_lease(self, sync_active_id: int) -> None:
+        pass
+
 
 class SyncService(ISyncService):
     def __init__(self):
@@ -188,3 +211,15 @@ class SyncService(ISyncService):
 
     def get_details_sync_active(self, sync_active_id: int):
         return self.repository.get_details_sync_active(sync_active_id)
+
+    def get_sync_active(self, sync_active_id: int) -> SyncsActive | None:
+        return self.repository.get_sync_active(sync_active_id)
+
+    def claim_due_syncs(self, max_running: int, lease_seconds: int) -> List[SyncClaim]:
+        return self.repository.claim_due_syncs(max_running, lease_seconds)
+
+    def claim_sync_lease(self, sync_active_id: int, lease_seconds: int) -> bool:
+        return self.repository.claim_sync_lease(sync_active_id, lease_seconds)
+
+    def release_sync_lease(self, sync_active_id: int) -> None:
+        self.repository.release_sync_lease(sync_active_id)
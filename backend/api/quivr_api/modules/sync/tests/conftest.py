@@ -54,6 +54,7 @@ from quivr_api.modules.sync.entity.notion_page import (
 from quivr_api.modules.sync.entity.sync_models import (
     DBSyncFile,
     NotionSyncFile,
+    SyncClaim,
     SyncFile,
     SyncsActive,
     SyncsUser,
@@ -427,6 +428,11 @@ class MockNotification(NotificationInterface):
         self.received[notif.id] = notif
         return notif
 
+    def add_notifications(
+        self, notifications: list[CreateNotification]
+    ) -> list[Notification]:
+        return [self.add_notification(notification) for notification in notifications]
+
     def update_notification_by_id(
         self, notification_id: UUID, notification: NotificationUpdatableProperties
     ) -> Notification:
@@ -437,6 +443,14 @@ class MockNotification(NotificationInterface):
         self.received[notification_id] = prev_notif
         return prev_notif
 
+    def update_notifications_by_ids(
+        self,
+        notification_ids: list[UUID],
+        notification: NotificationUpdatableProperties,
+    ) -> None:
+        for notification_id in notification_ids:
+            self.update_notification_by_id(notification_id, notification)
+
     def remove_notification_by_id(self, notification_id: UUID):
         del self.received[notification_id]
 
@@ -447,6 +461,7 @@ class MockSyncService(ISyncService):
         self.syncs_active_id = {}
         self.syncs_active_user[sync_active.user_id] = sync_active
         self.syncs_active_id[sync_active.id] = sync_active
+        self.leases: set[int] = set()
 
     def create_sync_active(
         self,
@@ -482,6 +497,24 @@ class MockSyncService(ISyncService):
     def get_details_sync_active(self, sync_active_id: int):
         return
 
+    def get_sync_active(self, sync_active_id: int) -> SyncsActive | None:
+        return self.syncs_active_id.get(sync_active_id)
+
+    def claim_due_syncs(self, max_running: int, lease_seconds: int) -> List[SyncClaim]:
+        due = [id for id in self.syncs_active_id if id not in self.leases]
+        claimed = due[: max(max_running - len(self.leases), 0)]
+        self.leases.update(claimed)
+        return [SyncClaim(sync_id=id, lag_seconds=0) for id in claimed]
+
+    def claim_sync_lease(self, sync_active_id: int, lease_seconds: int) -> bool:
+        if sync_active_id in self.leases:
+            return False
+        self.leases.add(sync_active_id)
+        return True
+
+    def release_sync_lease(self, sync_active_id: int) -> None:
+        self.leases.discard(sync_active_id)
+
 
 class MockSyncUserService(ISyncUserService):
     def __init__(self, sync_user: SyncsUser):
@@ -544,6 +577,7 @@ class MockSyncFilesRepository(SyncFileInterface):
             last_modified=sync_file_input.last_modified,
             brain_id=sync_file_input.brain_id,
             supported=supported,
+            content_hash=sync_file_input.content_hash,
         )
         self.files_store[sync_file_input.syncs_active_id].append(new_file)
         self.next_id += 1
@@ -572,6 +606,8 @@ class MockSyncFilesRepository(SyncFileInterface):
                         file.last_modified = update_data["last_modified"]
                     if "supported" in update_data:
                         file.supported = update_data["supported"]
+                    if "content_hash" in update_data:
+                        file.content_hash = update_data["content_hash"]
                     return
 
     def update_or_create_sync_file(
@@ -587,6 +623,7 @@ class MockSyncFilesRepository(SyncFileInterface):
                 SyncFileUpdateInput(
                     last_modified=file.last_modified,
                     supported=previous_file.supported or supported,
+                    content_hash=file.content_hash if supported else None,
                 ),
             )
             return previous_file
@@ -598,6 +635,7 @@ class MockSyncFilesRepository(SyncFileInterface):
                     last_modified=file.last_modified,
                     brain_id=str(sync_active.brain_id),
                     supported=supported,
+                    content_hash=file.content_hash if supported else None,
                 )
             )
 
@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+
+from quivr_api.modules.sync.utils.moodle_cache import CourseContentsCache
+
+
+def test_course_contents_cache_hit_and_miss():
+    cache = CourseContentsCache(ttl_seconds=60, max_entries=4)
+    key = CourseContentsCache.make_key("https://moodle.test/", 42, "token")
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return [{"id": 1, "name": "Intro", "modules": []}]
+
+    first = cache.get_or_fetch(key, fetch)
+    second = cache.get_or_fetch(key, fetch)
+
+    assert first == second
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_course_contents_cache_ttl_expiry():
+    cache = CourseContentsCache(ttl_seconds=0, max_entries=4)
+    key = CourseContentsCache.make_key("https://moodle.test", "42", "token")
+    cache.set(key, [])
+
+    assert cache.get(key) is None
+    assert cache.stats()["size"] == 0
+
+
+def test_course_contents_cache_lru_eviction():
+    cache = CourseContentsCache(ttl_seconds=60, max_entries=2)
+    keys = [
+        CourseContentsCache.make_key("https://moodle.test", idx, "token")
+        for idx in range(3)
+    ]
+    cache.set(keys[0], [])
+    cache.set(keys[1], [])
+    # Touch the first course so the second one is the least recently used
+    assert cache.get(keys[0]) == []
+    cache.set(keys[2], [])
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == []
+    assert cache.stats()["evictions"] == 1
+
+
+def test_course_contents_cache_scoped_by_token():
+    cache = CourseContentsCache()
+    teacher = CourseContentsCache.make_key("https://moodle.test", 1, "teacher")
+    student = CourseContentsCache.make_key("https://moodle.test", 1, "student")
+    cache.set(teacher, [{"id": 1, "visible": 0}])
+
+    assert cache.get(student) is None
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_course_contents_cache_shares_concurrent_fetches():
+    cache = CourseContentsCache()
+    key = CourseContentsCache.make_key("https://moodle.test", 7, "token")
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return [{"id": 1}]
+
+    results = await asyncio.gather(
+        *(cache.aget_or_fetch(key, fetch) for _ in range(4))
+    )
+    assert results == [[{"id": 1}]] * 4
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_course_contents_cache_shares_fetch_errors():
+    cache = CourseContentsCache()
+    key = CourseContentsCache.make_key("https://moodle.test", 7, "token")
+
+    async def fetch():
+        await asyncio.sleep(0.01)
+        raise ValueError("moodle down")
+
+    results = await asyncio.gather(
+        *(cache.aget_or_fetch(key, fetch) for _ in range(2)), return_exceptions=True
+    )
+    assert all(isinstance(r, ValueError) for r in results)
+    # The failure isn't cached
+    assert await cache.aget_or_fetch(key, lambda: asyncio.sleep(0, [])) == []
@@ -0,0 +1,90 @@
+import asyncio
+
+import httpx
+import pytest
+
+from quivr_api.modules.sync.utils.moodle_client import MoodleAPIError, MoodleClient
+
+
+def _client(handler) -> MoodleClient:
+    client = MoodleClient(backoff_factor=0, http2=False)
+    client._client = httpx.Client(transport=httpx.MockTransport(handler))
+    return client
+
+
+def test_moodle_client_retries_server_errors():
+    attempts = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        attempts.append(request)
+        if len(attempts) < 3:
+            return httpx.Response(503)
+        return httpx.Response(200, json=[{"id": 2}])
+
+    client = _client(handler)
+    courses = client.call("https://moodle.test/", "token", "core_enrol_get_users_courses")
+
+    assert courses == [{"id": 2}]
+    assert len(attempts) == 3
+    assert attempts[-1].url.path == "/webservice/rest/server.php"
+    assert attempts[-1].url.params["wsfunction"] == "core_enrol_get_users_courses"
+
+
+def test_moodle_client_does_not_retry_client_errors():
+    attempts = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        attempts.append(request)
+        return httpx.Response(403)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        _client(handler).call("https://moodle.test", "token", "core_course_get_contents")
+    assert len(attempts) == 1
+
+
+def test_moodle_client_raises_moodle_exceptions():
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200, json={"exception": "moodle_exception", "message": "Invalid token"}
+        )
+
+    with pytest.raises(MoodleAPIError, match="Invalid token"):
+        _client(handler).call("https://moodle.test", "token", "core_course_get_contents")
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_moodle_client_async_call():
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"sitename": "Moodle"})
+
+    client = MoodleClient(http2=False)
+    state = client._loop_state()
+    state.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    info = await client.acall("https://moodle.test", "token", "core_webservice_get_site_info")
+    assert info == {"sitename": "Moodle"}
+
+
+def test_moodle_client_does_not_retry_posts():
+    attempts = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        attempts.append(request)
+        raise httpx.ReadTimeout("timed out", request=request)
+
+    with pytest.raises(httpx.ReadTimeout):
+        _client(handler).request("POST", "https://moodle.test/login/token.php")
+    assert len(attempts) == 1
+
+
+def test_moodle_client_closes_the_client_of_a_finished_loop():
+    client = MoodleClient(http2=False)
+
+    async def _run():
+        state = client._loop_state()
+        await client.aclose_loop()
+        return state.client
+
+    async_client = asyncio.run(_run())
+    assert async_client.is_closed
+    assert len(client._loop_states) == 0
@@ -0,0 +1,181 @@
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from quivr_api.modules.sync.utils.sync import MOODLE_SECTION_INDEX_KEY, MoodleSync
+
+COURSE_CONTENTS = [
+    {
+        "id": 10,
+        "name": "Introduction",
+        "section": 1,
+        "visible": 1,
+        "summary": "<p>Welcome to the course</p>",
+        "modules": [
+            {
+                "id": 100,
+                "name": "Slides",
+                "modname": "resource",
+                "contentsinfo": {"lastmodified": 1_700_000_500},
+                "contents": [
+                    {
+                        "type": "file",
+                        "filename": "slides.pdf",
+                        "fileurl": "https://moodle.test/pluginfile.php/slides.pdf",
+                        "filesize": 2048,
+                        "mimetype": "application/pdf",
+                        "timemodified": 1_700_000_000,
+                    }
+                ],
+            }
+        ],
+    },
+    {
+        "id": 11,
+        "name": "Hidden",
+        "section": 2,
+        "visible": 0,
+        "modules": [],
+    },
+]
+
+CREDENTIALS = {"wstoken": "token", "moodle_url": "https://moodle.test/", "user_id": 3}
+
+
+class FakeSyncUserService:
+    def __init__(self):
+        self.additional_data = {"moodle_url": "https://moodle.test"}
+
+    def get_sync_user_by_id(self, sync_id: int):
+        return SimpleNamespace(additional_data=self.additional_data)
+
+    def update_sync_user_additional_data(self, sync_user_id: int, additional_data):
+        self.additional_data = additional_data
+
+
+def _moodle_sync(monkeypatch, contents=COURSE_CONTENTS, sync_user_service=None):
+    calls = []
+
+    async def _acall_moodle_api(moodle_url, wstoken, wsfunction, params=None):
+        calls.append((wsfunction, params))
+        if wsfunction == "core_enrol_get_users_courses":
+            return [{"id": 2}, {"id": 5}]
+        if params["courseid"] == 5:
+            return [{"id": 50, "name": "Other course", "section": 0, "modules": []}]
+        return contents
+
+    moodle = MoodleSync(sync_user_service=sync_user_service)
+    monkeypatch.setattr(moodle, "_acall_moodle_api", _acall_moodle_api)
+    return moodle, calls
+
+
+def test_moodle_course_contents_fetched_once_per_run(monkeypatch):
+    moodle, calls = _moodle_sync(monkeypatch)
+
+    files = moodle.get_files(CREDENTIALS, folder_id="2")
+    sections = [f for f in files if f.mime_type == "text/markdown"]
+    for section in sections:
+        moodle.download_file(CREDENTIALS, section)
+    moodle.get_files(CREDENTIALS, folder_id="section_10")
+
+    assert [c for c, _ in calls].count("core_course_get_contents") == 2
+    # Sections downloads + section index build + section lookup
+    assert moodle.course_contents_cache.stats()["hits"] == len(sections) + 2
+
+
+def test_moodle_section_last_modified_without_modules():
+    moodle = MoodleSync()
+    section = {"id": 50, "modules": []}
+    assert moodle._section_last_modified(
+        {**section, "timemodified": 1_700_000_500}
+    ) == "2023-11-14T22:21:40Z"
+
+    # Never the 1970 epoch: falls back to now, in UTC like the format says
+    stamped = datetime.strptime(
+        moodle._section_last_modified(section), moodle.datetime_format
+    ).replace(tzinfo=timezone.utc)
+    assert datetime.now(timezone.utc) - stamped < timedelta(minutes=1)
+
+
+def test_moodle_section_file_change_detection(monkeypatch):
+    moodle, _ = _moodle_sync(monkeypatch)
+
+    files = moodle.get_files(CREDENTIALS, folder_id="2")
+    section = next(f for f in files if f.id == "2:section:10")
+
+    # Hidden section skipped, section stamped with its latest module change
+    assert [f.id for f in files if f.mime_type == "text/markdown"] == ["2:section:10"]
+    assert section.last_modified == "2023-11-14T22:21:40Z"
+    assert section.content_hash
+    content = moodle.download_file(CREDENTIALS, section)["content"]
+    assert section.size == len(content.read())  # type: ignore
+
+    # Same course contents on the next run -> same hash
+    rerun, _ = _moodle_sync(monkeypatch)
+    same = next(
+        f for f in rerun.get_files(CREDENTIALS, folder_id="2") if f.id == section.id
+    )
+    assert same.content_hash == section.content_hash
+
+    # Editing the summary has no timestamp in Moodle but changes the hash
+    edited_contents = [
+        {**COURSE_CONTENTS[0], "summary": "<p>Exam moved to Friday</p>"},
+        COURSE_CONTENTS[1],
+    ]
+    edited, _ = _moodle_sync(monkeypatch, edited_contents)
+    changed = next(
+        f for f in edited.get_files(CREDENTIALS, folder_id="2") if f.id == section.id
+    )
+    assert changed.last_modified == section.last_modified
+    assert changed.content_hash != section.content_hash
+
+
+def test_moodle_section_index_built_once_and_persisted(monkeypatch):
+    sync_user_service = FakeSyncUserService()
+    moodle, calls = _moodle_sync(monkeypatch, sync_user_service=sync_user_service)
+
+    moodle.get_files(CREDENTIALS, folder_id="section_10", sync_user_id=1)
+    moodle.get_files(CREDENTIALS, folder_id="section_50", sync_user_id=1)
+
+    wsfunctions = [c for c, _ in calls]
+    assert wsfunctions.count("core_enrol_get_users_courses") == 1
+    assert wsfunctions.count("core_course_get_contents") == 2
+    persisted = sync_user_service.additional_data[MOODLE_SECTION_INDEX_KEY]
+    assert persisted["sections"] == {"10": "2", "11": "2", "50": "5"}
+    assert sync_user_service.additional_data["moodle_url"] == "https://moodle.test"
+
+
+def test_moodle_section_index_from_credentials(monkeypatch):
+    moodle, calls = _moodle_sync(monkeypatch)
+    credentials = {
+        **CREDENTIALS,
+        MOODLE_SECTION_INDEX_KEY: {"built_at": time.time(), "sections": {"10": "2"}},
+    }
+
+    files = moodle.get_files(credentials, folder_id="section_10")
+
+    assert files[0].id == "2:section:10"
+    assert calls == [("core_course_get_contents", {"courseid": 2})]
+
+
+def test_moodle_section_index_stale_or_expired(monkeypatch):
+    moodle, calls = _moodle_sync(monkeypatch)
+    # Section 50 was added after the index was built
+    fresh = {
+        **CREDENTIALS,
+        MOODLE_SECTION_INDEX_KEY: {"built_at": time.time(), "sections": {"10": "2"}},
+    }
+    assert moodle.get_files(fresh, folder_id="section_50")[0].id == "5:section:50"
+    assert [c for c, _ in calls].count("core_enrol_get_users_courses") == 1
+
+    # An unknown section doesn't trigger a second rebuild in the same run
+    assert moodle.get_files(fresh, folder_id="section_99") == []
+    assert [c for c, _ in calls].count("core_enrol_get_users_courses") == 1
+
+    expired, expired_calls = _moodle_sync(monkeypatch)
+    old = {
+        **CREDENTIALS,
+        MOODLE_SECTION_INDEX_KEY: {"built_at": 0, "sections": {"10": "2"}},
+    }
+    expired.get_files(old, folder_id="section_10")
+    assert [c for c, _ in expired_calls].count("core_enrol_get_users_courses") == 1
@@ -0,0 +1,31 @@
+import hashlib
+import io
+
+from quivr_api.modules.sync.entity.sync_models import DownloadedSyncFile
+from quivr_api.modules.sync.utils import streaming
+from quivr_api.modules.sync.utils.streaming import spool_chunks
+
+
+def test_spool_chunks_rolls_over_to_disk(monkeypatch):
+    monkeypatch.setattr(streaming, "SPOOL_MAX_MEMORY", 16)
+    chunks = [b"a" * 10, b"", b"b" * 10]
+
+    spooled = spool_chunks(chunks)
+
+    assert spooled._rolled  # type: ignore
+    assert spooled.read() == b"a" * 10 + b"b" * 10
+
+
+def test_downloaded_sync_file_sha1_streaming():
+    data = b"quivr" * 1000
+    spooled = spool_chunks([data])
+    dfile = DownloadedSyncFile(
+        file_name="file.txt",
+        extension=".txt",
+        file_data=io.BufferedReader(spooled),  # type: ignore
+    )
+
+    assert dfile.file_sha1(chunk_size=7) == hashlib.sha1(data).hexdigest()
+    assert dfile.file_data.read() == data
+    dfile.close()
+    assert spooled.closed
@@ -1,3 +1,4 @@
+import asyncio
 from datetime import datetime, timedelta, timezone
 from typing import Tuple
 from uuid import uuid4
@@ -5,13 +6,25 @@ from uuid import uuid4
 import pytest
 
 from quivr_api.modules.brain.entity.brain_entity import Brain
+from quivr_api.modules.brain.repository.brains_vectors import BrainsVectors
+from quivr_api.modules.notification.dto.inputs import NotificationUpdatableProperties
 from quivr_api.modules.notification.entity.notification import NotificationsStatusEnum
+from quivr_api.modules.notification.service.notification_service import (
+    NotificationService,
+)
 from quivr_api.modules.sync.entity.sync_models import (
     DBSyncFile,
     SyncFile,
     SyncsActive,
     SyncsUser,
 )
+from quivr_api.modules.sync.tests.conftest import (
+    MockNotification,
+    MockSyncCloud,
+    MockSyncFilesRepository,
+    MockSyncService,
+    MockSyncUserService,
+)
 from quivr_api.modules.sync.utils.syncutils import (
     SyncUtils,
     filter_on_supported_files,
@@ -184,6 +197,53 @@ def test_should_download_file_lastsynctime_after():
     )
 
 
+def test_should_download_file_content_hash():
+    datetime_format: str = "%Y-%m-%dT%H:%M:%SZ"
+    section_file = SyncFile(
+        id="2:section:10",
+        name="Section 1 Intro.md",
+        is_folder=False,
+        last_modified=datetime(2020, 1, 1).strftime(datetime_format),
+        mime_type="text/markdown",
+        web_view_link="link",
+        content_hash="abc",
+    )
+    prev_file = DBSyncFile(
+        id=1,
+        path=section_file.name,
+        syncs_active_id=1,
+        last_modified=section_file.last_modified,
+        brain_id=str(uuid4()),
+        supported=True,
+        content_hash="abc",
+    )
+    last_sync_time = datetime.now(timezone.utc)
+
+    # Unchanged section is skipped
+    assert not should_download_file(
+        file=section_file,
+        last_updated_sync_active=last_sync_time,
+        provider_name="moodle",
+        datetime_format=datetime_format,
+        previous_file=prev_file,
+    )
+    # Old timestamp but new content (e.g. edited summary) is downloaded
+    assert should_download_file(
+        file=section_file.model_copy(update={"content_hash": "def"}),
+        last_updated_sync_active=last_sync_time,
+        provider_name="moodle",
+        datetime_format=datetime_format,
+        previous_file=prev_file,
+    )
+    # Never synced before
+    assert should_download_file(
+        file=section_file,
+        last_updated_sync_active=last_sync_time,
+        provider_name="moodle",
+        datetime_format=datetime_format,
+    )
+
+
 @pytest.mark.asyncio(loop_scope="session")
 async def test_get_syncfiles_from_ids_nofolder(syncutils: SyncUtils):
     files = await syncutils.get_syncfiles_from_ids(
@@ -450,3 +510,96 @@ async def test_process_sync_file_with_prev(
         minimal_task_kwargs[key] == task["kwargs"][key]  # type: ignore
         for key in minimal_task_kwargs
     )
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_process_sync_files_bounded_concurrency(monkeypatch):
+    sync_user = SyncsUser(
+        id=1,
+        user_id=uuid4(),
+        name="concurrent",
+        provider="mock",
+        credentials={},
+        state={},
+        additional_data={},
+        status="",
+    )
+    sync_active = SyncsActive(
+        id=1,
+        name="test",
+        syncs_user_id=1,
+        user_id=sync_user.user_id,
+        settings={},
+        last_synced=str(datetime.now() - timedelta(hours=5)),
+        sync_interval_minutes=1,
+        brain_id=uuid4(),
+    )
+    files = [
+        SyncFile(
+            id=str(idx),
+            name=f"file_{idx}.txt",
+            is_folder=False,
+            last_modified=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            mime_type="txt",
+            web_view_link="",
+        )
+        for idx in range(8)
+    ]
+    notification_repo = MockNotification([], sync_user.user_id, sync_active.brain_id)
+    syncutils = SyncUtils(
+        sync_user_service=MockSyncUserService(sync_user),
+        sync_active_service=MockSyncService(sync_active),
+        sync_files_repo=MockSyncFilesRepository(),
+        sync_cloud=MockSyncCloud(),
+        notification_service=NotificationService(repository=notification_repo),
+        brain_vectors=BrainsVectors(),
+        knowledge_service=None,  # type: ignore
+        max_concurrency=3,
+    )
+
+    running = 0
+    max_running = 0
+
+    async def _process_sync_file(file, previous_file, current_user, sync_active):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        if file.id == "3":
+            raise ValueError("download failed")
+        # process_sync_file records the success itself
+        await syncutils.notification_writer.update(
+            file.notification_id,
+            NotificationUpdatableProperties(
+                status=NotificationsStatusEnum.SUCCESS,
+                description="File downloaded successfully",
+            ),
+            wait=True,
+        )
+        return file
+
+    monkeypatch.setattr(syncutils, "process_sync_file", _process_sync_file)
+
+    result = await syncutils.process_sync_files(
+        files=files, current_user=sync_user, sync_active=sync_active
+    )
+
+    assert max_running == 3
+    assert [f.id for f in result["downloaded_files"]] == [
+        str(idx) for idx in range(8) if idx != 3
+    ]
+    statuses = {
+        f.id: notification_repo.received[f.notification_id].status  # type: ignore
+        for f in files
+    }
+    assert statuses["3"] == NotificationsStatusEnum.ERROR
+    assert all(
+        status == NotificationsStatusEnum.SUCCESS
+        for fid, status in statuses.items()
+        if fid != "3"
+    )
+    # Only the failed file is recorded, the mocked success path skips the repo
+    assert [
+        f.path for f in syncutils.sync_files_repo.get_sync_files(sync_active.id)
+    ] == ["file_3.txt"]
@@ -0,0 +1,132 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+from quivr_api.logger import get_logger
+
+logger = get_logger(__name__)
+
+CourseKey = Tuple[str, str, str]
+
+
+class CourseContentsCache:
+    """
+    TTL + LRU cache for `core_course_get_contents` responses.
+
+    One instance lives for the duration of a sync run (it is owned by the
+    `MoodleSync` provider), so listing a course and then generating markdown
+    for each of its sections only hits the Moodle web service once.
+
+    Entries are keyed by `(moodle_url, course_id)` and scoped by the wstoken,
+    since course visibility depends on the enrolled user's role. Concurrent
+    async misses for the same course share a single fetch.
+    """
+
+    def __init__(self, ttl_seconds: float = 300, max_entries: int = 64):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[CourseKey, Tuple[float, List[Dict[str, Any]]]] = (
+            OrderedDict()
+        )
+        self._inflight: Dict[CourseKey, asyncio.Future] = {}
+        # Shared by the sync and async provider paths, so guard the dict
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(moodle_url: str, course_id: int | str, wstoken: str) -> CourseKey:
+        return (moodle_url.rstrip("/"), str(course_id), wstoken)
+
+    def get(self, key: CourseKey) -> List[Dict[str, Any]] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            fetched_at, contents = entry
+            if time.monotonic() - fetched_at > self.ttl_seconds:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return contents
+
+    def set(self, key: CourseKey, contents: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), contents)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_fetch(
+        self, key: CourseKey, fetch: Callable[[], List[Dict[str, Any]]]
+    ) -> List[Dict[str, Any]]:
+        contents = self.get(key)
+        if contents is not None:
+            return contents
+        contents = fetch()
+        self.set(key, contents)
+        logger.info(
+            f"Fetched Moodle course contents for course {key[1]} ({self.stats()})"
+        )
+        return contents
+
+    async def aget_or_fetch(
+        self, key: CourseKey, fetch: Callable[[], Awaitable[List[Dict[str, Any]]]]
+    ) -> List[Dict[str, Any]]:
+        """Async version of get_or_fetch."""
+        contents = self.get(key)
+        if contents is not None:
+            return contents
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            future = self._inflight.get(key)
+            fetching = future is not None and future.get_loop() is loop
+            if not fetching:
+                future = self._inflight[key] = loop.create_future()
+        if fetching:
+            # Sections of a course are downloaded together, wait for the first fetch
+            return await asyncio.shield(future)
+
+        try:
+            contents = await fetch()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Marks it retrieved when nobody else waits on it
+            future.exception()
+            raise
+        else:
+            self.set(key, contents)
+            future.set_result(contents)
+        finally:
+            with self._lock:
+                if self._inflight.get(key) is future:
+                    del self._inflight[key]
+        logger.info(
+            f"Fetched Moodle course contents for course {key[1]} ({self.stats()})"
+        )
+        return contents
+
+    def invalidate(self, key: CourseKey | None = None) -> None:
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+        }
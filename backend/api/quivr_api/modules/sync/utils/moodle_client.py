@@ -0,0 +1,274 @@
+import asyncio
+import importlib.util
+import threading
+import time
+import weakref
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Dict, Iterator
+from urllib.parse import urlsplit
+
+import httpx
+
+from quivr_api.logger import get_logger
+
+logger = get_logger(__name__)
+
+# HTTP/2 needs the optional `h2` package; fall back to HTTP/1.1 keep-alive without it
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+RETRY_STATUS_CODES = {500, 502, 503, 504}
+# A timed out POST (e.g. the token endpoint) may have been applied, don't replay it
+RETRY_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+class MoodleAPIError(Exception):
+    """Raised when a Moodle web service answers with an `exception` payload."""
+
+    def __init__(self, message: str, payload: Dict[str, Any] | None = None):
+        super().__init__(message)
+        self.message = message
+        self.payload = payload or {}
+
+
+class _LoopState:
+    """Async client and per-host semaphores bound to one event loop."""
+
+    def __init__(self, client: httpx.AsyncClient):
+        self.client = client
+        self.host_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+
+class MoodleClient:
+    """
+    Shared HTTP client for Moodle web services and file downloads.
+
+    Connections are pooled and kept alive across calls (HTTP/2 when `h2` is
+    installed), requests to a single Moodle host are capped at
+    `max_connections_per_host`, and 5xx responses, timeouts and transport
+    errors of idempotent requests are retried with exponential backoff.
+
+    The sync methods serve the FastAPI routes, the async ones the sync
+    providers. An `httpx.AsyncClient` can't be shared across event loops, so
+    one is kept per loop; short-lived loops close theirs with `aclose_loop`.
+    """
+
+    def __init__(
+        self,
+        timeout: float = 30,
+        max_connections_per_host: int = 8,
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        http2: bool | None = None,
+    ):
+        self.timeout = timeout
+        self.max_connections_per_host = max_connections_per_host
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.http2 = HTTP2_AVAILABLE if http2 is None else http2 and HTTP2_AVAILABLE
+        self._client: httpx.Client | None = None
+        self._loop_states: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._host_semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def _client_kwargs(self) -> Dict[str, Any]:
+        return {
+            "http2": self.http2,
+            "timeout": httpx.Timeout(self.timeout),
+            "follow_redirects": True,
+            "limits": httpx.Limits(
+                max_connections=self.max_connections_per_host * 4,
+                max_keepalive_connections=self.max_connections_per_host * 4,
+                keepalive_expiry=60,
+            ),
+        }
+
+    @property
+    def client(self) -> httpx.Client:
+        with self._lock:
+            if self._client is None:
+                self._client = httpx.Client(**self._client_kwargs())
+            return self._client
+
+    def _loop_state(self) -> _LoopState:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            state = self._loop_states.get(loop)
+            if state is None:
+                state = _LoopState(httpx.AsyncClient(**self._client_kwargs()))
+                self._loop_states[loop] = state
+            return state
+
+    @staticmethod
+    def _host(url: str) -> str:
+        return urlsplit(url).netloc
+
+    def _host_semaphore(self, url: str) -> threading.BoundedSemaphore:
+        host = self._host(url)
+        with self._lock:
+            if host not in self._host_semaphores:
+                self._host_semaphores[host] = threading.BoundedSemaphore(
+                    self.max_connections_per_host
+                )
+            return self._host_semaphores[host]
+
+    def _ahost_semaphore(self, state: _LoopState, url: str) -> asyncio.Semaphore:
+        host = self._host(url)
+        if host not in state.host_semaphores:
+            state.host_semaphores[host] = asyncio.Semaphore(
+                self.max_connections_per_host
+            )
+        return state.host_semaphores[host]
+
+    def _backoff(self, attempt: int) -> float:
+        return self.backoff_factor * (2**attempt)
+
+    def _should_retry(self, method: str, attempt: int, error: Exception) -> bool:
+        if attempt >= self.max_retries or method.upper() not in RETRY_METHODS:
+            return False
+        if isinstance(error, httpx.HTTPStatusError):
+            return error.response.status_code in RETRY_STATUS_CODES
+        return isinstance(error, (httpx.TimeoutException, httpx.TransportError))
+
+    @staticmethod
+    def _endpoint(moodle_url: str) -> str:
+        return f"{moodle_url.rstrip('/')}/webservice/rest/server.php"
+
+    @staticmethod
+    def _ws_params(wstoken: str, wsfunction: str, params: dict | None) -> dict:
+        api_params = {
+            "wstoken": wstoken,
+            "wsfunction": wsfunction,
+            "moodlewsrestformat": "json",
+        }
+        if params:
+            api_params.update(params)
+        return api_params
+
+    @staticmethod
+    def _parse(response: httpx.Response) -> Any:
+        data = response.json()
+        if isinstance(data, dict) and "exception" in data:
+            error_msg = data.get("message", "Unknown Moodle API error")
+            logger.error(f"Moodle API error: {error_msg}")
+            raise MoodleAPIError(error_msg, data)
+        return data
+
+    def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send a request with per-host limiting and retries, raising on HTTP errors."""
+        attempt = 0
+        while True:
+            try:
+                with self._host_semaphore(url):
+                    response = self.client.request(method, url, **kwargs)
+                response.raise_for_status()
+                return response
+            except httpx.HTTPError as e:
+                if not self._should_retry(method, attempt, e):
+                    raise
+                delay = self._backoff(attempt)
+                logger.warning(
+                    f"Moodle request {method} {self._host(url)} failed ({e}), retrying in {delay}s"
+                )
+                time.sleep(delay)
+                attempt += 1
+
+    async def arequest(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Async version of request."""
+        state = self._loop_state()
+        attempt = 0
+        while True:
+            try:
+                async with self._ahost_semaphore(state, url):
+                    response = await state.client.request(method, url, **kwargs)
+                response.raise_for_status()
+                return response
+            except httpx.HTTPError as e:
+                if not self._should_retry(method, attempt, e):
+                    raise
+                delay = self._backoff(attempt)
+                logger.warning(
+                    f"Moodle request {method} {self._host(url)} failed ({e}), retrying in {delay}s"
+                )
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    def call(
+        self,
+        moodle_url: str,
+        wstoken: str,
+        wsfunction: str,
+        params: dict | None = None,
+        timeout: float | None = None,
+    ) -> Any:
+        """Call a Moodle web service function and return its decoded JSON."""
+        response = self.request(
+            "GET",
+            self._endpoint(moodle_url),
+            params=self._ws_params(wstoken, wsfunction, params),
+            timeout=timeout or self.timeout,
+        )
+        return self._parse(response)
+
+    async def acall(
+        self,
+        moodle_url: str,
+        wstoken: str,
+        wsfunction: str,
+        params: dict | None = None,
+        timeout: float | None = None,
+    ) -> Any:
+        """Async version of call."""
+        response = await self.arequest(
+            "GET",
+            self._endpoint(moodle_url),
+            params=self._ws_params(wstoken, wsfunction, params),
+            timeout=timeout or self.timeout,
+        )
+        return self._parse(response)
+
+    @contextmanager
+    def stream(self, url: str, **kwargs) -> Iterator[httpx.Response]:
+        """
+        Stream a GET response (e.g. a pluginfile download) under the host limit.
+
+        Streams aren't retried, since the caller may have consumed part of the body.
+        """
+        with self._host_semaphore(url):
+            with self.client.stream("GET", url, **kwargs) as response:
+                response.raise_for_status()
+                yield response
+
+    @asynccontextmanager
+    async def astream(self, url: str, **kwargs) -> AsyncIterator[httpx.Response]:
+        """Async version of stream."""
+        state = self._loop_state()
+        async with self._ahost_semaphore(state, url):
+            async with state.client.stream("GET", url, **kwargs) as response:
+                response.raise_for_status()
+                yield response
+
+    async def aclose_loop(self) -> None:
+        """Close the async client of the running loop, before the loop ends."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            state = self._loop_states.pop(loop, None)
+        if state is not None:
+            await state.client.aclose()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+
+_moodle_client: MoodleClient | None = None
+
+
+def get_moodle_client() -> MoodleClient:
+    global _moodle_client
+    if _moodle_client is None:
+        _moodle_client = MoodleClient()
+    return _moodle_client
@@ -0,0 +1,22 @@
+import os
+from tempfile import SpooledTemporaryFile
+from typing import IO, Iterable
+
+# Downloads stay in memory up to this size and spill to a temp file above it,
+# so a large lecture video doesn't have to fit in the worker's RSS.
+SPOOL_MAX_MEMORY = int(os.getenv("SYNC_SPOOL_MAX_MEMORY", 8 * 1024 * 1024))
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+def spooled_file() -> IO[bytes]:
+    return SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY, mode="w+b")
+
+
+def spool_chunks(chunks: Iterable[bytes]) -> IO[bytes]:
+    """Write an iterable of byte chunks to a spooled file, rewound for reading."""
+    spooled = spooled_file()
+    for chunk in chunks:
+        if chunk:
+            spooled.write(chunk)
+    spooled.seek(0)
+    return spooled
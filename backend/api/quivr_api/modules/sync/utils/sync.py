@@ -1,11 +1,22 @@
 import asyncio
+import hashlib
 import json
 import os
 import time
 from abc import ABC, abstractmethod
-from datetime import datetime
+from datetime import datetime, timezone
 from io import BytesIO
-from typing import Any, Dict, List, Optional, Union
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Dict,
+    List,
+    Optional,
+    TypeVar,
+    Union,
+)
 
 import dropbox
 import markdownify
@@ -15,21 +26,44 @@ from fastapi import HTTPException
 from google.auth.transport.requests import Request as GoogleRequest
 from google.oauth2.credentials import Credentials
 from googleapiclient.discovery import build
+from googleapiclient.http import MediaIoBaseDownload
 from notion_client import Client
 from requests import HTTPError
 
 from quivr_api.logger import get_logger
 from quivr_api.modules.sync.entity.sync_models import SyncFile
 from quivr_api.modules.sync.service.sync_notion import SyncNotionService
+from quivr_api.modules.sync.utils.moodle_cache import CourseContentsCache
+from quivr_api.modules.sync.utils.moodle_client import (
+    MoodleAPIError,
+    MoodleClient,
+    get_moodle_client,
+)
 from quivr_api.modules.sync.utils.normalize import remove_special_characters
+from quivr_api.modules.sync.utils.streaming import (
+    DOWNLOAD_CHUNK_SIZE,
+    spool_chunks,
+    spooled_file,
+)
+
+if TYPE_CHECKING:
+    from quivr_api.modules.sync.service.sync_service import SyncUserService
 
 logger = get_logger(__name__)
 
+T = TypeVar("T")
+
+# Key of the persisted section -> course index in a Moodle sync user's additional_data
+MOODLE_SECTION_INDEX_KEY = "moodle_section_index"
+
 
 class BaseSync(ABC):
     name: str
     lower_name: str
     datetime_format: str
+    # Number of files SyncUtils may download/upload at the same time for this
+    # provider. Keep at 1 for clients that are not safe to share across tasks.
+    max_concurrent_downloads: int = 1
 
     @abstractmethod
     def get_files_by_id(self, credentials: Dict, file_ids: List[str]) -> List[SyncFile]:
@@ -64,13 +98,13 @@ class BaseSync(ABC):
     @abstractmethod
     def download_file(
         self, credentials: Dict, file: SyncFile
-    ) -> Dict[str, Union[str, BytesIO]]:
+    ) -> Dict[str, Union[str, IO[bytes]]]:
         raise NotImplementedError
 
     @abstractmethod
     async def adownload_file(
         self, credentials: Dict, file: SyncFile
-    ) -> Dict[str, Union[str, BytesIO]]:
+    ) -> Dict[str, Union[str, IO[bytes]]]:
         pass
 
 
@@ -90,7 +124,7 @@ class GoogleDriveSync(BaseSync):
 
     def download_file(
         self, credentials: Dict, file: SyncFile
-    ) -> Dict[str, Union[str, BytesIO]]:
+    ) -> Dict[str, Union[str, IO[bytes]]]:
         file_id = file.id
         file_name = file.name
         mime_type = file.mime_type
@@ -150,12 +184,19 @@ class GoogleDriveSync(BaseSync):
             )
             raise Exception("Unsupported file type")
 
-        file_data = request.execute()
-        return {"file_name": file_name, "content": BytesIO(file_data)}
+        file_data = spooled_file()
+        downloader = MediaIoBaseDownload(
+            file_data, request, chunksize=DOWNLOAD_CHUNK_SIZE
+        )
+        done = False
+        while not done:
+            _, done = downloader.next_chunk()
+        file_data.seek(0)
+        return {"file_name": file_name, "content": file_data}
 
     async def adownload_file(
         self, credentials: Dict, file: SyncFile
-    ) -> Dict[str, Union[str, BytesIO]]:
+    ) -> Dict[str, Union[str, IO[bytes]]]:
         return self.download_file(credentials, file)
 
     def get_files_by_id(self, credentials: Dict, file_ids: List[str]) -> List[SyncFile]:
@@ -316,6 +357,7 @@ class AzureDriveSync(BaseSync):
     name = "Share Point"
     lower_name = "azure"
     datetime_format: str = "%Y-%m-%dT%H:%M:%SZ"
+    max_concurrent_downloads: int = 4
     CLIENT_ID = os.getenv("SHAREPOINT_CLIENT_ID")
     CLIENT_SECRET = os.getenv("SHAREPOINT_CLIENT_SECRET")
     AUTHORITY = "https://login.microsoftonline.com/common"
@@ -549,7 +591,7 @@ class AzureDriveSync(BaseSync):
 
     def download_file(
         self, credentials: Dict, file: SyncFile
-    ) -> Dict[str, Union[str, BytesIO]]:
+    ) -> Dict[str, Union[str, IO[bytes]]]:
         file_id = file.id
         file_name = file.name
         headers = self.get_azure_headers(credentials)
@@ -563,15 +605,18 @@ class AzureDriveSync(BaseSync):
         else:
             download_endpoint = f"https://graph.microsoft.com/v1.0/sites/{site_id}/drive/items/{folder_id}/content"
         logger.info("Downloading file: %s", file_name)
-        download_response = requests.get(
+        with requests.get(
             download_endpoint, headers=headers, stream=True
-        )
-        return {"file_name": file_name, "content": BytesIO(download_response.content)}
+        ) as download_response:
+            content = spool_chunks(
+                download_response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE)
+            )
+        return {"file_name": file_name, "content": content}
 
     async def adownload_file(
         self, credentials: Dict, file: SyncFile
-    ) -> Dict[str, Union[str, BytesIO]]:
-        return self.download_file(credentials, file)
+    ) -> Dict[str, Union[str, IO[bytes]]]:
+        return await asyncio.to_thread(self.download_file, credentials, file)
 
 
 class DropboxSync(BaseSync):
@@ -579,6 +624,7 @@ class DropboxSync(BaseSync):
     lower_name = "dropbox"
     dbx: dropbox.Dropbox | None = None
     datetime_format: str = "%Y-%m-%d %H:%M:%S"
+    max_concurrent_downloads: int = 2
 
     def link_dropbox(self, credentials) -> dropbox.Dropbox:
         return dropbox.Dropbox(
@@ -760,19 +806,23 @@ class DropboxSync(BaseSync):
 
     def download_file(
         self, credentials: Dict, file: SyncFile
-    ) -> Dict[str, Union[str, BytesIO]]:
+    ) -> Dict[str, Union[str, IO[bytes]]]:
         file_id = str(file.id)
         file_name = file.name
         if not self.dbx:
             self.dbx = self.link_dropbox(credentials)
 
         metadata, file_data = self.dbx.files_download(file_id)  # type: ignore
-        return {"file_name": file_name, "content": BytesIO(file_data.content)}
+        with file_data:
+            content = spool_chunks(
+                file_data.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE)
+            )
+        return {"file_name": file_name, "content": content}
 
     async def adownload_file(
         self, credentials: Dict, file: SyncFile
-    ) -> Dict[str, Union[str, BytesIO]]:
-        return self.download_file(credentials, file)
+    ) -> Dict[str, Union[str, IO[bytes]]]:
+        return await asyncio.to_thread(self.download_file, credentials, file)
 
 
 class NotionSync(BaseSync):
@@ -959,7 +1009,7 @@ class NotionSync(BaseSync):
 
     async def adownload_file(
         self, credentials: Dict, file: SyncFile
-    ) -> Dict[str, Union[str, BytesIO]]:
+    ) -> Dict[str, Union[str, IO[bytes]]]:
         if not self.notion:
             self.notion = self.link_notion(credentials)
 
@@ -1004,7 +1054,7 @@ class NotionSync(BaseSync):
 
     def download_file(
         self, credentials: Dict, file: SyncFile
-    ) -> Dict[str, Union[str, BytesIO]]:
+    ) -> Dict[str, Union[str, IO[bytes]]]:
         loop = asyncio.get_event_loop()
         return loop.run_until_complete(self.adownload_file(credentials, file))
 
@@ -1013,6 +1063,7 @@ class GitHubSync(BaseSync):
     name = "GitHub"
     lower_name = "github"
     datetime_format = "%Y-%m-%dT%H:%M:%SZ"
+    max_concurrent_downloads: int = 2
 
     def __init__(self):
         self.CLIENT_ID = os.getenv("GITHUB_CLIENT_ID")
@@ -1099,7 +1150,7 @@ class GitHubSync(BaseSync):
 
     def download_file(
         self, credentials: Dict, file: SyncFile
-    ) -> Dict[str, Union[str, BytesIO]]:
+    ) -> Dict[str, Union[str, IO[bytes]]]:
         token_data = self.get_github_token_data(credentials)
         headers = self.get_github_headers(token_data)
         project_name, file_path = file.id.split(":")
@@ -1125,7 +1176,7 @@ class GitHubSync(BaseSync):
         return {"file_name": file.name, "content": BytesIO(file_content)}
 
     async def adownload_file(self, credentials: Dict, file: SyncFile):
-        return self.download_file(credentials, file)
+        return await asyncio.to_thread(self.download_file, credentials, file)
 
     def list_github_repos(self, credentials, recursive=False):
         def fetch_repos(endpoint, headers):
@@ -1223,10 +1274,35 @@ class GitHubSync(BaseSync):
 class MoodleSync(BaseSync):
     """
     Moodle integration using Web Services API with wstoken authentication.
+
+    Like NotionSync, the async methods are the implementation and the sync
+    ones run them on a fresh event loop, whose Moodle client is closed with it.
     """
     name = "Moodle"
     lower_name = "moodle"
     datetime_format: str = "%Y-%m-%dT%H:%M:%SZ"
+    max_concurrent_downloads: int = 4
+
+    def __init__(
+        self,
+        course_cache_ttl: float = 300,
+        course_cache_max_entries: int = 128,
+        section_index_ttl: float = 6 * 3600,
+        sync_user_service: Optional["SyncUserService"] = None,
+        client: MoodleClient | None = None,
+    ):
+        # Shared by listing and section markdown generation for the whole run
+        self.course_contents_cache = CourseContentsCache(
+            ttl_seconds=course_cache_ttl, max_entries=course_cache_max_entries
+        )
+        self._moodle_service = None
+        self.section_index_ttl = section_index_ttl
+        # Used to persist the section index on the sync user
+        self.sync_user_service = sync_user_service
+        self._section_indexes: Dict[tuple, dict] = {}
+        self._rebuilt_section_indexes: set = set()
+        # Pooled, per-host limited client shared with the Moodle routes
+        self.client = client or get_moodle_client()
 
     def check_and_refresh_access_token(self, credentials: dict) -> Dict:
         """
@@ -1246,32 +1322,45 @@ class MoodleSync(BaseSync):
             raise HTTPException(status_code=500, detail="Moodle URL not found in credentials")
         return moodle_url.rstrip("/")
 
-    def _call_moodle_api(self, moodle_url: str, wstoken: str, wsfunction: str, params: dict = None) -> Any:
+    async def _acall_moodle_api(
+        self, moodle_url: str, wstoken: str, wsfunction: str, params: dict = None
+    ) -> Any:
         """
         Generic Moodle Web Services API call.
         """
-        endpoint = f"{moodle_url}/webservice/rest/server.php"
-        api_params = {
-            "wstoken": wstoken,
-            "wsfunction": wsfunction,
-            "moodlewsrestformat": "json",
-        }
-        if params:
-            api_params.update(params)
-
-        response = requests.get(endpoint, params=api_params, timeout=30)
-        response.raise_for_status()
-        data = response.json()
+        try:
+            return await self.client.acall(moodle_url, wstoken, wsfunction, params)
+        except MoodleAPIError as e:
+            raise HTTPException(status_code=500, detail=f"Moodle API error: {e.message}")
+
+    async def _aget_course_contents(
+        self, moodle_url: str, wstoken: str, course_id: int | str
+    ) -> List[Dict[str, Any]]:
+        """Fetch `core_course_get_contents` for a course through the run cache."""
+        key = CourseContentsCache.make_key(moodle_url, course_id, wstoken)
+        return await self.course_contents_cache.aget_or_fetch(
+            key,
+            lambda: self._acall_moodle_api(
+                moodle_url,
+                wstoken,
+                "core_course_get_contents",
+                {"courseid": int(course_id)},
+            ),
+        )
 
-        # Check for Moodle API errors
-        if isinstance(data, dict) and "exception" in data:
-            error_msg = data.get("message", "Unknown Moodle API error")
-            logger.error(f"Moodle API error: {error_msg}")
-            raise HTTPException(status_code=500, detail=f"Moodle API error: {error_msg}")
+    def _run(self, coro: Awaitable[T]) -> T:
+        async def _main() -> T:
+            try:
+                return await coro
+            finally:
+                await self.client.aclose_loop()
 
-        return data
+        return asyncio.run(_main())
 
     def get_files_by_id(self, credentials: Dict, file_ids: List[str]) -> List[SyncFile]:
+        return self._run(self.aget_files_by_id(credentials, file_ids))
+
+    async def aget_files_by_id(self, credentials: Dict, file_ids: List[str]) -> List[SyncFile]:
         """
         Get specific files by their IDs.
         file_ids format: "course_id:section_id:module_id"
@@ -1292,10 +1381,7 @@ class MoodleSync(BaseSync):
                 course_id, section_id, module_id = parts
 
                 # Get course contents
-                contents = self._call_moodle_api(
-                    moodle_url, wstoken, "core_course_get_contents",
-                    {"courseid": int(course_id)}
-                )
+                contents = await self._aget_course_contents(moodle_url, wstoken, course_id)
 
                 # Find the specific module
                 for section in contents:
@@ -1315,10 +1401,6 @@ class MoodleSync(BaseSync):
 
         return files
 
-    async def aget_files_by_id(self, credentials: Dict, file_ids: List[str]) -> List[SyncFile]:
-        """Async version of get_files_by_id."""
-        return await asyncio.to_thread(self.get_files_by_id, credentials, file_ids)
-
     def _extract_files_from_module(self, module: dict, section_name: str, course_id: str) -> List[SyncFile]:
         """Extract SyncFile objects from a Moodle module."""
         files = []
@@ -1348,70 +1430,220 @@ class MoodleSync(BaseSync):
 
         return files
 
-    def _get_files_for_section_id(
+    def _section_markdown(
+        self, section: dict, course_id: str, web_view_link: str
+    ) -> str:
+        """Render a Moodle section as the markdown document that gets ingested."""
+        from quivr_api.modules.sync.service.sync_moodle import SyncMoodleService
+
+        if self._moodle_service is None:
+            self._moodle_service = SyncMoodleService()
+        section_data = self._moodle_service.process_section_content(
+            section, f"Course {course_id}"
+        )
+
+        markdown_content = []
+        markdown_content.append(f"**Course Section**: {web_view_link}\n\n")
+        markdown_content.append(section_data["content"])
+        markdown_content.append("\n\n---\n\n")
+        markdown_content.append(f"**Files in this section**: {section_data['file_count']}\n")
+        markdown_content.append(f"**Modules**: {len(section_data['modules'])}\n")
+        return "\n".join(markdown_content)
+
+    def _section_last_modified(self, section: dict) -> str:
+        """
+        Latest modification time across the section's modules and their contents.
+
+        Moodle has no timestamp for the section itself (e.g. its summary), which
+        is why section files also carry a content hash. Sections without
+        modules fall back to the section's own timestamp when Moodle sends one,
+        else to now, like courses without one.
+        """
+        timestamps = [section.get("timemodified") or 0]
+        for module in section.get("modules", []):
+            timestamps.append(module.get("timemodified") or 0)
+            timestamps.append((module.get("contentsinfo") or {}).get("lastmodified") or 0)
+            for content in module.get("contents", []):
+                timestamps.append(content.get("timemodified") or 0)
+        if not max(timestamps):
+            return datetime.now(timezone.utc).strftime(self.datetime_format)
+        # datetime_format is UTC ("Z")
+        return datetime.fromtimestamp(max(timestamps), tz=timezone.utc).strftime(
+            self.datetime_format
+        )
+
+    def _section_file(self, section: dict, course_id: str, moodle_url: str) -> SyncFile:
+        """Build the `.md` SyncFile for a section, stamped with its content hash."""
+        section_id = section.get("id")
+        section_name = section.get("name", "Unnamed Section")
+        section_number = section.get("section", 0)
+        web_view_link = f"{moodle_url}/course/view.php?id={course_id}#section-{section_number}"
+        markdown = self._section_markdown(section, course_id, web_view_link).encode("utf-8")
+        return SyncFile(
+            name=remove_special_characters(f"Section {section_number}: {section_name}.md"),
+            id=f"{course_id}:section:{section_id}",
+            is_folder=False,
+            last_modified=self._section_last_modified(section),
+            mime_type="text/markdown",
+            web_view_link=web_view_link,
+            size=len(markdown),
+            content_hash=hashlib.sha256(markdown).hexdigest(),
+        )
+
+    async def _abuild_section_index(
+        self, moodle_url: str, wstoken: str, user_id
+    ) -> Dict[str, str]:
+        """
+        Map every section id of the user's enrolled courses to its course id.
+
+        Course contents are fetched concurrently (bounded by the client's
+        per-host limit) and land in the course contents cache, so the sections
+        selected afterwards cost no extra request.
+        """
+        courses = await self._acall_moodle_api(
+            moodle_url, wstoken, "core_enrol_get_users_courses", {"userid": user_id}
+        )
+
+        async def _fetch(course_id: str):
+            try:
+                return course_id, await self._aget_course_contents(
+                    moodle_url, wstoken, course_id
+                )
+            except Exception as e:
+                logger.debug(f"Skipping course {course_id} while indexing sections: {e}")
+                return course_id, []
+
+        course_ids = [str(course.get("id")) for course in courses]
+        results = await asyncio.gather(*(_fetch(course_id) for course_id in course_ids))
+
+        index = {
+            str(section.get("id")): course_id
+            for course_id, contents in results
+            for section in contents
+        }
+        logger.info(
+            f"Built Moodle section index: {len(index)} sections in {len(course_ids)} courses"
+        )
+        return index
+
+    async def _aget_section_index(
         self,
+        credentials: Dict,
+        moodle_url: str,
+        wstoken: str,
+        sync_user_id: int | None,
+        rebuild: bool = False,
+    ) -> Dict[str, str]:
+        """
+        Section -> course index for a sync user.
+
+        The index is persisted in the sync user's additional_data (and so comes
+        back merged into the credentials) and rebuilt once its TTL has expired,
+        or at most once per run when a selected section isn't in it.
+        """
+        key = (moodle_url, wstoken)
+        index = self._section_indexes.get(key) or credentials.get(
+            MOODLE_SECTION_INDEX_KEY
+        )
+        is_fresh = bool(index) and (
+            time.time() - index.get("built_at", 0) < self.section_index_ttl
+        )
+        if is_fresh and (not rebuild or key in self._rebuilt_section_indexes):
+            self._section_indexes[key] = index
+            return index["sections"]
+
+        index = {
+            "built_at": time.time(),
+            "sections": await self._abuild_section_index(
+                moodle_url, wstoken, credentials.get("user_id")
+            ),
+        }
+        self._section_indexes[key] = index
+        self._rebuilt_section_indexes.add(key)
+        await asyncio.to_thread(self._persist_section_index, sync_user_id, index)
+        return index["sections"]
+
+    def _persist_section_index(self, sync_user_id: int | None, index: dict) -> None:
+        if self.sync_user_service is None or sync_user_id is None:
+            return
+        try:
+            sync_user = self.sync_user_service.get_sync_user_by_id(sync_user_id)
+            if sync_user is None:
+                return
+            self.sync_user_service.update_sync_user_additional_data(
+                sync_user_id,
+                {**sync_user.additional_data, MOODLE_SECTION_INDEX_KEY: index},
+            )
+        except Exception as e:
+            logger.warning(
+                f"Could not persist Moodle section index for sync user {sync_user_id}: {e}"
+            )
+
+    async def _aget_files_for_section_id(
+        self,
+        credentials: Dict,
         moodle_url: str,
         wstoken: str,
         target_section_id: int,
-        user_id,
         include_hidden_sections: bool,
+        sync_user_id: int | None = None,
     ) -> List[SyncFile]:
         """Return all files that belong to a specific Moodle section ID.
 
-        Enumerates enrolled courses until the section is found, then delegates to
+        Resolves the parent course through the section index, then delegates to
         the normal per-course logic so file IDs stay consistent.
         """
-        courses = self._call_moodle_api(
-            moodle_url, wstoken, "core_enrol_get_users_courses", {"userid": user_id}
-        )
-        for course in courses:
-            course_id = str(course.get("id"))
-            try:
-                contents = self._call_moodle_api(
-                    moodle_url, wstoken, "core_course_get_contents",
-                    {"courseid": int(course_id)},
-                )
-            except Exception as e:
-                logger.debug(f"Skipping course {course_id} while looking for section {target_section_id}: {e}")
+        for rebuild in (False, True):
+            index = await self._aget_section_index(
+                credentials, moodle_url, wstoken, sync_user_id, rebuild=rebuild
+            )
+            course_id = index.get(str(target_section_id))
+            if course_id is None:
                 continue
-
+            contents = await self._aget_course_contents(moodle_url, wstoken, course_id)
             section_found = next(
                 (s for s in contents if s.get("id") == target_section_id), None
             )
-            if section_found is None:
-                continue
-
-            section_name = section_found.get("name", "Unnamed Section")
-            section_number = section_found.get("section", 0)
-            section_visible = section_found.get("visible", 1)
-            if not section_visible and not include_hidden_sections:
-                logger.debug(f"Skipping hidden section {target_section_id}")
-                return []
+            if section_found is not None:
+                break
+        else:
+            logger.warning(f"Section {target_section_id} not found in any enrolled course")
+            return []
 
-            files: List[SyncFile] = [
-                SyncFile(
-                    name=remove_special_characters(f"Section {section_number}: {section_name}.md"),
-                    id=f"{course_id}:section:{target_section_id}",
-                    is_folder=False,
-                    last_modified=datetime.now().strftime(self.datetime_format),
-                    mime_type="text/markdown",
-                    web_view_link=f"{moodle_url}/course/view.php?id={course_id}#section-{section_number}",
-                    size=0,
-                )
-            ]
-            for module in section_found.get("modules", []):
-                files.extend(self._extract_files_from_module(module, section_name, course_id))
+        section_name = section_found.get("name", "Unnamed Section")
+        section_visible = section_found.get("visible", 1)
+        if not section_visible and not include_hidden_sections:
+            logger.debug(f"Skipping hidden section {target_section_id}")
+            return []
 
-            logger.info(
-                f"Found section {target_section_id} in course {course_id}: {len(files)} files"
-            )
-            return files
+        files: List[SyncFile] = [
+            self._section_file(section_found, course_id, moodle_url)
+        ]
+        for module in section_found.get("modules", []):
+            files.extend(self._extract_files_from_module(module, section_name, course_id))
 
-        logger.warning(f"Section {target_section_id} not found in any enrolled course")
-        return []
+        logger.info(
+            f"Found section {target_section_id} in course {course_id}: {len(files)} files"
+        )
+        return files
 
     def get_files(
-        self, credentials: Dict, folder_id: str | None = None, recursive: bool = False
+        self,
+        credentials: Dict,
+        folder_id: str | None = None,
+        recursive: bool = False,
+        sync_user_id: int | None = None,
+    ) -> List[SyncFile]:
+        return self._run(
+            self.aget_files(credentials, folder_id, recursive, sync_user_id)
+        )
+
+    async def aget_files(
+        self,
+        credentials: Dict,
+        folder_id: str | None = None,
+        recursive: bool = False,
+        sync_user_id: int | None = None,
     ) -> List[SyncFile]:
         """
         Get all files from a Moodle course.
@@ -1424,7 +1656,7 @@ class MoodleSync(BaseSync):
         if not folder_id:
             # Get all enrolled courses
             user_id = credentials.get("user_id")
-            courses = self._call_moodle_api(
+            courses = await self._acall_moodle_api(
                 moodle_url, wstoken, "core_enrol_get_users_courses",
                 {"userid": user_id}
             )
@@ -1448,30 +1680,26 @@ class MoodleSync(BaseSync):
         include_hidden_sections = credentials.get("include_hidden_sections", False)
 
         # folder_id can be 'section_XXXXX' when the user selected a course section
-        # rather than the whole course. Find the parent course by scanning enrolled courses.
+        # rather than the whole course. Find the parent course through the section index.
         if folder_id.startswith("section_"):
             try:
                 target_section_id = int(folder_id[len("section_"):])
             except ValueError:
                 logger.warning(f"Invalid Moodle section folder_id: {folder_id}")
                 return []
-            return self._get_files_for_section_id(
-                moodle_url, wstoken, target_section_id,
-                credentials.get("user_id"), include_hidden_sections
+            return await self._aget_files_for_section_id(
+                credentials, moodle_url, wstoken, target_section_id,
+                include_hidden_sections, sync_user_id
             )
 
         # Get course contents
         course_id = folder_id
-        contents = self._call_moodle_api(
-            moodle_url, wstoken, "core_course_get_contents",
-            {"courseid": int(course_id)}
-        )
+        contents = await self._aget_course_contents(moodle_url, wstoken, course_id)
 
         files = []
         for section in contents:
             section_id = section.get("id")
             section_name = section.get("name", "Unnamed Section")
-            section_number = section.get("section", 0)
             section_visible = section.get("visible", 1)  # Default to visible if not specified
 
             # Skip hidden sections unless explicitly configured to include them
@@ -1480,16 +1708,7 @@ class MoodleSync(BaseSync):
                 continue
 
             # Add section itself as a .md file
-            section_file = SyncFile(
-                name=remove_special_characters(f"Section {section_number}: {section_name}.md"),
-                id=f"{course_id}:section:{section_id}",
-                is_folder=False,
-                last_modified=datetime.now().strftime(self.datetime_format),
-                mime_type="text/markdown",
-                web_view_link=f"{moodle_url}/course/view.php?id={course_id}#section-{section_number}",
-                size=0,
-            )
-            files.append(section_file)
+            files.append(self._section_file(section, course_id, moodle_url))
 
             # Also add files from modules in this section
             for module in section.get("modules", []):
@@ -1499,19 +1718,14 @@ class MoodleSync(BaseSync):
         logger.info(f"Retrieved {len(files)} files from Moodle course {course_id}")
         return files
 
-    async def aget_files(
-        self,
-        credentials: Dict,
-        folder_id: str | None = None,
-        recursive: bool = False,
-        sync_user_id: int | None = None,
-    ) -> List[SyncFile]:
-        """Async version of get_files."""
-        return await asyncio.to_thread(self.get_files, credentials, folder_id, recursive)
-
     def download_file(
         self, credentials: Dict, file: SyncFile
-    ) -> Dict[str, Union[str, BytesIO]]:
+    ) -> Dict[str, Union[str, IO[bytes]]]:
+        return self._run(self.adownload_file(credentials, file))
+
+    async def adownload_file(
+        self, credentials: Dict, file: SyncFile
+    ) -> Dict[str, Union[str, IO[bytes]]]:
         """
         Download a file from Moodle or generate markdown for sections.
         """
@@ -1529,29 +1743,15 @@ class MoodleSync(BaseSync):
 
                 logger.info(f"Generating markdown for section {section_id} in course {course_id}")
 
-                # Get course contents
-                contents = self._call_moodle_api(
-                    moodle_url, wstoken, "core_course_get_contents",
-                    {"courseid": int(course_id)}
-                )
+                # Get course contents (cached for the run, see get_files)
+                contents = await self._aget_course_contents(moodle_url, wstoken, course_id)
 
                 # Find the specific section
                 for section in contents:
                     if section.get("id") == section_id:
-                        # Use the SyncMoodleService to process the section
-                        from quivr_api.modules.sync.service.sync_moodle import SyncMoodleService
-                        service = SyncMoodleService()
-                        section_data = service.process_section_content(section, f"Course {course_id}")
-
-                        # Create markdown content
-                        markdown_content = []
-                        markdown_content.append(f"**Course Section**: {file.web_view_link}\n\n")
-                        markdown_content.append(section_data["content"])
-                        markdown_content.append(f"\n\n---\n\n")
-                        markdown_content.append(f"**Files in this section**: {section_data['file_count']}\n")
-                        markdown_content.append(f"**Modules**: {len(section_data['modules'])}\n")
-
-                        full_markdown = "\n".join(markdown_content)
+                        full_markdown = self._section_markdown(
+                            section, course_id, file.web_view_link
+                        )
                         content_bytes = full_markdown.encode("utf-8")
                         file_data = BytesIO(content_bytes)
 
@@ -1572,19 +1772,14 @@ class MoodleSync(BaseSync):
         else:
             file_url += f"?token={wstoken}"
 
-        logger.info(f"Downloading Moodle file: {file.name} from {file_url}")
-
-        response = requests.get(file_url, timeout=30)
-        response.raise_for_status()
+        logger.info(f"Downloading Moodle file: {file.name} from {file.web_view_link}")
 
-        file_data = BytesIO(response.content)
+        file_data = spooled_file()
+        async with self.client.astream(file_url) as response:
+            async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                file_data.write(chunk)
+        file_data.seek(0)
         return {
             "file_name": file.name,
             "content": file_data,
         }
-
-    async def adownload_file(
-        self, credentials: Dict, file: SyncFile
-    ) -> Dict[str, Union[str, BytesIO]]:
-        """Async version of download_file."""
-        return await asyncio.to_thread(self.download_file, credentials, file)
@@ -1,3 +1,4 @@
+import asyncio
 import io
 import os
 from datetime import datetime, timezone
@@ -16,6 +17,9 @@ from quivr_api.modules.notification.entity.notification import NotificationsStat
 from quivr_api.modules.notification.service.notification_service import (
     NotificationService,
 )
+from quivr_api.modules.notification.service.notification_writer import (
+    NotificationWriter,
+)
 from quivr_api.modules.sync.dto.inputs import SyncsActiveUpdateInput
 from quivr_api.modules.sync.entity.sync_models import (
     DBSyncFile,
@@ -59,15 +63,23 @@ def should_download_file(
     last_updated_sync_active: datetime | None,
     provider_name: str,
     datetime_format: str,
+    previous_file: DBSyncFile | None = None,
 ) -> bool:
-    file_last_modified_utc = datetime.strptime(
-        file.last_modified, datetime_format
-    ).replace(tzinfo=timezone.utc)
+    if file.content_hash is not None:
+        # Generated content (e.g. Moodle sections): compare against the hash
+        # stored on the last successful sync rather than the timestamp
+        should_download = (
+            previous_file is None or previous_file.content_hash != file.content_hash
+        )
+    else:
+        file_last_modified_utc = datetime.strptime(
+            file.last_modified, datetime_format
+        ).replace(tzinfo=timezone.utc)
 
-    should_download = (
-        last_updated_sync_active is None
-        or file_last_modified_utc > last_updated_sync_active
-    )
+        should_download = (
+            last_updated_sync_active is None
+            or file_last_modified_utc > last_updated_sync_active
+        )
 
     # TODO: Handle notion database
     if provider_name == "notion":
@@ -88,6 +100,7 @@ class SyncUtils:
         sync_cloud: BaseSync,
         notification_service: NotificationService,
         brain_vectors: BrainsVectors,
+        max_concurrency: int | None = None,
     ) -> None:
         self.sync_user_service = sync_user_service
         self.sync_active_service = sync_active_service
@@ -95,7 +108,15 @@ class SyncUtils:
         self.sync_files_repo = sync_files_repo
         self.sync_cloud = sync_cloud
         self.notification_service = notification_service
+        self.notification_writer = NotificationWriter(notification_service)
         self.brain_vectors = brain_vectors
+        # Defaults to the parallelism the provider declares as safe
+        self.max_concurrency = max(
+            1, max_concurrency or sync_cloud.max_concurrent_downloads
+        )
+        # The knowledge service shares a single AsyncSession, which can't be
+        # used concurrently: downloads and uploads run in parallel, DB writes don't
+        self._db_lock = asyncio.Lock()
 
     def _prepare_credentials(self, current_user: SyncsUser) -> dict[str, Any]:
         """
@@ -115,10 +136,8 @@ class SyncUtils:
     def create_sync_bulk_notification(
         self, files: list[SyncFile], current_user: UUID, brain_id: UUID, bulk_id: UUID
     ) -> list[SyncFile]:
-        res = []
-        # TODO: bulk insert in batch
-        for file in files:
-            upload_notification = self.notification_service.add_notification(
+        notifications = self.notification_writer.add_notifications(
+            [
                 CreateNotification(
                     user_id=current_user,
                     bulk_id=bulk_id,
@@ -127,10 +146,12 @@ class SyncUtils:
                     category="sync",
                     brain_id=str(brain_id),
                 )
-            )
-            file.notification_id = upload_notification.id
-            res.append(file)
-        return res
+                for file in files
+            ]
+        )
+        for file, notification in zip(files, notifications, strict=True):
+            file.notification_id = notification.id
+        return files
 
     async def download_file(
         self, file: SyncFile, current_user: SyncsUser
@@ -141,11 +162,11 @@ class SyncUtils:
         logger.debug(f"Fetch sync file response: {file_response}")
         file_name = str(file_response["file_name"])
         raw_data = file_response["content"]
-        file_data = (
-            io.BufferedReader(raw_data)  # type: ignore
-            if isinstance(raw_data, io.BytesIO)
-            else io.BufferedReader(raw_data.encode("utf-8"))  # type: ignore
-        )
+        if isinstance(raw_data, str):
+            raw_data = io.BytesIO(raw_data.encode("utf-8"))
+        # Providers return an in-memory or spooled file: wrapping it keeps the
+        # upload streaming from it instead of materializing the bytes
+        file_data = io.BufferedReader(raw_data)  # type: ignore
         extension = os.path.splitext(file_name)[-1].lower()
         dfile = DownloadedSyncFile(
             file_name=file_name,
@@ -166,9 +187,25 @@ class SyncUtils:
         sync_active: SyncsActive,
     ):
         logger.info("Processing file: %s", file.name)
+        downloaded_file = await self.download_file(file, current_user)
+        try:
+            return await self._store_sync_file(
+                file, downloaded_file, previous_file, current_user, sync_active
+            )
+        finally:
+            # Releases the spooled temp file as soon as it is in storage
+            downloaded_file.close()
+
+    async def _store_sync_file(
+        self,
+        file: SyncFile,
+        downloaded_file: DownloadedSyncFile,
+        previous_file: DBSyncFile | None,
+        current_user: SyncsUser,
+        sync_active: SyncsActive,
+    ):
         brain_id = sync_active.brain_id
         source, source_link = self.sync_cloud.name, file.web_view_link
-        downloaded_file = await self.download_file(file, current_user)
 
         if downloaded_file.extension not in [
             ".pdf",
@@ -185,7 +222,9 @@ class SyncUtils:
         # Sanitize only the filename part, not the brain_id path component
         sanitized_filename = sanitize_filename(downloaded_file.file_name)
         storage_path = f"{brain_id}/{sanitized_filename}"
-        exists_in_storage = check_file_exists(str(brain_id), sanitized_filename)
+        exists_in_storage = await asyncio.to_thread(
+            check_file_exists, str(brain_id), sanitized_filename
+        )
 
         response = await upload_file_storage(
             downloaded_file.file_data,
@@ -193,31 +232,38 @@ class SyncUtils:
             upsert=exists_in_storage,
         )
         assert response, f"Error uploading {downloaded_file} to  {storage_path}"
-        self.notification_service.update_notification_by_id(
+        # Written before the file is handed to process_file_task, whose final
+        # status must not be overwritten by this one
+        await self.notification_writer.update(
             file.notification_id,
             NotificationUpdatableProperties(
                 status=NotificationsStatusEnum.SUCCESS,
                 description="File downloaded successfully",
             ),
+            wait=True,
         )
         # TODO : why knowledge + syncfile, drop syncfile ...
         # FIXME : Simplify this logic in KMS plzzz
-        sync_file_db = self.sync_files_repo.update_or_create_sync_file(
+        # Supabase calls are blocking, they run off the event loop and outside
+        # the lock, which only guards the AsyncSession
+        sync_file_db = await asyncio.to_thread(
+            self.sync_files_repo.update_or_create_sync_file,
             file=file,
             previous_file=previous_file,
             sync_active=sync_active,
             supported=True,
         )
-        knowledge = await self.knowledge_service.update_or_create_knowledge_sync(
-            brain_id=brain_id,
-            file=file,
-            new_sync_file=sync_file_db,
-            prev_sync_file=previous_file,
-            downloaded_file=downloaded_file,
-            source=source,
-            source_link=source_link,
-            user_id=current_user.user_id,
-        )
+        async with self._db_lock:
+            knowledge = await self.knowledge_service.update_or_create_knowledge_sync(
+                brain_id=brain_id,
+                file=file,
+                new_sync_file=sync_file_db,
+                prev_sync_file=previous_file,
+                downloaded_file=downloaded_file,
+                source=source,
+                source_link=source_link,
+                user_id=current_user.user_id,
+            )
 
         # Send file for processing
         celery.send_task(
@@ -234,20 +280,61 @@ class SyncUtils:
         )
         return file
 
+    async def _process_sync_file_isolated(
+        self,
+        file: SyncFile,
+        previous_file: DBSyncFile | None,
+        current_user: SyncsUser,
+        sync_active: SyncsActive,
+    ) -> SyncFile | None:
+        try:
+            return await self.process_sync_file(
+                file=file,
+                previous_file=previous_file,
+                current_user=current_user,
+                sync_active=sync_active,
+            )
+
+        except Exception as e:
+            logger.error(
+                "An error occurred while syncing %s files: %s",
+                self.sync_cloud.name,
+                e,
+            )
+            # TODO: this process_sync_file could fail for a LOT of reason redo this logic
+            # File isn't supported so we set it as so ?
+            await asyncio.to_thread(
+                self.sync_files_repo.update_or_create_sync_file,
+                file=file,
+                sync_active=sync_active,
+                previous_file=previous_file,
+                supported=False,
+            )
+            await self.notification_writer.update(
+                file.notification_id,
+                NotificationUpdatableProperties(
+                    status=NotificationsStatusEnum.ERROR,
+                    description="Error downloading file",
+                ),
+            )
+            return None
+
     async def process_sync_files(
         self,
         files: List[SyncFile],
         current_user: SyncsUser,
         sync_active: SyncsActive,
     ):
-        logger.info(f"Processing {len(files)} for sync_active: {sync_active.id}")
+        logger.info(
+            f"Processing {len(files)} for sync_active: {sync_active.id} "
+            f"(max_concurrency={self.max_concurrency})"
+        )
         credentials = self._prepare_credentials(current_user)
         updated_credentials = self.sync_cloud.check_and_refresh_access_token(credentials)
         current_user.credentials = {k: v for k, v in updated_credentials.items()
                                     if k in (current_user.credentials or {})}
 
         bulk_id = uuid4()
-        downloaded_files = []
         list_existing_files = self.sync_files_repo.get_sync_files(sync_active.id)
         existing_files = {f.path: f for f in list_existing_files}
 
@@ -257,46 +344,25 @@ class SyncUtils:
             files, current_user.user_id, sync_active.brain_id, bulk_id
         )
 
-        for file, prev_file in supported_files:
-            try:
-                result = await self.process_sync_file(
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def _bounded(file: SyncFile, prev_file: DBSyncFile | None):
+            async with semaphore:
+                return await self._process_sync_file_isolated(
                     file=file,
                     previous_file=prev_file,
                     current_user=current_user,
                     sync_active=sync_active,
                 )
-                if result is not None:
-                    downloaded_files.append(result)
-
-                self.notification_service.update_notification_by_id(
-                    file.notification_id,
-                    NotificationUpdatableProperties(
-                        status=NotificationsStatusEnum.SUCCESS,
-                        description="File downloaded successfully",
-                    ),
-                )
 
-            except Exception as e:
-                logger.error(
-                    "An error occurred while syncing %s files: %s",
-                    self.sync_cloud.name,
-                    e,
-                )
-                # TODO: this process_sync_file could fail for a LOT of reason redo this logic
-                # File isn't supported so we set it as so ?
-                self.sync_files_repo.update_or_create_sync_file(
-                    file=file,
-                    sync_active=sync_active,
-                    previous_file=prev_file,
-                    supported=False,
-                )
-                self.notification_service.update_notification_by_id(
-                    file.notification_id,
-                    NotificationUpdatableProperties(
-                        status=NotificationsStatusEnum.ERROR,
-                        description="Error downloading file",
-                    ),
-                )
+        # gather keeps results in the input order, failures are isolated per file
+        try:
+            results = await asyncio.gather(
+                *(_bounded(file, prev_file) for file, prev_file in supported_files)
+            )
+        finally:
+            await self.notification_writer.flush()
+        downloaded_files = [result for result in results if result is not None]
 
         return {"downloaded_files": downloaded_files}
 
@@ -325,6 +391,10 @@ class SyncUtils:
             else None
         )
 
+        existing_files = {
+            f.path: f for f in self.sync_files_repo.get_sync_files(sync_active.id)
+        }
+
         files_ids = [
             file
             for file in files
@@ -333,6 +403,7 @@ class SyncUtils:
                 last_updated_sync_active=last_synced_time,
                 provider_name=self.sync_cloud.lower_name,
                 datetime_format=self.sync_cloud.datetime_format,
+                previous_file=existing_files.get(file.name),
             )
         ]
 
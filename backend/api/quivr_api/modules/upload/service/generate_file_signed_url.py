@@ -1,5 +1,9 @@
 import os
+import threading
+import time
+from collections import OrderedDict
 from multiprocessing import get_logger
+from typing import Dict, List, Tuple
 
 from quivr_api.modules.dependencies import get_supabase_client
 from supabase.client import Client
@@ -7,6 +11,8 @@ from supabase.client import Client
 logger = get_logger()
 
 SIGNED_URL_EXPIRATION_PERIOD_IN_SECONDS = 3600
+# Cached URLs are handed out for at most half their validity, so a client always gets 30+ minutes
+SIGNED_URL_CACHE_TTL_IN_SECONDS = SIGNED_URL_EXPIRATION_PERIOD_IN_SECONDS // 2
 EXTERNAL_SUPABASE_URL = os.getenv("EXTERNAL_SUPABASE_URL", None)
 SUPABASE_URL = os.getenv("SUPABASE_URL", None)
 
@@ -17,6 +23,98 @@ class SignedUrlGenerationError(Exception):
     pass
 
 
+class SignedUrlCache:
+    """TTL + LRU cache of signed URLs keyed by storage path."""
+
+    def __init__(
+        self,
+        ttl_seconds: float = SIGNED_URL_CACHE_TTL_IN_SECONDS,
+        max_entries: int = 10_000,
+    ):
+        assert (
+            ttl_seconds < SIGNED_URL_EXPIRATION_PERIOD_IN_SECONDS
+        ), "Signed URLs must not outlive their validity in the cache"
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, Tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, paths: List[str]) -> Dict[str, str]:
+        found = {}
+        now = time.monotonic()
+        with self._lock:
+            for path in paths:
+                entry = self._entries.get(path)
+                if entry is None:
+                    continue
+                signed_at, url = entry
+                if now - signed_at > self.ttl_seconds:
+                    del self._entries[path]
+                    continue
+                self._entries.move_to_end(path)
+                found[path] = url
+        return found
+
+    def set_many(self, urls: Dict[str, str]) -> None:
+        now = time.monotonic()
+        with self._lock:
+            for path, url in urls.items():
+                self._entries[path] = (now, url)
+                self._entries.move_to_end(path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+signed_url_cache = SignedUrlCache()
+
+
+def _external_url(signed_url: str) -> str:
+    # Replace the supabase url by the external supabase url
+    if EXTERNAL_SUPABASE_URL and SUPABASE_URL:
+        return signed_url.replace(SUPABASE_URL, EXTERNAL_SUPABASE_URL)
+    return signed_url
+
+
+def generate_file_signed_urls(paths: List[str]) -> Dict[str, str]:
+    """
+    Sign several storage paths with one storage request, served from the cache when possible.
+    Paths that could not be signed are left out of the result.
+    """
+    unique_paths = list(dict.fromkeys(paths))
+    urls = signed_url_cache.get_many(unique_paths)
+    missing = [path for path in unique_paths if path not in urls]
+    if not missing:
+        return urls
+
+    signed: Dict[str, str] = {}
+    try:
+        supabase_client: Client = get_supabase_client()
+        response = supabase_client.storage.from_("quivr").create_signed_urls(
+            missing,
+            SIGNED_URL_EXPIRATION_PERIOD_IN_SECONDS,
+            options={"download": True},
+        )
+        for item in response:
+            if item.get("signedURL") and not item.get("error"):
+                signed[item["path"]] = _external_url(item["signedURL"])
+    except Exception as e:
+        # A missing file fails the whole bulk request, sign the paths one by one instead
+        logger.warning(f"Bulk signed URL generation failed, signing one by one: {e}")
+        for path in missing:
+            try:
+                signed[path] = generate_file_signed_url(path)["signedURL"]
+            except SignedUrlGenerationError:
+                continue
+
+    signed_url_cache.set_many(signed)
+    urls.update(signed)
+    return urls
+
+
 def generate_file_signed_url(path):
     supabase_client: Client = get_supabase_client()
 
@@ -37,10 +135,7 @@ def generate_file_signed_url(path):
             raise SignedUrlGenerationError(f"Could not generate signed URL for file: {path}")
 
         # Replace in the response the supabase url by the external supabase url in the object signedURL
-        if EXTERNAL_SUPABASE_URL and SUPABASE_URL:
-            response["signedURL"] = response["signedURL"].replace(
-                SUPABASE_URL, EXTERNAL_SUPABASE_URL
-            )
+        response["signedURL"] = _external_url(response["signedURL"])
         return response
     except SignedUrlGenerationError:
         raise
@@ -0,0 +1,242 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Iterable, List, Set, Tuple
+
+from supabase import Client
+
+from quivr_api.logger import get_logger
+from quivr_api.modules.dependencies import get_supabase_client
+
+logger = get_logger(__name__)
+
+BUCKET = "quivr"
+LIST_PAGE_SIZE = 1000
+
+IndexKey = Tuple[str, str]
+
+
+def storage_path_key(file_identifier: str) -> str:
+    """Files are matched on their name up to the first dot, like the bucket listing check did."""
+    return file_identifier.split("/")[-1].split(".")[0]
+
+
+def split_storage_path(storage_path: str) -> Tuple[str, str] | None:
+    """Split `<brain_id>/<file name>` into its parts, None for other layouts."""
+    brain_id, _, file_name = storage_path.partition("/")
+    if not brain_id or not file_name or "/" in file_name:
+        return None
+    return brain_id, file_name
+
+
+class StorageExistenceIndex:
+    """
+    Persisted (brain_id, file name) index of the files in the `quivr` bucket.
+    Existence is checked on the path key, so `a.pdf` and `a.md` both answer
+    for `a`, and a key only goes away with the last of its files.
+
+    Rows live in the `storage_files` table. They are written on upload and
+    removed on delete, backfilled from `storage.objects` by the migration, and
+    reconciled against a paginated bucket listing by the
+    `reconcile_storage_index_task` beat task. Files found in an in-process
+    TTL + LRU skip the database; missing files are not cached, since another
+    process may upload them at any time. An existence check is a dict hit or
+    a single index query, never a listing.
+    """
+
+    def __init__(
+        self,
+        client: Client | None = None,
+        ttl_seconds: float = 60,
+        max_entries: int = 100_000,
+    ):
+        self._client = client
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: OrderedDict[IndexKey, float] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def client(self) -> Client:
+        if self._client is None:
+            self._client = get_supabase_client()
+        return self._client
+
+    def _cache_get(self, key: IndexKey) -> bool:
+        with self._lock:
+            cached_at = self._entries.get(key)
+            if cached_at is None:
+                return False
+            if time.monotonic() - cached_at > self.ttl_seconds:
+                del self._entries[key]
+                return False
+            self._entries.move_to_end(key)
+            return True
+
+    def _cache_set(self, key: IndexKey) -> None:
+        with self._lock:
+            self._entries[key] = time.monotonic()
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def exists(self, brain_id: str, file_identifier: str) -> bool:
+        key = (brain_id, storage_path_key(file_identifier))
+        if self._cache_get(key):
+            return True
+        response = (
+            self.client.table("storage_files")
+            .select("path_key")
+            .eq("brain_id", brain_id)
+            .eq("path_key", key[1])
+            .limit(1)
+            .execute()
+        )
+        exists = bool(response.data)
+        if exists:
+            self._cache_set(key)
+        return exists
+
+    def exists_many(self, files: Iterable[Tuple[str, str]]) -> Set[IndexKey]:
+        """The (brain_id, file identifier) pairs that exist, one query for misses."""
+        files = list(files)
+        found: Set[IndexKey] = set()
+        missing: Set[IndexKey] = set()
+        for brain_id, file_identifier in files:
+            key = (brain_id, storage_path_key(file_identifier))
+            if self._cache_get(key):
+                found.add((brain_id, file_identifier))
+            else:
+                missing.add(key)
+        if not missing:
+            return found
+        response = (
+            self.client.table("storage_files")
+            .select("brain_id, path_key")
+            .in_("brain_id", sorted({key[0] for key in missing}))
+            .in_("path_key", sorted({key[1] for key in missing}))
+            .execute()
+        )
+        indexed = {(str(row["brain_id"]), row["path_key"]) for row in response.data}
+        for key in missing & indexed:
+            self._cache_set(key)
+        for brain_id, file_identifier in files:
+            if (brain_id, storage_path_key(file_identifier)) in indexed:
+                found.add((brain_id, file_identifier))
+        return found
+
+    def add(self, brain_id: str, file_name: str) -> None:
+        key = (brain_id, storage_path_key(file_name))
+        self.client.table("storage_files").upsert(
+            {
+                "brain_id": brain_id,
+                "file_name": file_name,
+                "path_key": key[1],
+                "storage_path": f"{brain_id}/{file_name}",
+                "updated_at": datetime.now(timezone.utc).isoformat(),
+            }
+        ).execute()
+        self._cache_set(key)
+
+    def remove(self, brain_id: str, file_name: str) -> None:
+        key = (brain_id, storage_path_key(file_name))
+        self.client.table("storage_files").delete().eq("brain_id", brain_id).eq(
+            "file_name", file_name
+        ).execute()
+        # Other files may share the key, the next check looks it up again
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def add_storage_path(self, storage_path: str) -> None:
+        parts = split_storage_path(storage_path)
+        if parts is not None:
+            self.add(*parts)
+
+    def remove_storage_paths(self, storage_paths: List[str]) -> None:
+        for storage_path in storage_paths:
+            parts = split_storage_path(storage_path)
+            if parts is not None:
+                self.remove(*parts)
+
+    def _list_brain_files(self, brain_id: str) -> List[str]:
+        names: List[str] = []
+        offset = 0
+        while True:
+            page = self.client.storage.from_(BUCKET).list(
+                brain_id, {"limit": LIST_PAGE_SIZE, "offset": offset}
+            )
+            names.extend(item["name"] for item in page)
+            if len(page) < LIST_PAGE_SIZE:
+                return names
+            offset += LIST_PAGE_SIZE
+
+    def _indexed_file_names(self, brain_id: str) -> List[str]:
+        names: List[str] = []
+        while True:
+            page = (
+                self.client.table("storage_files")
+                .select("file_name")
+                .eq("brain_id", brain_id)
+                .order("file_name")
+                .range(len(names), len(names) + LIST_PAGE_SIZE - 1)
+                .execute()
+            ).data
+            names.extend(row["file_name"] for row in page)
+            if len(page) < LIST_PAGE_SIZE:
+                return names
+
+    def reconcile(self, brain_id: str) -> int:
+        """Sync a brain's index rows with the bucket listing, returns the file count."""
+        # Rows written after this point are newer than the listing and are kept
+        listed_at = datetime.now(timezone.utc).isoformat()
+        stored = set(self._list_brain_files(brain_id))
+        indexed = set(self._indexed_file_names(brain_id))
+        rows = [
+            {
+                "brain_id": brain_id,
+                "file_name": name,
+                "path_key": storage_path_key(name),
+                "storage_path": f"{brain_id}/{name}",
+                "updated_at": listed_at,
+            }
+            for name in sorted(stored - indexed)
+        ]
+        stale = sorted(indexed - stored)
+        for start in range(0, len(rows), LIST_PAGE_SIZE):
+            self.client.table("storage_files").upsert(
+                rows[start : start + LIST_PAGE_SIZE], ignore_duplicates=True
+            ).execute()
+        for start in range(0, len(stale), LIST_PAGE_SIZE):
+            self.client.table("storage_files").delete().eq("brain_id", brain_id).in_(
+                "file_name", stale[start : start + LIST_PAGE_SIZE]
+            ).lt("updated_at", listed_at).execute()
+
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == brain_id]:
+                del self._entries[key]
+        logger.info(
+            f"Reconciled storage index of brain {brain_id}: {len(stored)} files, "
+            f"{len(rows)} added, {len(stale)} stale"
+        )
+        return len(stored)
+
+    def reconcile_all(self) -> None:
+        response = self.client.table("brains").select("brain_id").execute()
+        for row in response.data:
+            try:
+                self.reconcile(str(row["brain_id"]))
+            except Exception as e:
+                logger.error(
+                    f"Error reconciling storage index of brain {row['brain_id']}: {e}"
+                )
+
+
+_storage_index: StorageExistenceIndex | None = None
+
+
+def get_storage_index() -> StorageExistenceIndex:
+    global _storage_index
+    if _storage_index is None:
+        _storage_index = StorageExistenceIndex()
+    return _storage_index
@@ -1,28 +1,20 @@
 import mimetypes
 from io import BufferedReader, FileIO
+from typing import List, Set, Tuple
 
 from quivr_api.logger import get_logger
-from quivr_api.modules.dependencies import (
-    get_supabase_async_client,
-    get_supabase_client,
-)
-from supabase import Client
+from quivr_api.modules.dependencies import get_supabase_async_client
+from quivr_api.modules.upload.service.storage_index import get_storage_index
 
 logger = get_logger(__name__)
 
 
 def check_file_exists(brain_id: str, file_identifier: str) -> bool:
-    supabase_client: Client = get_supabase_client()
     try:
         # Check if the file exists
         logger.info(f"Checking if file {file_identifier} exists.")
-        # This needs to be converted into a file_identifier that is safe for a URL
-        response = supabase_client.storage.from_("quivr").list(brain_id)
-        # Check if the file_identifier is in the response
-        file_exists = any(
-            file["name"].split(".")[0] == file_identifier.split(".")[0]
-            for file in response
-        )
+        # Served by the storage existence index instead of listing the brain folder
+        file_exists = get_storage_index().exists(brain_id, file_identifier)
         if file_exists:
             logger.info(f"File {file_identifier} exists.")
             return True
@@ -34,6 +26,15 @@ def check_file_exists(brain_id: str, file_identifier: str) -> bool:
         return True
 
 
+def check_files_exist(files: List[Tuple[str, str]]) -> Set[Tuple[str, str]]:
+    """Batched `check_file_exists` over (brain_id, file_identifier) pairs."""
+    try:
+        return get_storage_index().exists_many(files)
+    except Exception as e:
+        logger.error(f"An error occurred while checking the files: {e}")
+        return set(files)
+
+
 async def upload_file_storage(
     file: FileIO | BufferedReader | bytes,
     storage_path: str,
@@ -55,6 +56,7 @@ async def upload_file_storage(
                 "cache-control": "3600",
             },
         )
+        get_storage_index().add_storage_path(storage_path)
         return response
     else:
         # check if file sha1 is already in storage
@@ -68,6 +70,7 @@ async def upload_file_storage(
                     "cache-control": "3600",
                 },
             )
+            get_storage_index().add_storage_path(storage_path)
             return response
         except Exception as e:
             if "The resource already exists" in str(e) and not upsert:
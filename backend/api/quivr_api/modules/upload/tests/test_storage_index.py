@@ -0,0 +1,189 @@
+from types import SimpleNamespace
+
+from quivr_api.modules.upload.service.storage_index import StorageExistenceIndex
+
+
+class FakeQuery:
+    def __init__(self, table: "FakeTable", action: str, payload=None):
+        self.table = table
+        self.action = action
+        self.payload = payload
+        self.filters = []
+        self.bounds = None
+
+    def select(self, *_):
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: row[column] == value)
+        return self
+
+    def in_(self, column, values):
+        self.filters.append(lambda row: row[column] in values)
+        return self
+
+    def lt(self, column, value):
+        self.filters.append(lambda row: row[column] < value)
+        return self
+
+    def order(self, column):
+        return self
+
+    def limit(self, n):
+        self.bounds = (0, n - 1)
+        return self
+
+    def range(self, start, end):
+        self.bounds = (start, end)
+        return self
+
+    def execute(self):
+        self.table.queries.append(self.action)
+        if self.action == "upsert":
+            rows = self.payload if isinstance(self.payload, list) else [self.payload]
+            for row in rows:
+                self.table.rows[(row["brain_id"], row["file_name"])] = row
+            return SimpleNamespace(data=rows)
+        matching = [
+            row for row in self.table.rows.values() if all(f(row) for f in self.filters)
+        ]
+        if self.action == "delete":
+            for row in matching:
+                del self.table.rows[(row["brain_id"], row["file_name"])]
+        if self.bounds:
+            matching = matching[self.bounds[0] : self.bounds[1] + 1]
+        return SimpleNamespace(data=matching)
+
+
+class FakeTable:
+    def __init__(self):
+        self.rows = {}
+        self.queries = []
+
+    def select(self, *_):
+        return FakeQuery(self, "select")
+
+    def upsert(self, payload, ignore_duplicates=False):
+        return FakeQuery(self, "upsert", payload)
+
+    def delete(self):
+        return FakeQuery(self, "delete")
+
+
+class FakeSupabase:
+    def __init__(self, bucket_files, on_list=None):
+        self.bucket_files = bucket_files
+        self.listings = 0
+        self.on_list = on_list
+        self.storage_files = FakeTable()
+        self.storage = SimpleNamespace(from_=lambda _: self)
+
+    def table(self, name):
+        assert name == "storage_files"
+        return self.storage_files
+
+    def list(self, brain_id, options):
+        self.listings += 1
+        if self.on_list:
+            self.on_list()
+        names = self.bucket_files.get(brain_id, [])
+        page = names[options["offset"] : options["offset"] + options["limit"]]
+        return [{"name": name} for name in page]
+
+
+def test_storage_index_checks_without_listing():
+    client = FakeSupabase({"brain": [f"file_{idx}.pdf" for idx in range(2500)]})
+    index = StorageExistenceIndex(client=client)
+
+    # The reconcile task backfills the brain from a paginated listing
+    assert not index.exists("brain", "file_42.pdf")
+    assert index.reconcile("brain") == 2500
+    assert client.listings == 3
+    assert len(client.storage_files.rows) == 2500
+
+    assert index.exists("brain", "file_42.pdf")
+    assert index.exists("brain", "file_42.md")
+    assert not index.exists("brain", "missing.pdf")
+    assert client.listings == 3
+
+    queries = len(client.storage_files.queries)
+    assert index.exists("brain", "file_42.pdf")
+    assert len(client.storage_files.queries) == queries
+
+
+def test_storage_index_does_not_cache_missing_files():
+    client = FakeSupabase({})
+    index = StorageExistenceIndex(client=client)
+    assert not index.exists("brain", "a.pdf")
+
+    # Uploaded by another process
+    StorageExistenceIndex(client=client).add_storage_path("brain/a.pdf")
+    assert index.exists("brain", "a.pdf")
+
+
+def test_storage_index_upload_delete_and_reconcile():
+    client = FakeSupabase({"brain": ["a.pdf"]})
+    index = StorageExistenceIndex(client=client)
+    assert not index.exists("brain", "b.pdf")
+
+    index.add_storage_path("brain/b.pdf")
+    assert index.exists("brain", "b.pdf")
+    index.remove_storage_paths(["brain/b.pdf", "not-a-brain-path"])
+    assert not index.exists("brain", "b.pdf")
+
+    # Files uploaded or deleted behind the index's back are picked up on reconcile
+    client.bucket_files["brain"] = ["c.txt"]
+    assert index.reconcile("brain") == 1
+    assert not index.exists("brain", "a.pdf")
+    assert index.exists("brain", "c.txt")
+    assert set(client.storage_files.rows) == {("brain", "c.txt")}
+
+
+def test_storage_index_keeps_key_shared_by_other_files():
+    client = FakeSupabase({"brain": ["a.pdf", "a.md"]})
+    index = StorageExistenceIndex(client=client)
+    index.reconcile("brain")
+    assert index.exists("brain", "a.txt")
+
+    index.remove_storage_paths(["brain/a.pdf"])
+    assert index.exists("brain", "a.pdf")
+    index.remove_storage_paths(["brain/a.md"])
+    assert not index.exists("brain", "a.md")
+
+    client.bucket_files["brain"] = ["b.pdf", "b.md"]
+    index.reconcile("brain")
+    assert set(client.storage_files.rows) == {("brain", "b.pdf"), ("brain", "b.md")}
+
+
+def test_storage_index_reconcile_keeps_files_indexed_during_listing():
+    client = FakeSupabase({"brain": ["a.pdf"]})
+    index = StorageExistenceIndex(client=client)
+    index.reconcile("brain")
+    client.storage_files.rows[("brain", "a.pdf")]["updated_at"] = "2000-01-01"
+
+    # Uploaded after the listing was taken, and a.pdf deleted behind the index
+    client.bucket_files["brain"] = []
+    client.on_list = lambda: index.add_storage_path("brain/b.pdf")
+    assert index.reconcile("brain") == 0
+    assert set(client.storage_files.rows) == {("brain", "b.pdf")}
+    assert index.exists("brain", "b.pdf")
+
+
+def test_storage_index_exists_many_in_one_query():
+    client = FakeSupabase({"b1": ["a.pdf", "b.md"], "b2": ["c.txt"]})
+    index = StorageExistenceIndex(client=client)
+    index.reconcile("b1")
+    index.reconcile("b2")
+
+    queries = len(client.storage_files.queries)
+    files = [("b1", "a.pdf"), ("b1", "b.pdf"), ("b2", "a.pdf"), ("b2", "c.txt")]
+    assert index.exists_many(files) == {
+        ("b1", "a.pdf"),
+        ("b1", "b.pdf"),
+        ("b2", "c.txt"),
+    }
+    assert len(client.storage_files.queries) == queries + 1
+
+    # Found files are cached
+    assert index.exists_many(files[:2]) == {("b1", "a.pdf"), ("b1", "b.pdf")}
+    assert len(client.storage_files.queries) == queries + 1
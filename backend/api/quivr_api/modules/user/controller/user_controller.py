@@ -3,6 +3,8 @@ from typing import Annotated
 from fastapi import APIRouter, Depends, Request
 
 from quivr_api.middlewares.auth import AuthBearer, get_current_user
+from quivr_api.middlewares.auth.identity_cache import get_identity_cache
+from quivr_api.modules.brain.service.brain_access_cache import get_brain_access_cache
 from quivr_api.modules.brain.service.brain_user_service import BrainUserService
 from quivr_api.modules.dependencies import get_service
 from quivr_api.modules.models.service.model_service import ModelService
@@ -108,6 +110,8 @@ async def delete_user_data_route(
     """
 
     user_repository.delete_user_data(current_user.id)
+    get_identity_cache().invalidate_user(current_user.id)
+    get_brain_access_cache().invalidate_user(current_user.id)
 
     return {"message": "User deleted successfully"}
 
@@ -4,21 +4,146 @@ from uuid import UUID
 from quivr_api.logger import get_logger
 from quivr_api.modules.dependencies import BaseRepository
 from quivr_api.modules.vector.entity.vector import SimilaritySearchOutput, Vector
-from sqlalchemy import exc, text
+from sqlalchemy import exc, insert, text
 from sqlmodel import Session, select
 
 logger = get_logger(__name__)
 
+ANN_SIMILARITY_QUERY = text("""
+    WITH candidates AS (
+        SELECT
+            v.id AS vector_id,
+            kb.brain_id AS vector_brain_id,
+            v.knowledge_id AS vector_knowledge_id,
+            v.content AS vector_content,
+            v.metadata AS vector_metadata,
+            v.embedding AS vector_embedding,
+            v.embedding <=> (:query_embedding)::vector AS distance,
+            (v.metadata->>'chunk_size')::integer AS chunk_size
+        FROM
+            vectors v
+        INNER JOIN
+            knowledge_brain kb ON v.knowledge_id = kb.knowledge_id
+        WHERE
+            kb.brain_id = :p_brain_id
+        ORDER BY
+            v.embedding <=> (:query_embedding)::vector
+        LIMIT :candidates
+    ), filtered_vectors AS (
+        SELECT
+            *,
+            sum(chunk_size) OVER (ORDER BY distance) AS running_total,
+            count(*) OVER () AS n_candidates
+        FROM candidates
+    )
+    SELECT
+        vector_id AS id,
+        vector_brain_id AS brain_id,
+        vector_knowledge_id AS knowledge_id,
+        vector_content AS content,
+        vector_metadata AS metadata,
+        vector_embedding AS embedding,
+        1 - distance AS similarity,
+        n_candidates
+    FROM filtered_vectors
+    WHERE running_total <= :max_chunk_sum
+    ORDER BY distance
+    LIMIT :k
+""")
+
+# Full scan of the brain, used when the ANN scan can't find k candidates
+EXACT_SIMILARITY_QUERY = text("""
+    WITH ranked_vectors AS (
+        SELECT
+            v.id AS vector_id,
+            kb.brain_id AS vector_brain_id,
+            v.knowledge_id AS vector_knowledge_id,
+            v.content AS vector_content,
+            v.metadata AS vector_metadata,
+            v.embedding AS vector_embedding,
+            1 - (v.embedding <=> (:query_embedding)::vector) AS calculated_similarity,
+            (v.metadata->>'chunk_size')::integer AS chunk_size
+        FROM
+            vectors v
+        INNER JOIN
+            knowledge_brain kb ON v.knowledge_id = kb.knowledge_id
+        WHERE
+            kb.brain_id = :p_brain_id
+    ), filtered_vectors AS (
+        SELECT
+            *,
+            sum(chunk_size) OVER (ORDER BY calculated_similarity DESC) AS running_total
+        FROM ranked_vectors
+    )
+    SELECT
+        vector_id AS id,
+        vector_brain_id AS brain_id,
+        vector_knowledge_id AS knowledge_id,
+        vector_content AS content,
+        vector_metadata AS metadata,
+        vector_embedding AS embedding,
+        calculated_similarity AS similarity
+    FROM filtered_vectors
+    WHERE running_total <= :max_chunk_sum
+    ORDER BY calculated_similarity DESC
+    LIMIT :k
+""")
+
+
+_iterative_scan_supported: bool | None = None
+
+
+def _supports_iterative_scan(session: Session) -> bool:
+    """pgvector 0.8 added iterative index scans (`hnsw.iterative_scan`)."""
+    global _iterative_scan_supported
+    if _iterative_scan_supported is None:
+        version = session.execute(
+            text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+        ).scalar()
+        _iterative_scan_supported = version is not None and tuple(
+            int(part) for part in version.split(".")[:2]
+        ) >= (0, 8)
+    return _iterative_scan_supported
+
 
 class VectorRepository(BaseRepository):
     def __init__(self, session: Session):
         super().__init__(session)
         self.session = session
 
-    def create_vectors(self, new_vectors: List[Vector]) -> List[Vector]:
+    def create_vectors(
+        self, new_vectors: List[Vector], batch_size: int = 500
+    ) -> List[Vector]:
+        """
+        Bulk insert vectors with multi-row `INSERT ... RETURNING id`.
+
+        Args:
+            new_vectors (List[Vector]): Vectors to insert, in chunk order.
+            batch_size (int): Rows per INSERT statement.
+
+        Returns:
+            List[Vector]: The same vectors with their generated IDs set.
+        """
         try:
-            # Use SQLAlchemy session to add and commit the new vector
-            self.session.add_all(new_vectors)
+            for start in range(0, len(new_vectors), batch_size):
+                batch = new_vectors[start : start + batch_size]
+                # Rows keep the chunk order and the IDs come back in that order,
+                # instead of one SELECT per row to refresh them
+                result = self.session.execute(
+                    insert(Vector).returning(Vector.id, sort_by_parameter_order=True),
+                    [
+                        {
+                            "content": vector.content,
+                            "metadata_": vector.metadata_,
+                            "embedding": vector.embedding,
+                            "knowledge_id": vector.knowledge_id,
+                        }
+                        for vector in batch
+                    ],
+                )
+                vector_ids = result.scalars().all()
+                for vector, vector_id in zip(batch, vector_ids, strict=True):
+                    vector.id = vector_id
             self.session.commit()
         except exc.IntegrityError:
             # Rollback the session if there’s an IntegrityError
@@ -29,10 +154,6 @@ class VectorRepository(BaseRepository):
             print(f"Error: {e}")
             raise Exception(f"An error occurred while creating vector: {e}")
 
-        # Refresh the session to get any updated fields (like auto-generated IDs)
-        for vector in new_vectors:
-            self.session.refresh(vector)
-
         return new_vectors
 
     def get_vectors_by_knowledge_id(self, knowledge_id: UUID) -> Sequence[Vector]:
@@ -46,63 +167,53 @@ class VectorRepository(BaseRepository):
         brain_id: UUID,
         k: int = 40,
         max_chunk_sum: int = 10000,  # Example value
+        candidates: int = 100,
         **kwargs: Any,
     ) -> Sequence[SimilaritySearchOutput]:
-        sql_query = text("""
-            WITH ranked_vectors AS (
-            SELECT
-                v.id AS vector_id,
-                kb.brain_id AS vector_brain_id,
-                v.knowledge_id AS vector_knowledge_id,
-                v.content AS vector_content,
-                v.metadata AS vector_metadata,
-                v.embedding AS vector_embedding,
-                1 - (v.embedding <=> (:query_embedding)::vector) AS calculated_similarity,
-                (v.metadata->>'chunk_size')::integer AS chunk_size
-            FROM
-                vectors v
-            INNER JOIN
-                knowledge_brain kb ON v.knowledge_id = kb.knowledge_id
-            WHERE
-                kb.brain_id = :p_brain_id
-            ORDER BY
-                calculated_similarity DESC
-        ), filtered_vectors AS (
-            SELECT
-                vector_id,
-                vector_brain_id,
-                vector_knowledge_id,
-                vector_content,
-                vector_metadata,
-                vector_embedding,
-                calculated_similarity,
-                chunk_size,
-                sum(chunk_size) OVER (ORDER BY calculated_similarity DESC) AS running_total
-            FROM ranked_vectors
-        )
-        SELECT
-            vector_id AS id,
-            vector_brain_id AS brain_id,
-            vector_knowledge_id AS knowledge_id,
-            vector_content AS content,
-            vector_metadata AS metadata,
-            vector_embedding AS embedding,
-            calculated_similarity AS similarity
-        FROM filtered_vectors
-        WHERE running_total <= :max_chunk_sum
-        LIMIT :k
-        """)
+        """
+        Top-k vectors of a brain within a chunk-size budget.
+
+        The nearest `candidates` vectors are fetched with an index-driven
+        `ORDER BY embedding <=> query LIMIT`, so the HNSW index is used instead of
+        scoring and sorting the whole brain. The running chunk-size budget is then
+        applied to that small candidate set. With pgvector >= 0.8 the index scan is
+        iterative: it keeps walking the graph until enough vectors of the brain are
+        found (up to `hnsw.max_scan_tuples`), so a small brain in a large table
+        still gets its candidates from the index. If the ANN scan comes back with
+        fewer than `k` candidates the exact scan is used instead.
 
+        Args:
+            query_embedding (List[float]): Embedding of the query.
+            brain_id (UUID): Brain to search.
+            k (int): Maximum number of vectors to return.
+            max_chunk_sum (int): Maximum sum of the returned chunk sizes.
+            candidates (int): Nearest neighbours fetched before applying the budget.
+
+        Returns:
+            Sequence[SimilaritySearchOutput]: Matching vectors, most similar first.
+        """
+        n_candidates = max(k, candidates)
         params = {
             "query_embedding": query_embedding,
             "p_brain_id": brain_id,
             "k": k,
             "max_chunk_sum": max_chunk_sum,
+            "candidates": n_candidates,
         }
+        # Let HNSW return enough neighbours for the brain filter and the candidate limit
+        self.session.execute(
+            text(f"SET LOCAL hnsw.ef_search = {min(max(n_candidates, 40), 1000)}")
+        )
+        if _supports_iterative_scan(self.session):
+            # The brain filter is applied while scanning the index instead of to
+            # the global nearest neighbours only. Candidates are re-sorted by
+            # distance afterwards, so the relaxed order is enough.
+            self.session.execute(text("SET LOCAL hnsw.iterative_scan = relaxed_order"))
+        rows = self.session.execute(ANN_SIMILARITY_QUERY, params=params).all()
+        if len(rows) < k and (not rows or rows[0].n_candidates < k):
+            rows = self.session.execute(EXACT_SIMILARITY_QUERY, params=params).all()
 
-        result = self.session.execute(sql_query, params=params)
-        full_results = result.all()
-        formated_result = [
+        return [
             SimilaritySearchOutput(
                 id=row.id,
                 brain_id=row.brain_id,
@@ -112,6 +223,5 @@ class VectorRepository(BaseRepository):
                 embedding=row.embedding,
                 similarity=row.similarity,
             )
-            for row in full_results
+            for row in rows
         ]
-        return formated_result
@@ -0,0 +1,370 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from abc import ABC, abstractmethod
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from langchain_core.embeddings import Embeddings
+from langchain_openai import AzureOpenAIEmbeddings
+from sqlalchemy import Engine, bindparam, text
+
+from quivr_api.logger import get_logger
+from quivr_api.models.settings import EmbeddingSettings
+from quivr_api.modules.dependencies import sync_engine
+
+logger = get_logger(__name__)
+
+Embedding = List[float]
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_chunk_text(content: str) -> str:
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", content)).strip()
+
+
+def embedding_model_id(embedder: Embeddings) -> str:
+    """Identify the model behind an embeddings client, so vectors of different models never mix."""
+    if isinstance(embedder, AzureOpenAIEmbeddings) and embedder.deployment:
+        model = embedder.deployment
+    else:
+        # OpenAIEmbeddings.deployment defaults to ada-002 whatever the model is
+        model = getattr(embedder, "model", None) or getattr(embedder, "size", None) or ""
+    model_id = f"{type(embedder).__name__}:{model}"
+    dimensions = getattr(embedder, "dimensions", None)
+    if dimensions:
+        model_id += f":{dimensions}"
+    return model_id
+
+
+def embedding_cache_key(model_id: str, content: str) -> str:
+    digest = hashlib.sha256(normalize_chunk_text(content).encode("utf-8")).hexdigest()
+    return f"{model_id}:{digest}"
+
+
+class EmbeddingCacheBackend(ABC):
+    @abstractmethod
+    def get_many(self, keys: Sequence[str]) -> Dict[str, Embedding]:
+        pass
+
+    @abstractmethod
+    def set_many(self, model_id: str, items: Dict[str, Embedding]) -> None:
+        pass
+
+
+class InMemoryEmbeddingCache(EmbeddingCacheBackend):
+    """Per-process LRU, enough for re-embedding within a worker's lifetime."""
+
+    def __init__(self, max_entries: int = 50_000):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, Embedding] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, Embedding]:
+        found = {}
+        with self._lock:
+            for key in keys:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    found[key] = self._entries[key]
+        return found
+
+    def set_many(self, model_id: str, items: Dict[str, Embedding]) -> None:
+        with self._lock:
+            for key, embedding in items.items():
+                self._entries[key] = embedding
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class SQLiteEmbeddingCache(EmbeddingCacheBackend):
+    """Local disk cache shared by the worker processes of one host."""
+
+    def __init__(self, path: str):
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS embedding_cache "
+            "(key TEXT PRIMARY KEY, model TEXT NOT NULL, embedding BLOB NOT NULL)"
+        )
+        self._connection.commit()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, Embedding]:
+        found = {}
+        with self._lock:
+            # Stay under SQLite's bound parameter limit
+            for start in range(0, len(keys), 500):
+                batch = keys[start : start + 500]
+                rows = self._connection.execute(
+                    "SELECT key, embedding FROM embedding_cache WHERE key IN "
+                    f"({','.join('?' * len(batch))})",
+                    list(batch),
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = array("f", blob).tolist()
+        return found
+
+    def set_many(self, model_id: str, items: Dict[str, Embedding]) -> None:
+        with self._lock:
+            self._connection.executemany(
+                "INSERT OR IGNORE INTO embedding_cache (key, model, embedding) VALUES (?, ?, ?)",
+                [
+                    (key, model_id, array("f", embedding).tobytes())
+                    for key, embedding in items.items()
+                ],
+            )
+            self._connection.commit()
+
+
+class PostgresEmbeddingCache(EmbeddingCacheBackend):
+    """`embedding_cache` table, shared by every worker and the API."""
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, Embedding]:
+        query = text(
+            "SELECT key, embedding::text AS embedding FROM embedding_cache WHERE key IN :keys"
+        ).bindparams(bindparam("keys", expanding=True))
+        with self.engine.connect() as connection:
+            rows = connection.execute(query, {"keys": list(keys)}).all()
+        return {
+            row.key: [float(value) for value in row.embedding.strip("[]").split(",")]
+            for row in rows
+        }
+
+    def set_many(self, model_id: str, items: Dict[str, Embedding]) -> None:
+        query = text(
+            "INSERT INTO embedding_cache (key, model, embedding) "
+            "VALUES (:key, :model, (:embedding)::vector) ON CONFLICT (key) DO NOTHING"
+        )
+        with self.engine.begin() as connection:
+            connection.execute(
+                query,
+                [
+                    {"key": key, "model": model_id, "embedding": str(embedding)}
+                    for key, embedding in items.items()
+                ],
+            )
+
+
+class RedisEmbeddingCache(EmbeddingCacheBackend):
+    """Redis keys with a TTL, shared by every replica of the API."""
+
+    def __init__(self, url: str, ttl_seconds: int, prefix: str = "embedding:"):
+        import redis
+
+        self._client = redis.Redis.from_url(url)
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, Embedding]:
+        values = self._client.mget([self.prefix + key for key in keys])
+        return {
+            key: array("f", value).tolist()  # type: ignore
+            for key, value in zip(keys, values, strict=True)
+            if value is not None
+        }
+
+    def set_many(self, model_id: str, items: Dict[str, Embedding]) -> None:
+        pipeline = self._client.pipeline(transaction=False)
+        for key, embedding in items.items():
+            pipeline.set(
+                self.prefix + key, array("f", embedding).tobytes(), ex=self.ttl_seconds
+            )
+        pipeline.execute()
+
+
+@dataclass
+class EmbeddingCacheStats:
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __str__(self) -> str:
+        return f"{self.hits}/{self.hits + self.misses} hits ({self.hit_rate:.0%})"
+
+
+class EmbeddingCache:
+    """
+    Content-addressed embeddings in front of an embeddings client.
+
+    Chunks are keyed by the model id and the sha256 of their normalized text,
+    so unchanged chunks of a re-synced or re-uploaded document skip the
+    embedding API. Backend errors are logged and treated as misses.
+    """
+
+    def __init__(self, backend: EmbeddingCacheBackend, model_id: str):
+        self.backend = backend
+        self.model_id = model_id
+
+    def embed_documents(
+        self, texts: List[str], embed: Callable[[List[str]], List[Embedding]]
+    ) -> Tuple[List[Embedding], EmbeddingCacheStats]:
+        keys = [embedding_cache_key(self.model_id, content) for content in texts]
+        try:
+            cached = self.backend.get_many(list(set(keys)))
+        except Exception as e:
+            logger.warning(f"Embedding cache lookup failed: {e}")
+            cached = {}
+
+        # Identical chunks within a document are embedded once
+        missing: Dict[str, str] = {}
+        for key, content in zip(keys, texts, strict=True):
+            if key not in cached and key not in missing:
+                missing[key] = content
+        stats = EmbeddingCacheStats(
+            hits=sum(1 for key in keys if key in cached),
+            misses=sum(1 for key in keys if key not in cached),
+        )
+
+        if missing:
+            embeddings = embed(list(missing.values()))
+            embedded = dict(zip(missing.keys(), embeddings, strict=True))
+            try:
+                self.backend.set_many(self.model_id, embedded)
+            except Exception as e:
+                logger.warning(f"Embedding cache write failed: {e}")
+            cached.update(embedded)
+
+        return [cached[key] for key in keys], stats
+
+
+class QueryEmbeddingCache:
+    """
+    Embeddings of search queries (rewritten questions), keyed by model and query text.
+
+    A per-process TTL + LRU sits in front of an optional shared backend, so a
+    question asked again, or searched in several brains, costs no embedding call.
+    Queries are embedded as documents, on the text as asked, like the search did
+    before the cache: models with distinct query embeddings would rank otherwise.
+    """
+
+    def __init__(
+        self,
+        embedder: Embeddings,
+        max_entries: int = 10_000,
+        ttl_seconds: float = 24 * 3600,
+        shared: EmbeddingCacheBackend | None = None,
+    ):
+        self.embedder = embedder
+        self.model_id = embedding_model_id(embedder)
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.shared = shared
+        self.stats = EmbeddingCacheStats()
+        self._entries: OrderedDict[str, Tuple[float, Embedding]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get_local(self, key: str) -> Embedding | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            cached_at, embedding = entry
+            if time.monotonic() - cached_at > self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return embedding
+
+    def _set_local(self, key: str, embedding: Embedding) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), embedding)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def embed_query(self, query: str) -> Embedding:
+        key = f"{self.model_id}:{hashlib.sha256(query.encode('utf-8')).hexdigest()}"
+        embedding = self._get_local(key)
+        if embedding is None and self.shared is not None:
+            try:
+                embedding = self.shared.get_many([key]).get(key)
+            except Exception as e:
+                logger.warning(f"Shared query embedding cache lookup failed: {e}")
+            if embedding is not None:
+                self._set_local(key, embedding)
+        if embedding is not None:
+            with self._lock:
+                self.stats.hits += 1
+            return embedding
+
+        embedding = self.embedder.embed_documents([query])[0]
+        with self._lock:
+            self.stats.misses += 1
+        self._set_local(key, embedding)
+        if self.shared is not None:
+            try:
+                self.shared.set_many(self.model_id, {key: embedding})
+            except Exception as e:
+                logger.warning(f"Shared query embedding cache write failed: {e}")
+        return embedding
+
+
+_embedding_cache_backend: EmbeddingCacheBackend | None = None
+
+
+def get_embedding_cache_backend() -> EmbeddingCacheBackend:
+    global _embedding_cache_backend
+    if _embedding_cache_backend is None:
+        settings = EmbeddingSettings()
+        if settings.embedding_cache_backend == "postgres":
+            _embedding_cache_backend = PostgresEmbeddingCache(sync_engine)
+        elif settings.embedding_cache_backend == "sqlite":
+            _embedding_cache_backend = SQLiteEmbeddingCache(
+                settings.embedding_cache_path
+            )
+        else:
+            _embedding_cache_backend = InMemoryEmbeddingCache(
+                settings.embedding_cache_max_entries
+            )
+        logger.info(
+            f"Using {type(_embedding_cache_backend).__name__} for embedding cache"
+        )
+    return _embedding_cache_backend
+
+
+def get_embedding_cache(embedder: Embeddings) -> EmbeddingCache:
+    return EmbeddingCache(get_embedding_cache_backend(), embedding_model_id(embedder))
+
+
+_query_embedding_caches: Dict[int, QueryEmbeddingCache] = {}
+_query_caches_lock = threading.Lock()
+
+
+def get_query_embedding_cache(embedder: Embeddings) -> QueryEmbeddingCache:
+    """Process-wide query embedding cache per embedding client."""
+    with _query_caches_lock:
+        cache = _query_embedding_caches.get(id(embedder))
+        if cache is None or cache.embedder is not embedder:
+            settings = EmbeddingSettings()
+            shared = None
+            if settings.query_embedding_cache_backend == "redis":
+                shared = RedisEmbeddingCache(
+                    settings.query_embedding_cache_redis_url
+                    or os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0"),
+                    ttl_seconds=settings.query_embedding_cache_ttl_seconds,
+                    prefix="query_embedding:",
+                )
+            cache = QueryEmbeddingCache(
+                embedder,
+                max_entries=settings.query_embedding_cache_max_entries,
+                ttl_seconds=settings.query_embedding_cache_ttl_seconds,
+                shared=shared,
+            )
+            _query_embedding_caches[id(embedder)] = cache
+        return cache
@@ -0,0 +1,241 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Tuple
+
+from langchain_core.embeddings import Embeddings
+
+from quivr_api.logger import get_logger
+from quivr_api.models.settings import EmbeddingSettings
+
+logger = get_logger(__name__)
+
+Embedding = List[float]
+
+
+def _heuristic_token_count(text: str) -> int:
+    # ~4 characters per token for English text with OpenAI's BPE encodings
+    return len(text) // 4 + 1
+
+
+def get_token_counter() -> Callable[[str], int]:
+    """Token counter for batch budgeting, falling back to a char heuristic."""
+    try:
+        import tiktoken
+
+        encoding = tiktoken.get_encoding("cl100k_base")
+        return lambda text: len(encoding.encode(text, disallowed_special=()))
+    except Exception as e:
+        logger.warning(f"tiktoken unavailable, estimating embedding tokens: {e}")
+        return _heuristic_token_count
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    status_code = getattr(error, "status_code", None) or getattr(
+        getattr(error, "response", None), "status_code", None
+    )
+    return status_code == 429 or "RateLimit" in type(error).__name__
+
+
+@dataclass
+class EmbeddingMetrics:
+    chunks: int = 0
+    tokens: int = 0
+    batches: int = 0
+    retries: int = 0
+    seconds: float = 0.0
+
+    def stats(self) -> Dict[str, float]:
+        seconds = self.seconds or float("inf")
+        return {
+            "chunks": self.chunks,
+            "tokens": self.tokens,
+            "batches": self.batches,
+            "retries": self.retries,
+            "seconds": round(self.seconds, 3),
+            "chunks_per_s": round(self.chunks / seconds, 2),
+            "tokens_per_s": round(self.tokens / seconds, 2),
+        }
+
+
+@dataclass
+class _EmbeddingRequest:
+    texts: List[str]
+    future: Future = field(default_factory=Future)
+
+
+class EmbeddingScheduler:
+    """
+    Embeds chunks in token-budgeted batches, a bounded number at a time.
+
+    Chunks are packed in order into batches of at most `max_batch_tokens`
+    tokens and `max_batch_size` inputs, so a large file stays under the
+    provider's request limits. Batches run on a shared thread pool of
+    `max_concurrency` workers and are retried with exponential backoff on
+    rate-limit errors.
+
+    Callers arriving within `coalesce_seconds` of each other (e.g. several
+    `process_file_task` running in the same worker) share batches: the first
+    caller waits that long, then embeds everything queued meanwhile.
+    """
+
+    def __init__(
+        self,
+        embedder: Embeddings,
+        max_batch_tokens: int = 100_000,
+        max_batch_size: int = 512,
+        max_concurrency: int = 4,
+        max_retries: int = 5,
+        backoff_factor: float = 1.0,
+        coalesce_seconds: float = 0.02,
+        token_counter: Callable[[str], int] | None = None,
+    ):
+        self.embedder = embedder
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_size = max_batch_size
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.coalesce_seconds = coalesce_seconds
+        self.count_tokens = token_counter or get_token_counter()
+        self.metrics = EmbeddingMetrics()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="embedding"
+        )
+        self._pending: List[_EmbeddingRequest] = []
+        self._collecting = False
+        self._lock = threading.Lock()
+
+    def pack_batches(self, token_counts: List[int]) -> List[List[int]]:
+        """Group chunk indices, in order, into batches within the token and size budget."""
+        batches: List[List[int]] = []
+        current: List[int] = []
+        current_tokens = 0
+        for idx, tokens in enumerate(token_counts):
+            if current and (
+                current_tokens + tokens > self.max_batch_tokens
+                or len(current) >= self.max_batch_size
+            ):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(idx)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    def embed(self, texts: List[str]) -> List[Embedding]:
+        if not texts:
+            return []
+        request = _EmbeddingRequest(texts)
+        with self._lock:
+            self._pending.append(request)
+            is_leader = not self._collecting
+            self._collecting = True
+        if is_leader:
+            if self.coalesce_seconds:
+                time.sleep(self.coalesce_seconds)
+            with self._lock:
+                requests, self._pending = self._pending, []
+                self._collecting = False
+            try:
+                self._run(requests)
+            except Exception as e:
+                for queued in requests:
+                    if not queued.future.done():
+                        queued.future.set_exception(e)
+        return request.future.result()
+
+    def _embed_batch(self, texts: List[str]) -> List[Embedding]:
+        attempt = 0
+        while True:
+            try:
+                return self.embedder.embed_documents(texts)
+            except Exception as e:
+                if attempt >= self.max_retries or not is_rate_limit_error(e):
+                    raise
+                delay = self.backoff_factor * (2**attempt)
+                logger.warning(
+                    f"Embedding batch of {len(texts)} chunks rate limited, retrying in {delay}s"
+                )
+                with self._lock:
+                    self.metrics.retries += 1
+                time.sleep(delay)
+                attempt += 1
+
+    def _run(self, requests: List[_EmbeddingRequest]) -> None:
+        start = time.perf_counter()
+        # (request index, position in request) for every queued chunk
+        owners: List[Tuple[int, int]] = [
+            (req_idx, pos)
+            for req_idx, request in enumerate(requests)
+            for pos in range(len(request.texts))
+        ]
+        texts = [requests[req_idx].texts[pos] for req_idx, pos in owners]
+        token_counts = [self.count_tokens(text) for text in texts]
+        batches = self.pack_batches(token_counts)
+
+        results: List[List[Embedding | None]] = [
+            [None] * len(request.texts) for request in requests
+        ]
+        errors: Dict[int, Exception] = {}
+        futures = [
+            (batch, self._executor.submit(self._embed_batch, [texts[i] for i in batch]))
+            for batch in batches
+        ]
+        for batch, future in futures:
+            try:
+                embeddings = future.result()
+            except Exception as e:
+                for i in batch:
+                    errors.setdefault(owners[i][0], e)
+                continue
+            for i, embedding in zip(batch, embeddings, strict=True):
+                req_idx, pos = owners[i]
+                results[req_idx][pos] = embedding
+
+        elapsed = time.perf_counter() - start
+        tokens = sum(token_counts)
+        with self._lock:
+            self.metrics.chunks += len(texts)
+            self.metrics.tokens += tokens
+            self.metrics.batches += len(batches)
+            self.metrics.seconds += elapsed
+        logger.info(
+            f"Embedded {len(texts)} chunks ({tokens} tokens) from {len(requests)} request(s) "
+            f"in {len(batches)} batches, {elapsed:.2f}s: "
+            f"{len(texts) / max(elapsed, 1e-9):.1f} chunks/s, {tokens / max(elapsed, 1e-9):.0f} tokens/s"
+        )
+
+        for req_idx, request in enumerate(requests):
+            if req_idx in errors:
+                request.future.set_exception(errors[req_idx])
+            else:
+                request.future.set_result(results[req_idx])
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return self.metrics.stats()
+
+
+_embedding_schedulers: Dict[int, EmbeddingScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_embedding_scheduler(embedder: Embeddings) -> EmbeddingScheduler:
+    """Process-wide scheduler per embedding client, so concurrent tasks share batches."""
+    with _schedulers_lock:
+        scheduler = _embedding_schedulers.get(id(embedder))
+        if scheduler is None or scheduler.embedder is not embedder:
+            settings = EmbeddingSettings()
+            scheduler = EmbeddingScheduler(
+                embedder,
+                max_batch_tokens=settings.embedding_batch_max_tokens,
+                max_batch_size=settings.embedding_batch_max_size,
+                max_concurrency=settings.embedding_max_concurrency,
+                max_retries=settings.embedding_max_retries,
+                coalesce_seconds=settings.embedding_coalesce_ms / 1000,
+            )
+            _embedding_schedulers[id(embedder)] = scheduler
+        return scheduler
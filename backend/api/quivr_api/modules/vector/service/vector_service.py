@@ -8,6 +8,13 @@ from quivr_api.logger import get_logger
 from quivr_api.modules.dependencies import BaseService, get_embedding_client
 from quivr_api.modules.vector.entity.vector import Vector
 from quivr_api.modules.vector.repository.vectors_repository import VectorRepository
+from quivr_api.modules.vector.service.embedding_cache import (
+    get_embedding_cache,
+    get_query_embedding_cache,
+)
+from quivr_api.modules.vector.service.embedding_scheduler import (
+    get_embedding_scheduler,
+)
 
 logger = get_logger(__name__)
 
@@ -24,9 +31,14 @@ class VectorService(BaseService[VectorRepository]):
         logger.info(
             f"New vector entry in vectors table for knowledge_id {knowledge_id}"
         )
-        # FIXME ADD a check in case of failure
-        embeddings = self._embedding.embed_documents(
-            [chunk.page_content for chunk in chunks]
+        # Unchanged chunks come from the cache, the rest is embedded in token-budgeted,
+        # concurrent batches shared with the other tasks of this worker
+        embeddings, cache_stats = get_embedding_cache(self._embedding).embed_documents(
+            [chunk.page_content for chunk in chunks],
+            get_embedding_scheduler(self._embedding).embed,
+        )
+        logger.info(
+            f"Embedding cache for knowledge_id {knowledge_id}: {cache_stats}"
         )
         new_vectors = [
             Vector(
@@ -42,8 +54,9 @@ class VectorService(BaseService[VectorRepository]):
         return [vector.id for vector in created_vector if vector.id]
 
     def similarity_search(self, query: str, brain_id: UUID, k: int = 40):
-        vectors = self._embedding.embed_documents([query])
-        query_embedding = vectors[0]
+        query_cache = get_query_embedding_cache(self._embedding)
+        query_embedding = query_cache.embed_query(query)
+        logger.debug(f"Query embedding cache: {query_cache.stats}")
         vectors = self.repository.similarity_search(
             query_embedding=query_embedding, brain_id=brain_id, k=k
         )
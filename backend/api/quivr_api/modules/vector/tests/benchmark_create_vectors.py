@@ -0,0 +1,91 @@
+"""
+Benchmark VectorRepository.create_vectors (bulk INSERT ... RETURNING) against the
+previous add_all + per-row refresh path.
+
+Inserts chunks of a throwaway knowledge in the local Supabase Postgres with both
+paths. Everything is rolled back at the end.
+
+    python -m quivr_api.modules.vector.tests.benchmark_create_vectors --chunks 500 5000
+"""
+
+import argparse
+import random
+import time
+from typing import List
+from uuid import UUID
+
+from sqlmodel import Session, create_engine, select
+
+from quivr_api.models.settings import settings
+from quivr_api.modules.brain.entity.brain_entity import Brain, BrainType
+from quivr_api.modules.knowledge.entity.knowledge import KnowledgeDB
+from quivr_api.modules.user.entity.user_identity import User
+from quivr_api.modules.vector.entity.vector import Vector
+from quivr_api.modules.vector.repository.vectors_repository import VectorRepository
+
+
+def _vectors(prefix: str, n_chunks: int, knowledge_id: UUID) -> List[Vector]:
+    embedding = [random.random() for _ in range(settings.embedding_dim)]
+    return [
+        Vector(
+            content=f"{prefix}_{idx}",
+            metadata_={"chunk_size": 10},
+            embedding=embedding,  # type: ignore
+            knowledge_id=knowledge_id,
+        )
+        for idx in range(n_chunks)
+    ]
+
+
+def benchmark(n_chunks: int) -> None:
+    engine = create_engine(settings.pg_database_url)
+    with engine.connect() as conn:
+        trans = conn.begin()
+        # create_vectors commits, keep its commits inside the outer transaction
+        session = Session(
+            conn, expire_on_commit=False, join_transaction_mode="create_savepoint"
+        )
+        user = session.exec(select(User).where(User.email == "admin@quivr.app")).one()
+        brain = Brain(name="benchmark", brain_type=BrainType.integration)
+        knowledge = KnowledgeDB(
+            file_name="benchmark",
+            extension=".txt",
+            status="UPLOADED",
+            source="benchmark",
+            source_link="benchmark",
+            file_size=0,
+            file_sha1="benchmark",
+            brains=[brain],
+            user_id=user.id,
+        )
+        session.add(knowledge)
+        session.commit()
+        assert knowledge.id
+
+        orm_vectors = _vectors("orm", n_chunks, knowledge.id)
+        start = time.perf_counter()
+        session.add_all(orm_vectors)
+        session.commit()
+        for vector in orm_vectors:
+            session.refresh(vector)
+        orm_seconds = time.perf_counter() - start
+
+        bulk_vectors = _vectors("bulk", n_chunks, knowledge.id)
+        start = time.perf_counter()
+        VectorRepository(session).create_vectors(bulk_vectors)
+        bulk_seconds = time.perf_counter() - start
+
+        print(
+            f"create_vectors x{n_chunks}: ORM + refresh {orm_seconds:.3f}s, "
+            f"bulk INSERT ... RETURNING {bulk_seconds:.3f}s"
+        )
+        session.close()
+        trans.rollback()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunks", type=int, nargs="+", default=[500, 5000])
+    args = parser.parse_args()
+    for n_chunks in args.chunks:
+        benchmark(n_chunks)
@@ -0,0 +1,119 @@
+"""
+Benchmark VectorRepository.similarity_search (HNSW candidates) against the exact scan.
+
+Fills a throwaway brain with random vectors in the local Supabase Postgres and
+times both queries, then does the same for a small brain whose vectors are a
+tiny fraction of a large table. Everything is rolled back at the end.
+
+    python -m quivr_api.modules.vector.tests.benchmark_similarity_search --sizes 10000 100000 1000000
+    python -m quivr_api.modules.vector.tests.benchmark_similarity_search --sizes 1000 --others 1000000
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from sqlmodel import Session, create_engine, select, text
+
+from quivr_api.models.settings import settings
+from quivr_api.modules.brain.entity.brain_entity import Brain, BrainType
+from quivr_api.modules.knowledge.entity.knowledge import KnowledgeDB
+from quivr_api.modules.user.entity.user_identity import User
+from quivr_api.modules.vector.repository.vectors_repository import (
+    EXACT_SIMILARITY_QUERY,
+    VectorRepository,
+)
+
+FILL_QUERY = text("""
+    INSERT INTO vectors (content, metadata, embedding, knowledge_id)
+    SELECT
+        'chunk ' || i,
+        '{"chunk_size": 100}'::json,
+        (SELECT array_agg(random())::vector FROM generate_series(1, :dim) WHERE i > 0),
+        :knowledge_id
+    FROM generate_series(1, :n) AS i
+""")
+
+
+def _time_ms(fn, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def _fill(session: Session, user: User, name: str, size: int) -> Brain:
+    brain = Brain(name=name, brain_type=BrainType.integration)
+    knowledge = KnowledgeDB(
+        file_name=name,
+        extension=".txt",
+        status="UPLOADED",
+        source="benchmark",
+        source_link="benchmark",
+        file_size=0,
+        file_sha1=name,
+        brains=[brain],
+        user_id=user.id,
+    )
+    session.add(knowledge)
+    session.flush()
+    session.execute(
+        FILL_QUERY,
+        {"dim": settings.embedding_dim, "n": size, "knowledge_id": knowledge.id},
+    )
+    return brain
+
+
+def benchmark(size: int, others: int, k: int, runs: int) -> None:
+    engine = create_engine(settings.pg_database_url)
+    with engine.connect() as conn:
+        trans = conn.begin()
+        session = Session(conn)
+        user = session.exec(select(User).where(User.email == "admin@quivr.app")).one()
+
+        start = time.perf_counter()
+        if others:
+            # Vectors of other brains, the searched brain is a small part of the table
+            _fill(session, user, "benchmark-others", others)
+        brain = _fill(session, user, "benchmark", size)
+        session.execute(text("ANALYZE vectors"))
+        print(
+            f"{size} + {others} chunks inserted in {time.perf_counter() - start:.1f}s"
+        )
+
+        repo = VectorRepository(session)
+        query = [random.random() for _ in range(settings.embedding_dim)]
+        params = {
+            "query_embedding": query,
+            "p_brain_id": brain.brain_id,
+            "k": k,
+            "max_chunk_sum": 10000,
+        }
+        ann_ms = _time_ms(
+            lambda: repo.similarity_search(query, brain.brain_id, k=k), runs
+        )
+        exact_ms = _time_ms(
+            lambda: session.execute(EXACT_SIMILARITY_QUERY, params=params).all(), runs
+        )
+        print(
+            f"brain of {size} chunks in a table of {size + others}, k={k}: "
+            f"ANN {ann_ms:.1f} ms, exact {exact_ms:.1f} ms (median of {runs})"
+        )
+        session.close()
+        trans.rollback()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument(
+        "--others", type=int, default=0, help="vectors of other brains in the table"
+    )
+    parser.add_argument("--k", type=int, default=40)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    for size in args.sizes:
+        benchmark(size, args.others, args.k, args.runs)
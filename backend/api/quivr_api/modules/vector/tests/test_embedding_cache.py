@@ -0,0 +1,123 @@
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_openai import AzureOpenAIEmbeddings, OpenAIEmbeddings
+
+from quivr_api.modules.vector.service.embedding_cache import (
+    EmbeddingCache,
+    InMemoryEmbeddingCache,
+    QueryEmbeddingCache,
+    SQLiteEmbeddingCache,
+    embedding_cache_key,
+    embedding_model_id,
+)
+
+
+class CountingEmbedding(DeterministicFakeEmbedding):
+    calls: list = []
+
+    def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        return super().embed_documents(texts)
+
+    def embed_query(self, text):
+        self.calls.append([text])
+        return super().embed_query(text)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "sqlite":
+        return SQLiteEmbeddingCache(str(tmp_path / "embeddings.sqlite"))
+    return InMemoryEmbeddingCache(max_entries=100)
+
+
+def test_embedding_cache_skips_unchanged_chunks(backend):
+    embedder = CountingEmbedding(size=4, calls=[])
+    cache = EmbeddingCache(backend, embedding_model_id(embedder))
+
+    first, stats = cache.embed_documents(["intro", "exam", "intro"], embedder.embed_documents)
+    assert embedder.calls == [["intro", "exam"]]
+    assert (stats.hits, stats.misses) == (0, 3)
+
+    # Re-sync with one edited chunk: only that one is embedded
+    second, stats = cache.embed_documents(
+        ["intro ", "exam moved"], embedder.embed_documents
+    )
+    assert embedder.calls[-1] == ["exam moved"]
+    assert (stats.hits, stats.misses) == (1, 1)
+    assert str(stats) == "1/2 hits (50%)"
+    assert second[0] == pytest.approx(first[0])
+    assert first[0] == first[2]
+
+
+def test_embedding_cache_scoped_by_model():
+    small = DeterministicFakeEmbedding(size=4)
+    large = DeterministicFakeEmbedding(size=8)
+
+    assert embedding_model_id(small) != embedding_model_id(large)
+    assert embedding_cache_key(embedding_model_id(small), "a  b") == embedding_cache_key(
+        embedding_model_id(small), " a b"
+    )
+
+    backend = InMemoryEmbeddingCache()
+    EmbeddingCache(backend, embedding_model_id(small)).embed_documents(
+        ["chunk"], small.embed_documents
+    )
+    embeddings, stats = EmbeddingCache(backend, embedding_model_id(large)).embed_documents(
+        ["chunk"], large.embed_documents
+    )
+    assert stats.hits == 0
+    assert len(embeddings[0]) == 8
+
+
+def test_embedding_model_id_of_openai_models():
+    small = OpenAIEmbeddings(model="text-embedding-3-small", api_key="sk-test")
+    large = OpenAIEmbeddings(model="text-embedding-3-large", api_key="sk-test")
+    assert embedding_model_id(small) != embedding_model_id(large)
+    assert embedding_model_id(large) == "OpenAIEmbeddings:text-embedding-3-large"
+
+    azure = AzureOpenAIEmbeddings(
+        azure_deployment="embeddings-prod",
+        azure_endpoint="https://example.openai.azure.com",
+        api_key="sk-test",
+        api_version="2024-02-01",
+    )
+    assert embedding_model_id(azure) == "AzureOpenAIEmbeddings:embeddings-prod"
+
+
+def test_query_embedding_cache_hits_across_replicas():
+    shared = InMemoryEmbeddingCache()
+    embedder = CountingEmbedding(size=4, calls=[])
+    replica_a = QueryEmbeddingCache(embedder, shared=shared)
+    replica_b = QueryEmbeddingCache(embedder, shared=shared)
+
+    first = replica_a.embed_query("When is the exam?")
+    assert replica_a.embed_query("When is the exam?") == first
+    assert replica_b.embed_query("When is the exam?") == first
+    assert embedder.calls == [["When is the exam?"]]
+    assert (replica_a.stats.hits, replica_a.stats.misses) == (1, 1)
+    assert (replica_b.stats.hits, replica_b.stats.misses) == (1, 0)
+
+
+def test_query_embedding_cache_embeds_the_query_as_asked():
+    embedder = CountingEmbedding(size=4, calls=[])
+    cache = QueryEmbeddingCache(embedder)
+
+    # Same call as the uncached search: embed_documents on the raw text
+    cache.embed_query("  When is the   exam? ")
+    cache.embed_query("When is the exam?")
+    assert embedder.calls == [["  When is the   exam? "], ["When is the exam?"]]
+
+
+def test_query_embedding_cache_ttl_and_lru():
+    embedder = CountingEmbedding(size=4, calls=[])
+    cache = QueryEmbeddingCache(embedder, max_entries=1)
+    cache.embed_query("a")
+    cache.embed_query("b")
+    cache.embed_query("a")
+    assert len(embedder.calls) == 3
+
+    expired = QueryEmbeddingCache(embedder, ttl_seconds=0)
+    expired.embed_query("c")
+    expired.embed_query("c")
+    assert embedder.calls[-2:] == [["c"], ["c"]]
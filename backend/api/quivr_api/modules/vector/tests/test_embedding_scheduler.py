@@ -0,0 +1,85 @@
+import threading
+
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from quivr_api.modules.vector.service.embedding_scheduler import EmbeddingScheduler
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+
+class RecordingEmbedding(DeterministicFakeEmbedding):
+    batches: list = []
+    failures: int = 0
+
+    def embed_documents(self, texts):
+        if self.failures:
+            self.failures -= 1
+            raise RateLimitError("Too many requests")
+        self.batches.append(list(texts))
+        return super().embed_documents(texts)
+
+
+def _scheduler(embedder, **kwargs) -> EmbeddingScheduler:
+    return EmbeddingScheduler(
+        embedder, token_counter=len, backoff_factor=0, coalesce_seconds=0, **kwargs
+    )
+
+
+def test_embedding_scheduler_token_budgeted_batches():
+    embedder = RecordingEmbedding(size=8, batches=[])
+    scheduler = _scheduler(embedder, max_batch_tokens=10, max_batch_size=3)
+    texts = ["aaaa", "bbbb", "cc", "dddddddddddd", "e", "f", "g", "h"]
+
+    embeddings = scheduler.embed(texts)
+
+    assert embeddings == DeterministicFakeEmbedding(size=8).embed_documents(texts)
+    # Oversized chunks get their own batch, order is preserved
+    assert sorted(embedder.batches) == sorted(
+        [["aaaa", "bbbb", "cc"], ["dddddddddddd"], ["e", "f", "g"], ["h"]]
+    )
+    stats = scheduler.stats()
+    assert stats["chunks"] == len(texts)
+    assert stats["tokens"] == sum(map(len, texts))
+    assert stats["batches"] == 4
+
+
+def test_embedding_scheduler_retries_rate_limits():
+    embedder = RecordingEmbedding(size=8, batches=[], failures=2)
+    scheduler = _scheduler(embedder)
+
+    assert len(scheduler.embed(["chunk"])) == 1
+    assert scheduler.stats()["retries"] == 2
+
+    embedder.failures = 10
+    with pytest.raises(RateLimitError):
+        _scheduler(embedder, max_retries=1).embed(["chunk"])
+
+
+def test_embedding_scheduler_coalesces_concurrent_callers():
+    embedder = RecordingEmbedding(size=8, batches=[])
+    scheduler = EmbeddingScheduler(
+        embedder, token_counter=len, coalesce_seconds=0.2, max_concurrency=1
+    )
+    results = {}
+
+    def _embed(name, texts):
+        results[name] = scheduler.embed(texts)
+
+    threads = [
+        threading.Thread(target=_embed, args=("a", ["a1", "a2"])),
+        threading.Thread(target=_embed, args=("b", ["b1"])),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert embedder.batches == [["a1", "a2", "b1"]] or embedder.batches == [
+        ["b1", "a1", "a2"]
+    ]
+    expected = DeterministicFakeEmbedding(size=8)
+    assert results["a"] == expected.embed_documents(["a1", "a2"])
+    assert results["b"] == expected.embed_documents(["b1"])
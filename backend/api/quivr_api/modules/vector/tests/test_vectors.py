@@ -118,6 +118,35 @@ def test_create_vectors_service(sync_session: Session, test_data: TestData, embe
     ), "The content of the second vector does not match"
 
 
+def test_create_vectors_bulk_batches(
+    sync_session: Session, test_data: TestData, embedder
+):
+    _, knowledge, _ = test_data
+    assert knowledge.id
+    repo = VectorRepository(sync_session)
+    contents = [f"chunk_{idx}" for idx in range(7)]
+    new_vectors = [
+        Vector(
+            content=content,
+            metadata_={"chunk_size": 7, "index": idx},
+            embedding=embedder.embed_query(content),  # type: ignore
+            knowledge_id=knowledge.id,
+        )
+        for idx, content in enumerate(contents)
+    ]
+
+    created = repo.create_vectors(new_vectors, batch_size=3)
+
+    ids = [vector.id for vector in created]
+    assert all(ids) and len(set(ids)) == len(contents)
+    # Returned IDs line up with the chunks they were generated for
+    for vector in created:
+        stored = sync_session.get(Vector, vector.id)
+        assert stored is not None
+        assert stored.content == vector.content
+        assert stored.metadata_["index"] == contents.index(vector.content)
+
+
 def test_get_vectors_by_knowledge_id(sync_session: Session, test_data: TestData):
     vectors, knowledge, _ = test_data
     assert knowledge.id
@@ -1,6 +1,8 @@
 import asyncio
 import logging
 import os
+import time
+from concurrent.futures import Executor
 from pathlib import Path
 from pprint import PrettyPrinter
 from typing import Any, AsyncGenerator, Callable, Dict, Self, Type, Union
@@ -24,15 +26,15 @@ from quivr_core.brain.serialization import (
 )
 from quivr_core.chat import ChatHistory
 from quivr_core.config import RetrievalConfig
-from quivr_core.files.file import load_qfile
-from quivr_core.llm import LLMEndpoint
+from quivr_core.files.file import QuivrFile, load_qfile
+from quivr_core.llm import LLMEndpoint, get_llm_endpoint
 from quivr_core.models import (
     ParsedRAGChunkResponse,
     ParsedRAGResponse,
     QuivrKnowledge,
     SearchResult,
 )
-from quivr_core.processor.registry import get_processor_class
+from quivr_core.processor.registry import get_processor
 from quivr_core.quivr_rag import QuivrQARAG
 from quivr_core.quivr_rag_langgraph import QuivrQARAGLangGraph
 from quivr_core.storage.local_storage import LocalStorage, TransparentStorage
@@ -43,16 +45,36 @@ from .brain_defaults import build_default_vectordb, default_embedder, default_ll
 logger = logging.getLogger("quivr_core")
 
 
+def _process_file_in_subprocess(
+    file: QuivrFile, processor_kwargs: dict[str, Any]
+) -> list[Document]:
+    # Runs in a worker process: processor classes are resolved (and cached) on that side
+    processor = get_processor(file.file_extension, **processor_kwargs)
+    return asyncio.run(processor.process_file(file))
+
+
 async def process_files(
-    storage: StorageBase, skip_file_error: bool, **processor_kwargs: dict[str, Any]
+    storage: StorageBase,
+    skip_file_error: bool,
+    max_concurrency: int = 8,
+    executor: Executor | None = None,
+    **processor_kwargs: dict[str, Any],
 ) -> list[Document]:
     """
     Process files in storage.
     This function takes a StorageBase and return a list of langchain documents.
 
+    Up to `max_concurrency` files are processed at the same time, with one processor
+    instance per processor class and configuration. Documents are returned in the
+    order of the files in storage.
+
     Args:
         storage (StorageBase): The storage containing the files to process.
         skip_file_error (bool): Whether to skip files that cannot be processed.
+        max_concurrency (int): Maximum number of files processed concurrently.
+        executor (Executor | None): Optional executor (e.g. a `ProcessPoolExecutor`) running
+            the parsing of each file, for CPU-bound processors. Files and processor kwargs
+            must be picklable.
         processor_kwargs (dict[str, Any]): Additional arguments for the processor.
 
     Returns:
@@ -63,28 +85,38 @@ async def process_files(
         Exception: If no processor is found for a file of a specific type and skip_file_error is False.
 
     """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    loop = asyncio.get_running_loop()
 
-    knowledge = []
-    for file in await storage.get_files():
+    async def process(file: QuivrFile) -> list[Document]:
         try:
-            if file.file_extension:
-                processor_cls = get_processor_class(file.file_extension)
-                logger.debug(f"processing {file} using class {processor_cls.__name__}")
-                processor = processor_cls(**processor_kwargs)
-                docs = await processor.process_file(file)
-                knowledge.extend(docs)
-            else:
+            if not file.file_extension:
                 logger.error(f"can't find processor for {file}")
                 if skip_file_error:
-                    continue
-                else:
-                    raise ValueError(f"can't parse {file}. can't find file extension")
+                    return []
+                raise ValueError(f"can't parse {file}. can't find file extension")
+            async with semaphore:
+                if executor is not None:
+                    return await loop.run_in_executor(
+                        executor, _process_file_in_subprocess, file, processor_kwargs
+                    )
+                processor = get_processor(file.file_extension, **processor_kwargs)
+                logger.debug(
+                    f"processing {file} using class {type(processor).__name__}"
+                )
+                return await processor.process_file(file)
         except KeyError as e:
             if skip_file_error:
-                continue
-            else:
-                raise Exception(f"Can't parse {file}. No available processor") from e
-
+                return []
+            raise Exception(f"Can't parse {file}. No available processor") from e
+
+    start = time.perf_counter()
+    files = await storage.get_files()
+    results = await asyncio.gather(*(process(file) for file in files))
+    knowledge = [doc for docs in results for doc in docs]
+    logger.debug(
+        f"processed {len(files)} files into {len(knowledge)} chunks in {time.perf_counter() - start:.2f}s"
+    )
     return knowledge
 
 
@@ -324,6 +356,8 @@ class Brain:
         embedder: Embeddings | None = None,
         skip_file_error: bool = False,
         processor_kwargs: dict[str, Any] | None = None,
+        max_concurrency: int = 8,
+        executor: Executor | None = None,
     ):
         """
         Create a brain from a list of file paths.
@@ -337,6 +371,9 @@ class Brain:
             embedder (Embeddings | None): The embeddings used to create the index of the processed files.
             skip_file_error (bool): Whether to skip files that cannot be processed.
             processor_kwargs (dict[str, Any] | None): Additional arguments for the processor.
+            max_concurrency (int): Maximum number of files loaded and processed concurrently.
+            executor (Executor | None): Optional executor (e.g. a `ProcessPoolExecutor`) to offload
+                the parsing of files to.
 
         Returns:
             Brain: The brain created from the file paths.
@@ -357,10 +394,14 @@ class Brain:
 
         brain_id = uuid4()
 
-        # TODO: run in parallel using tasks
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def load(path: str | Path) -> QuivrFile:
+            async with semaphore:
+                return await load_qfile(brain_id, path)
 
-        for path in file_paths:
-            file = await load_qfile(brain_id, path)
+        # Hashing is done concurrently, uploads keep the order of `file_paths`
+        for file in await asyncio.gather(*(load(path) for path in file_paths)):
             await storage.upload_file(file)
 
         logger.debug(f"uploaded all files to {storage}")
@@ -369,6 +410,8 @@ class Brain:
         docs = await process_files(
             storage=storage,
             skip_file_error=skip_file_error,
+            max_concurrency=max_concurrency,
+            executor=executor,
             **processor_kwargs,
         )
 
@@ -401,6 +444,8 @@ class Brain:
         embedder: Embeddings | None = None,
         skip_file_error: bool = False,
         processor_kwargs: dict[str, Any] | None = None,
+        max_concurrency: int = 8,
+        executor: Executor | None = None,
     ) -> Self:
         loop = asyncio.get_event_loop()
         return loop.run_until_complete(
@@ -413,6 +458,8 @@ class Brain:
                 embedder=embedder,
                 skip_file_error=skip_file_error,
                 processor_kwargs=processor_kwargs,
+                max_concurrency=max_concurrency,
+                executor=executor,
             )
         )
 
@@ -550,7 +597,7 @@ class Brain:
         # If you passed a different llm model we'll override the brain  one
         if retrieval_config:
             if retrieval_config.llm_config != self.llm.get_config():
-                llm = LLMEndpoint.from_config(config=retrieval_config.llm_config)
+                llm = get_llm_endpoint(retrieval_config.llm_config)
         else:
             retrieval_config = RetrievalConfig(llm_config=self.llm.get_config())
 
@@ -608,7 +655,7 @@ class Brain:
         # If you passed a different llm model we'll override the brain  one
         if retrieval_config:
             if retrieval_config.llm_config != self.llm.get_config():
-                llm = LLMEndpoint.from_config(config=retrieval_config.llm_config)
+                llm = get_llm_endpoint(retrieval_config.llm_config)
         else:
             retrieval_config = RetrievalConfig(llm_config=self.llm.get_config())
 
@@ -1,3 +1,4 @@
 from .llm_endpoint import LLMEndpoint
+from .registry import get_llm_endpoint
 
-__all__ = ["LLMEndpoint"]
+__all__ = ["LLMEndpoint", "get_llm_endpoint"]
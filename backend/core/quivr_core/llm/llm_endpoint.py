@@ -1,9 +1,7 @@
 import logging
-import os
 from typing import Union
 from urllib.parse import parse_qs, urlparse
 
-import tiktoken
 from langchain_anthropic import ChatAnthropic
 from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_openai import AzureChatOpenAI, ChatOpenAI
@@ -11,6 +9,7 @@ from langchain_openai import AzureChatOpenAI, ChatOpenAI
 
 from quivr_core.brain.info import LLMInfo
 from quivr_core.config import DefaultModelSuppliers, LLMEndpointConfig
+from quivr_core.llm.registry import get_tokenizer
 from quivr_core.utils import model_supports_function_calling
 
 logger = logging.getLogger("quivr_core")
@@ -24,25 +23,8 @@ class LLMEndpoint:
             self._config.model
         )
 
-        if llm_config.tokenizer_hub:
-            # To prevent the warning
-            # huggingface/tokenizers: The current process just got forked, after parallelism has already been used. Disabling parallelism to avoid deadlocks...
-            os.environ["TOKENIZERS_PARALLELISM"] = (
-                "false"
-                if not os.environ.get("TOKENIZERS_PARALLELISM")
-                else os.environ["TOKENIZERS_PARALLELISM"]
-            )
-            try:
-                from transformers import AutoTokenizer
-                logger.info(f"Loading tokenizer from HuggingFace Hub: {llm_config.tokenizer_hub}")
-                self.tokenizer = AutoTokenizer.from_pretrained(llm_config.tokenizer_hub)
-            except OSError:  # if we don't manage to connect to huggingface and/or no cached models are present
-                logger.warning(
-                    f"Cannot acces the configured tokenizer from {llm_config.tokenizer_hub}, using the default tokenizer {llm_config.fallback_tokenizer}"
-                )
-                self.tokenizer = tiktoken.get_encoding(llm_config.fallback_tokenizer)
-        else:
-            self.tokenizer = tiktoken.get_encoding(llm_config.fallback_tokenizer)
+        # Tokenizers are loaded once per process and shared by all endpoints
+        self.tokenizer = get_tokenizer(llm_config)
 
     def count_tokens(self, text: str) -> int:
         # Tokenize the input text and return the token count
@@ -0,0 +1,208 @@
+import hashlib
+import logging
+import os
+import statistics
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Generic, Hashable, List, TypeVar
+
+from langchain_core.language_models.chat_models import BaseChatModel
+
+from quivr_core.config import LLMEndpointConfig, WorkflowConfig
+
+logger = logging.getLogger("quivr_core")
+
+T = TypeVar("T")
+
+
+def _digest(value: str | None) -> str | None:
+    # API keys are part of the key so tenants never share clients, but never kept in clear
+    return hashlib.sha256(value.encode()).hexdigest()[:16] if value else None
+
+
+def llm_endpoint_key(config: LLMEndpointConfig) -> tuple:
+    return (
+        str(config.supplier),
+        config.model,
+        config.llm_base_url,
+        config.temperature,
+        config.max_input_tokens,
+        config.max_output_tokens,
+        config.context_length,
+        config.tokenizer_hub,
+        _digest(config.llm_api_key),
+    )
+
+
+def workflow_config_key(workflow_config: WorkflowConfig | None) -> str | None:
+    if workflow_config is None:
+        return None
+    return hashlib.sha256(workflow_config.model_dump_json().encode()).hexdigest()
+
+
+class BoundedRegistry(Generic[T]):
+    """Thread-safe LRU of expensive objects, built once per key by `get_or_create`."""
+
+    def __init__(self, name: str, max_entries: int):
+        self.name = name
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, T] = OrderedDict()
+        self._lock = threading.RLock()
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], T]) -> T:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            # Built under the lock so concurrent requests don't load the same model twice
+            value = factory()
+            self._entries[key] = value
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            logger.info(f"Registry {self.name}: built new entry ({self.stats()})")
+            return value
+
+    def invalidate(self, key: Hashable | None = None) -> None:
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+class TTFTMetrics:
+    """Time to first token of answers, split by cold (freshly built endpoint or graph) and warm requests."""
+
+    def __init__(self, max_samples: int = 1000):
+        self.max_samples = max_samples
+        self._samples: Dict[str, List[float]] = {"cold": [], "warm": []}
+        self._lock = threading.Lock()
+
+    def record(self, cold: bool, seconds: float) -> None:
+        with self._lock:
+            samples = self._samples["cold" if cold else "warm"]
+            samples.append(seconds)
+            del samples[: -self.max_samples]
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {
+                kind: {
+                    "count": len(samples),
+                    "mean_s": round(statistics.fmean(samples), 3) if samples else 0.0,
+                    "p50_s": round(statistics.median(samples), 3) if samples else 0.0,
+                }
+                for kind, samples in self._samples.items()
+            }
+
+
+tokenizers: BoundedRegistry[Any] = BoundedRegistry("tokenizers", max_entries=8)
+llm_endpoints: BoundedRegistry[Any] = BoundedRegistry("llm_endpoints", max_entries=32)
+chat_models: BoundedRegistry[BaseChatModel] = BoundedRegistry(
+    "chat_models", max_entries=8
+)
+graphs: BoundedRegistry[Any] = BoundedRegistry("graphs", max_entries=16)
+ttft_metrics = TTFTMetrics()
+
+# Endpoints and graphs that already served a request, anything else is a cold start
+_warm: "weakref.WeakSet[Any]" = weakref.WeakSet()
+_warm_lock = threading.Lock()
+
+
+def _load_tokenizer(tokenizer_hub: str | None, fallback_tokenizer: str):
+    import tiktoken
+
+    if tokenizer_hub:
+        # To prevent the warning
+        # huggingface/tokenizers: The current process just got forked, after parallelism has already been used. Disabling parallelism to avoid deadlocks...
+        os.environ["TOKENIZERS_PARALLELISM"] = (
+            "false"
+            if not os.environ.get("TOKENIZERS_PARALLELISM")
+            else os.environ["TOKENIZERS_PARALLELISM"]
+        )
+        try:
+            from transformers import AutoTokenizer
+
+            logger.info(f"Loading tokenizer from HuggingFace Hub: {tokenizer_hub}")
+            return AutoTokenizer.from_pretrained(tokenizer_hub)
+        except OSError:  # if we don't manage to connect to huggingface and/or no cached models are present
+            logger.warning(
+                f"Cannot acces the configured tokenizer from {tokenizer_hub}, using the default tokenizer {fallback_tokenizer}"
+            )
+    return tiktoken.get_encoding(fallback_tokenizer)
+
+
+def get_tokenizer(llm_config: LLMEndpointConfig):
+    return tokenizers.get_or_create(
+        (llm_config.tokenizer_hub, llm_config.fallback_tokenizer),
+        lambda: _load_tokenizer(
+            llm_config.tokenizer_hub, llm_config.fallback_tokenizer
+        ),
+    )
+
+
+def get_llm_endpoint(llm_config: LLMEndpointConfig):
+    """Shared `LLMEndpoint` (chat model, HTTP client and tokenizer) for this configuration."""
+    from quivr_core.llm.llm_endpoint import LLMEndpoint
+
+    return llm_endpoints.get_or_create(
+        llm_endpoint_key(llm_config), lambda: LLMEndpoint.from_config(llm_config)
+    )
+
+
+def get_chat_openai(model: str, api_key: str, temperature: float = 0) -> BaseChatModel:
+    from langchain_openai import ChatOpenAI
+
+    return chat_models.get_or_create(
+        ("openai", model, temperature, _digest(api_key)),
+        lambda: ChatOpenAI(model=model, api_key=api_key, temperature=temperature),
+    )
+
+
+def get_compiled_graph(
+    rag_cls: type, workflow_config: WorkflowConfig | None, build: Callable[[], T]
+) -> T:
+    return graphs.get_or_create(
+        (rag_cls.__qualname__, workflow_config_key(workflow_config)), build
+    )
+
+
+def mark_served(*components: Any) -> bool:
+    """Record that the components served a request, returns True if any of them was cold."""
+    cold = False
+    with _warm_lock:
+        for component in components:
+            if component not in _warm:
+                _warm.add(component)
+                cold = True
+    return cold
+
+
+def invalidate(llm_config: LLMEndpointConfig | None = None) -> None:
+    """Drop one endpoint, or every cached endpoint, model, tokenizer and graph when no config is given."""
+    if llm_config is not None:
+        llm_endpoints.invalidate(llm_endpoint_key(llm_config))
+        return
+    for registry in (tokenizers, llm_endpoints, chat_models, graphs):
+        registry.invalidate()
+
+
+def stats() -> Dict[str, Any]:
+    return {
+        "tokenizers": tokenizers.stats(),
+        "llm_endpoints": llm_endpoints.stats(),
+        "chat_models": chat_models.stats(),
+        "graphs": graphs.stats(),
+        "ttft": ttft_metrics.stats(),
+    }
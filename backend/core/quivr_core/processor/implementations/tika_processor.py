@@ -1,4 +1,6 @@
+import asyncio
 import logging
+import threading
 from typing import AsyncIterable
 
 import httpx
@@ -36,7 +38,9 @@ class TikaProcessor(ProcessorBase):
     ) -> None:
         self.tika_url = tika_url
         self.max_retries = max_retries
-        self._client = httpx.AsyncClient(timeout=timeout)
+        self.timeout = timeout
+        self._clients: dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+        self._clients_lock = threading.Lock()
 
         self.splitter_config = splitter_config
 
@@ -48,12 +52,38 @@ class TikaProcessor(ProcessorBase):
                 chunk_overlap=splitter_config.chunk_overlap,
             )
 
+    async def _get_client(self) -> httpx.AsyncClient:
+        # The processor instance is shared, but httpx connections are bound to the
+        # event loop: one client per loop, closed once its loop is closed
+        loop = asyncio.get_running_loop()
+        with self._clients_lock:
+            closed = [lp for lp in self._clients if lp.is_closed()]
+            stale = [self._clients.pop(lp) for lp in closed]
+            client = self._clients.get(loop)
+            if client is None:
+                client = self._clients[loop] = httpx.AsyncClient(timeout=self.timeout)
+        for stale_client in stale:
+            try:
+                await stale_client.aclose()
+            except Exception as e:
+                # Its sockets went with the closed loop
+                logger.debug(f"error closing tika client of a closed loop: {e}")
+        return client
+
+    async def aclose(self) -> None:
+        """Close the client of the running loop."""
+        with self._clients_lock:
+            client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
     async def _send_parse_tika(self, f: AsyncIterable[bytes]) -> str:
         retry = 0
         headers = {"Accept": "text/plain"}
+        client = await self._get_client()
         while retry < self.max_retries:
             try:
-                resp = await self._client.put(self.tika_url, headers=headers, content=f)
+                resp = await client.put(self.tika_url, headers=headers, content=f)
                 resp.raise_for_status()
                 return resp.content.decode("utf-8")
             except Exception as e:
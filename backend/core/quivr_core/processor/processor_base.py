@@ -11,9 +11,8 @@ from quivr_core.files.file import FileExtension, QuivrFile
 logger = logging.getLogger("quivr_core")
 
 
-# TODO: processors should be cached somewhere ?
-# The processor should be cached by processor type
-# The cache should use a single
+# NOTE: processors are cached by class and configuration (see `registry.get_processor`),
+# a single instance processes many files and shouldn't keep per-file state
 class ProcessorBase(ABC):
     supported_extensions: list[FileExtension | str]
 
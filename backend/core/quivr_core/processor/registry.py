@@ -3,9 +3,12 @@ import logging
 import types
 from dataclasses import dataclass, field
 from heapq import heappop, heappush
-from typing import Type, TypeAlias
+from typing import Any, Type, TypeAlias
+
+from pydantic import BaseModel
 
 from quivr_core.files.file import FileExtension
+from quivr_core.llm.registry import BoundedRegistry
 
 from .processor_base import ProcessorBase
 
@@ -18,6 +21,12 @@ _registry: dict[str, Type[ProcessorBase]] = {}
 # external, read only. Contains the actual processors that we are imported and ready to use
 registry = types.MappingProxyType(_registry)
 
+# Processor instances, one per (processor class, configuration). Building a processor loads
+# tiktoken splitters or HTTP clients, which don't need to be rebuilt for every file.
+processor_instances: BoundedRegistry[ProcessorBase] = BoundedRegistry(
+    "processors", max_entries=64
+)
+
 
 @dataclass(order=True)
 class ProcEntry:
@@ -223,6 +232,36 @@ def _import_class(full_mod_path: str):
     return mod
 
 
+def _processor_kwargs_key(processor_kwargs: dict[str, Any]) -> tuple:
+    key = []
+    for name, value in sorted(processor_kwargs.items()):
+        if isinstance(value, BaseModel):
+            # SplitterConfig, MegaparseConfig... are compared by value
+            value = (type(value).__qualname__, value.model_dump_json())
+        else:
+            try:
+                hash(value)
+            except TypeError:
+                value = repr(value)
+        key.append((name, value))
+    return tuple(key)
+
+
+def get_processor(
+    file_extension: FileExtension | str, **processor_kwargs: Any
+) -> ProcessorBase:
+    """Shared processor instance for this file extension and processor configuration.
+
+    Processors don't keep state between files, the instance is reused by every file
+    processed with the same class and arguments.
+    """
+    proc_cls = get_processor_class(file_extension)
+    return processor_instances.get_or_create(
+        (proc_cls, _processor_kwargs_key(processor_kwargs)),
+        lambda: proc_cls(**processor_kwargs),
+    )
+
+
 def available_processors():
     """Return a list of the known processors."""
     return list(known_processors)
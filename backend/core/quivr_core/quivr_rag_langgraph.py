@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from enum import Enum
 from typing import Annotated, AsyncGenerator, List, Optional, Sequence, TypedDict
@@ -6,7 +7,10 @@ from uuid import uuid4
 import os
 
 from langchain_cohere import CohereRerank
-from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForRetrieverRun,
+    CallbackManagerForRetrieverRun,
+)
 from langchain_core.retrievers import BaseRetriever
 from langchain_community.document_compressors import JinaRerank
 from langchain_core.callbacks import Callbacks
@@ -14,14 +18,14 @@ from langchain_core.documents import BaseDocumentCompressor, Document
 from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_core.messages import BaseMessage
 from langchain_core.messages.ai import AIMessageChunk
+from langchain_core.runnables import RunnableConfig, RunnableLambda
 from langchain_core.vectorstores import VectorStore
-from langchain_openai import ChatOpenAI
 from langgraph.graph import END, START, StateGraph
 from langgraph.graph.message import add_messages
 
 from quivr_core.chat import ChatHistory
 from quivr_core.config import DefaultRerankers, RetrievalConfig
-from quivr_core.llm import LLMEndpoint
+from quivr_core.llm import LLMEndpoint, registry
 from quivr_core.models import (
     ParsedRAGChunkResponse,
     ParsedRAGResponse,
@@ -71,6 +75,14 @@ class IdempotentCompressor(BaseDocumentCompressor):
         """
         return documents
 
+    async def acompress_documents(
+        self,
+        documents: Sequence[Document],
+        query: str,
+        callbacks: Optional[Callbacks] = None,
+    ) -> Sequence[Document]:
+        return documents
+
 
 class ContextualCompressionRetriever(BaseRetriever):
     """Retriever that wraps a base retriever and compresses the results.
@@ -102,6 +114,47 @@ class ContextualCompressionRetriever(BaseRetriever):
             return list(compressed_docs)
         return []
 
+    async def _aget_relevant_documents(
+        self,
+        query: str,
+        *,
+        run_manager: Optional[AsyncCallbackManagerForRetrieverRun] = None,
+    ) -> List[Document]:
+        """Async version of _get_relevant_documents, used by the async graph nodes."""
+        docs = await self.base_retriever.ainvoke(query)
+        if docs:
+            compressed_docs = await self.base_compressor.acompress_documents(
+                docs,
+                query,
+                callbacks=run_manager.get_child() if run_manager else None,
+            )
+            return list(compressed_docs)
+        return []
+
+
+def _rag_node(name: str) -> RunnableLambda:
+    """
+    Graph node running `name` on the pipeline instance of the current request.
+
+    The compiled graph is shared by every request with the same workflow, so
+    nodes can't be bound methods: the instance is passed in the run config.
+    `invoke` runs the sync method, `ainvoke`/`astream_events` run its `a<name>`
+    counterpart on the event loop, so async chats don't use threadpool workers.
+    """
+
+    def run(state, config: RunnableConfig):
+        return getattr(config["configurable"]["rag"], name)(state)
+
+    async def arun(state, config: RunnableConfig):
+        rag = config["configurable"]["rag"]
+        anode = getattr(rag, f"a{name}", None)
+        if anode is None:
+            # Custom nodes without an async version still run, on a worker thread
+            return await asyncio.to_thread(getattr(rag, name), state)
+        return await anode(state)
+
+    return RunnableLambda(run, afunc=arun, name=name)
+
 
 class QuivrQARAGLangGraph:
     # Fast model used for query rewriting (non-reasoning tasks)
@@ -139,10 +192,8 @@ class QuivrQARAGLangGraph:
             # Create a fast, cheap model for query rewriting
             api_key = os.environ.get("OPENAI_API_KEY")
             if api_key:
-                self.rewrite_llm = ChatOpenAI(
-                    model=self.REWRITE_MODEL,
-                    api_key=api_key,
-                    temperature=0,
+                self.rewrite_llm = registry.get_chat_openai(
+                    self.REWRITE_MODEL, api_key, temperature=0
                 )
                 logger.info(f"Using {self.REWRITE_MODEL} for query rewriting (fast model)")
             else:
@@ -221,6 +272,10 @@ class QuivrQARAGLangGraph:
 
         return {"chat_history": _chat_history}
 
+    async def afilter_history(self, state: AgentState) -> dict:
+        # Only counts tokens, nothing to await
+        return self.filter_history(state)
+
     ### Nodes
     def rewrite(self, state):
         """
@@ -236,16 +291,22 @@ class QuivrQARAGLangGraph:
             dict: The updated state with re-phrased question
         """
 
+        # Use fast rewrite model instead of main model
+        response = self.rewrite_llm.invoke(self._rewrite_prompt(state))
+        return {"messages": [response]}
+
+    async def arewrite(self, state):
+        """Async version of rewrite."""
+        response = await self.rewrite_llm.ainvoke(self._rewrite_prompt(state))
+        return {"messages": [response]}
+
+    def _rewrite_prompt(self, state) -> str:
         # Grader
-        msg = custom_prompts.CONDENSE_QUESTION_PROMPT.format(
+        return custom_prompts.CONDENSE_QUESTION_PROMPT.format(
             chat_history=state["chat_history"],
             question=state["messages"][0].content,
         )
 
-        # Use fast rewrite model instead of main model
-        response = self.rewrite_llm.invoke(msg)
-        return {"messages": [response]}
-
     def retrieve(self, state):
         """
         Retrieve relevent chunks
@@ -260,6 +321,12 @@ class QuivrQARAGLangGraph:
         docs = self.compression_retriever.invoke(question)
         return {"docs": docs}
 
+    async def aretrieve(self, state):
+        """Async version of retrieve, through the async retriever and reranker."""
+        question = state["messages"][-1].content
+        docs = await self.compression_retriever.ainvoke(question)
+        return {"docs": docs}
+
     def generate_rag(self, state):
         """
         Generate answer
@@ -270,6 +337,19 @@ class QuivrQARAGLangGraph:
         Returns:
             dict: The updated state with re-phrased question
         """
+        rag_chain, final_inputs = self._rag_chain(state)
+
+        # Run
+        response = rag_chain.invoke(final_inputs)
+        return self._rag_output(state, response)
+
+    async def agenerate_rag(self, state):
+        """Async version of generate_rag."""
+        rag_chain, final_inputs = self._rag_chain(state)
+        response = await rag_chain.ainvoke(final_inputs)
+        return self._rag_output(state, response)
+
+    def _rag_chain(self, state):
         messages = state["messages"]
         user_question = messages[0].content
         files = state["files"]
@@ -297,13 +377,12 @@ class QuivrQARAGLangGraph:
             )
 
         # Chain
-        rag_chain = custom_prompts.RAG_ANSWER_PROMPT | llm
+        return custom_prompts.RAG_ANSWER_PROMPT | llm, final_inputs
 
-        # Run
-        response = rag_chain.invoke(final_inputs)
+    def _rag_output(self, state, response) -> dict:
         formatted_response = {
             "answer": response,  # Assuming the last message contains the final answer
-            "docs": docs,
+            "docs": state["docs"],
         }
         return {"messages": [response], "final_response": formatted_response}
 
@@ -317,6 +396,26 @@ class QuivrQARAGLangGraph:
         Returns:
             dict: The updated state with re-phrased question
         """
+        # Run
+        response = (custom_prompts.CHAT_LLM_PROMPT | self.llm_endpoint._llm).invoke(
+            self._chat_llm_inputs(state)
+        )
+        formatted_response = {
+            "answer": response,  # Assuming the last message contains the final answer
+        }
+        return {"messages": [response], "final_response": formatted_response}
+
+    async def agenerate_chat_llm(self, state):
+        """Async version of generate_chat_llm."""
+        response = await (
+            custom_prompts.CHAT_LLM_PROMPT | self.llm_endpoint._llm
+        ).ainvoke(self._chat_llm_inputs(state))
+        formatted_response = {
+            "answer": response,  # Assuming the last message contains the final answer
+        }
+        return {"messages": [response], "final_response": formatted_response}
+
+    def _chat_llm_inputs(self, state) -> dict:
         messages = state["messages"]
         user_question = messages[0].content
 
@@ -327,19 +426,7 @@ class QuivrQARAGLangGraph:
         final_inputs["question"] = user_question
         final_inputs["custom_instructions"] = prompt if prompt else "None"
         final_inputs["chat_history"] = state["chat_history"].to_list()
-
-        # LLM
-        llm = self.llm_endpoint._llm
-
-        # Chain
-        rag_chain = custom_prompts.CHAT_LLM_PROMPT | llm
-
-        # Run
-        response = rag_chain.invoke(final_inputs)
-        formatted_response = {
-            "answer": response,  # Assuming the last message contains the final answer
-        }
-        return {"messages": [response], "final_response": formatted_response}
+        return final_inputs
 
     def build_chain(self):
         """
@@ -349,7 +436,10 @@ class QuivrQARAGLangGraph:
             Callable[[Dict], Dict]: The langchain chain.
         """
         if not self.graph:
-            self.graph = self.create_graph()
+            # Compiled once per process and workflow, see _rag_node
+            self.graph = registry.get_compiled_graph(
+                type(self), self.retrieval_config.workflow_config, self.create_graph
+            )
 
         return self.graph
 
@@ -383,7 +473,8 @@ class QuivrQARAGLangGraph:
                 raise ValueError("The workflow should contain a 'START' node")
             for node in self.retrieval_config.workflow_config.nodes:
                 if node.name not in SpecialEdges._value2member_map_:
-                    workflow.add_node(node.name, getattr(self, node.name))
+                    getattr(self, node.name)  # fail at build time on unknown nodes
+                    workflow.add_node(node.name, _rag_node(node.name))
 
             for node in self.retrieval_config.workflow_config.nodes:
                 for edge in node.edges:
@@ -395,10 +486,10 @@ class QuivrQARAGLangGraph:
                         workflow.add_edge(node.name, edge)
         else:
             # Define the nodes we will cycle between
-            workflow.add_node("filter_history", self.filter_history)
-            workflow.add_node("rewrite", self.rewrite)  # Re-writing the question
-            workflow.add_node("retrieve", self.retrieve)  # retrieval
-            workflow.add_node("generate", self.generate_rag)
+            workflow.add_node("filter_history", _rag_node("filter_history"))
+            workflow.add_node("rewrite", _rag_node("rewrite"))  # Re-writing the question
+            workflow.add_node("retrieve", _rag_node("retrieve"))  # retrieval
+            workflow.add_node("generate", _rag_node("generate_rag"))
 
             # Add node for filtering history
 
@@ -446,7 +537,7 @@ class QuivrQARAGLangGraph:
         }
         raw_llm_response = conversational_qa_chain.invoke(
             inputs,
-            config={"metadata": metadata},
+            config={"metadata": metadata, "configurable": {"rag": self}},
         )
         response = parse_response(
             raw_llm_response["final_response"], self.retrieval_config.llm_config.model
@@ -481,7 +572,9 @@ class QuivrQARAGLangGraph:
         )
         build_chain_start = time.time()
         conversational_qa_chain = self.build_chain()
-        logger.info(f"⏱️ TIMING: build_chain took {time.time() - build_chain_start:.2f}s")
+        build_chain_time = time.time() - build_chain_start
+        logger.info(f"⏱️ TIMING: build_chain took {build_chain_time:.2f}s")
+        cold_start = registry.mark_served(self.llm_endpoint, conversational_qa_chain)
 
         rolling_message = AIMessageChunk(content="")
         sources: list[Document] | None = None
@@ -500,7 +593,7 @@ class QuivrQARAGLangGraph:
                 "files": concat_list_files,
             },
             version="v2",
-            config={"metadata": metadata},
+            config={"metadata": metadata, "configurable": {"rag": self}},
         ):
             kind = event["event"]
 
@@ -530,6 +623,9 @@ class QuivrQARAGLangGraph:
                 if first_chunk_time is None:
                     first_chunk_time = time.time()
                     logger.info(f"⏱️ TIMING: First LLM chunk received at {first_chunk_time - start_time:.2f}s")
+                    registry.ttft_metrics.record(
+                        cold_start, first_chunk_time - start_time
+                    )
 
                 chunk = event["data"]["chunk"]
                 rolling_message, answer_str = parse_chunk_response(
@@ -570,7 +666,7 @@ class QuivrQARAGLangGraph:
         total_time = time.time() - start_time
         logger.info(f"⏱️ TIMING: Stream completed. Total time: {total_time:.2f}s, chunks: {chunk_id}")
         logger.info(f"🔍 DEBUG: supports_func_calling={self.llm_endpoint.supports_func_calling()}, rolling_message.tool_calls={rolling_message.tool_calls}")
-        logger.info(f"⏱️ TIMING SUMMARY: build_chain=0.00s, first_event={(first_event_time - start_time) if first_event_time else 'N/A'}s, first_chunk={(first_chunk_time - start_time) if first_chunk_time else 'N/A'}s, total={total_time:.2f}s")
+        logger.info(f"⏱️ TIMING SUMMARY: cold_start={cold_start}, build_chain={build_chain_time:.2f}s, first_event={(first_event_time - start_time) if first_event_time else 'N/A'}s, first_chunk={(first_chunk_time - start_time) if first_chunk_time else 'N/A'}s, total={total_time:.2f}s, ttft={registry.ttft_metrics.stats()}")
 
         last_chunk = ParsedRAGChunkResponse(
             answer="",
@@ -0,0 +1,104 @@
+"""
+Load test: concurrent chat throughput of QuivrQARAGLangGraph.answer_astream.
+
+Runs N concurrent chats against fake models and embeddings that simulate
+network latency, once with the async graph nodes and once with sync-only nodes
+(the previous behaviour: langgraph runs each node on a worker thread). The
+default executor is capped to emulate a busy server threadpool.
+
+    cd backend/core && OPENAI_API_KEY=fake python -m tests.load_test_concurrent_chats --chats 64 --threads 8
+"""
+
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+from uuid import uuid4
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.language_models import FakeListChatModel
+from langchain_core.runnables import RunnableConfig, RunnableLambda
+from langchain_core.vectorstores import InMemoryVectorStore
+
+from quivr_core import quivr_rag_langgraph
+from quivr_core.chat import ChatHistory
+from quivr_core.config import LLMEndpointConfig, RetrievalConfig
+from quivr_core.llm import LLMEndpoint, registry
+from quivr_core.quivr_rag_langgraph import QuivrQARAGLangGraph
+
+
+class SlowEmbeddings(DeterministicFakeEmbedding):
+    latency: float = 0.05
+
+    def embed_query(self, text: str) -> list[float]:
+        time.sleep(self.latency)
+        return super().embed_query(text)
+
+    async def aembed_query(self, text: str) -> list[float]:
+        await asyncio.sleep(self.latency)
+        return super().embed_query(text)
+
+
+def _sync_rag_node(name: str) -> RunnableLambda:
+    def run(state, config: RunnableConfig):
+        return getattr(config["configurable"]["rag"], name)(state)
+
+    return RunnableLambda(run, name=name)
+
+
+async def run_chats(n_chats: int, latency: float, vector_store) -> float:
+    llm_config = LLMEndpointConfig(model="fake_model")
+    answer = "a streamed answer of a few tokens"
+
+    async def chat():
+        llm = LLMEndpoint(
+            llm=FakeListChatModel(responses=[answer], sleep=latency / len(answer)),
+            llm_config=llm_config,
+        )
+        rag = QuivrQARAGLangGraph(
+            retrieval_config=RetrievalConfig(llm_config=llm_config),
+            llm=llm,
+            vector_store=vector_store,
+            rewrite_llm=FakeListChatModel(responses=["rewritten"], sleep=latency),
+        )
+        async for _ in rag.answer_astream("question", ChatHistory(uuid4(), uuid4()), []):
+            pass
+
+    start = time.perf_counter()
+    await asyncio.gather(*(chat() for _ in range(n_chats)))
+    return time.perf_counter() - start
+
+
+async def main(n_chats: int, threads: int, latency: float) -> None:
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=threads)
+    )
+    llm_config = LLMEndpointConfig(model="fake_model")
+    vector_store = InMemoryVectorStore(SlowEmbeddings(size=20, latency=latency))
+    await vector_store.aadd_texts([f"chunk {i}" for i in range(100)])
+
+    for label, node in (
+        ("sync nodes", _sync_rag_node),
+        ("async nodes", quivr_rag_langgraph._rag_node),
+    ):
+        registry.invalidate()
+        # Token counting only, skip loading the tiktoken encoding
+        registry.tokenizers.get_or_create(
+            (llm_config.tokenizer_hub, llm_config.fallback_tokenizer), lambda: str
+        )
+        with patch.object(quivr_rag_langgraph, "_rag_node", node):
+            elapsed = await run_chats(n_chats, latency, vector_store)
+        print(
+            f"{label}: {n_chats} chats in {elapsed:.2f}s, "
+            f"{n_chats / elapsed:.1f} chats/s ({threads} threads)"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chats", type=int, default=64)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.2)
+    args = parser.parse_args()
+    asyncio.run(main(args.chats, args.threads, args.latency))
@@ -15,10 +15,12 @@ from quivr_core.processor.registry import (
     _append_proc_mapping,
     _import_class,
     available_processors,
+    get_processor,
     get_processor_class,
     known_processors,
     register_processor,
 )
+from quivr_core.processor.splitter import SplitterConfig
 
 
 # TODO : reimplement when quivr-core will be its own package
@@ -232,3 +234,16 @@ def test_register_override_error():
 
 def test_available_processors():
     assert 17 == len(available_processors())
+
+
+def test_get_processor_cached_by_config():
+    register_processor(".cached", SimpleTxtProcessor)
+
+    first = get_processor(".cached", splitter_config=SplitterConfig(chunk_size=50))
+    assert isinstance(first, SimpleTxtProcessor)
+    assert first is get_processor(
+        ".cached", splitter_config=SplitterConfig(chunk_size=50)
+    )
+    assert first is not get_processor(
+        ".cached", splitter_config=SplitterConfig(chunk_size=60)
+    )
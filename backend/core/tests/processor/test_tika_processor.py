@@ -1,4 +1,7 @@
+import asyncio
+
 import pytest
+from langchain_text_splitters import RecursiveCharacterTextSplitter
 from quivr_core.processor.implementations.tika_processor import TikaProcessor
 
 # TODO: TIKA server should be set
@@ -22,3 +25,13 @@ async def test_send_parse_tika_exception(quivr_pdf):
         doc = await tparser.process_file(quivr_pdf)
         assert len(doc) > 0
         assert doc[0].page_content.strip("\n") == "Dummy PDF download"
+
+
+def test_tika_client_per_loop_closed_with_its_loop():
+    tparser = TikaProcessor(splitter=RecursiveCharacterTextSplitter())
+    first = asyncio.run(tparser._get_client())
+    second = asyncio.run(tparser._get_client())
+
+    assert first is not second
+    assert first.is_closed
+    assert list(tparser._clients.values()) == [second]
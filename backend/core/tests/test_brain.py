@@ -1,15 +1,33 @@
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import asdict
+from pathlib import Path
 from uuid import uuid4
 
 import pytest
 from langchain_core.documents import Document
 from langchain_core.embeddings import Embeddings
 from quivr_core.brain import Brain
+from quivr_core.brain.brain import process_files
 from quivr_core.chat import ChatHistory
+from quivr_core.files.file import QuivrFile
 from quivr_core.llm import LLMEndpoint
+from quivr_core.processor.implementations.simple_txt_processor import (
+    SimpleTxtProcessor,
+)
+from quivr_core.processor.registry import processor_instances, register_processor
+from quivr_core.processor.splitter import SplitterConfig
 from quivr_core.storage.local_storage import TransparentStorage
 
 
+class CountingTxtProcessor(SimpleTxtProcessor):
+    supported_extensions = [".counted"]
+    instances = 0
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        CountingTxtProcessor.instances += 1
+
+
 @pytest.mark.base
 def test_brain_empty_files_no_vectordb(fake_llm, embedder):
     # Testing no files
@@ -56,6 +74,42 @@ async def test_brain_from_files_success(
     assert len(await brain.storage.get_files()) == 1
 
 
+@pytest.mark.asyncio
+@pytest.mark.parametrize("executor", [None, ThreadPoolExecutor(max_workers=2)])
+async def test_process_files_concurrently(tmp_path: Path, executor):
+    register_processor(".counted", CountingTxtProcessor)
+    processor_instances.invalidate()
+    CountingTxtProcessor.instances = 0
+    storage = TransparentStorage()
+    for idx in range(20):
+        path = tmp_path / f"file_{idx}.counted"
+        path.write_text(f"content of file {idx}")
+        await storage.upload_file(
+            QuivrFile(
+                id=uuid4(),
+                original_filename=path.name,
+                path=path,
+                brain_id=uuid4(),
+                file_sha1=str(idx),
+                file_extension=".counted",
+            )
+        )
+
+    docs = await process_files(
+        storage,
+        skip_file_error=False,
+        max_concurrency=4,
+        executor=executor,
+        splitter_config=SplitterConfig(chunk_size=100, chunk_overlap=10),
+    )
+
+    # Documents keep the storage order, one processor instance for the 20 files
+    assert [doc.page_content for doc in docs] == [
+        f"content of file {idx}" for idx in range(20)
+    ]
+    assert CountingTxtProcessor.instances == 1
+
+
 @pytest.mark.asyncio
 async def test_brain_from_langchain_docs(embedder, fake_llm, mem_vector_store):
     chunk = Document("content_1", metadata={"id": uuid4()})
@@ -0,0 +1,89 @@
+from uuid import uuid4
+
+import pytest
+from langchain_core.language_models import FakeListChatModel
+from quivr_core.chat import ChatHistory
+from quivr_core.config import LLMEndpointConfig, RetrievalConfig
+from quivr_core.llm import LLMEndpoint, registry
+from quivr_core.quivr_rag_langgraph import QuivrQARAGLangGraph
+
+
+class FakeTokenizer:
+    def encode(self, text: str) -> list[str]:
+        return text.split()
+
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    registry.invalidate()
+    # Avoid downloading the tiktoken encoding
+    config = LLMEndpointConfig(model="fake_model")
+    registry.tokenizers.get_or_create(
+        (config.tokenizer_hub, config.fallback_tokenizer), FakeTokenizer
+    )
+    yield
+    registry.invalidate()
+
+
+def test_bounded_registry_reuses_and_evicts():
+    built = []
+    reg = registry.BoundedRegistry("test", max_entries=2)
+    for key in ["a", "b", "a", "c", "b"]:
+        reg.get_or_create(key, lambda key=key: built.append(key) or key)
+
+    assert built == ["a", "b", "c", "b"]
+    assert reg.stats() == {"entries": 2, "hits": 1, "misses": 4}
+    reg.invalidate("b")
+    assert len(reg) == 1
+
+
+def test_llm_endpoint_key_ignores_clear_api_key():
+    config = LLMEndpointConfig(model="fake_model", llm_api_key="secret")
+    key = registry.llm_endpoint_key(config)
+    assert "secret" not in key
+    assert key != registry.llm_endpoint_key(
+        LLMEndpointConfig(model="fake_model", llm_api_key="other")
+    )
+    assert key != registry.llm_endpoint_key(
+        LLMEndpointConfig(model="fake_model", llm_api_key="secret", temperature=0)
+    )
+
+
+def test_compiled_graph_shared_across_requests(mem_vector_store):
+    retrieval_config = RetrievalConfig(llm_config=LLMEndpointConfig(model="fake_model"))
+
+    def pipeline(answer: str) -> QuivrQARAGLangGraph:
+        llm = LLMEndpoint(
+            llm=FakeListChatModel(responses=[answer]),
+            llm_config=LLMEndpointConfig(model="fake_model"),
+        )
+        return QuivrQARAGLangGraph(
+            retrieval_config=retrieval_config,
+            llm=llm,
+            vector_store=mem_vector_store,
+            rewrite_llm=FakeListChatModel(responses=["rewritten"]),
+        )
+
+    misses = registry.graphs.misses
+    first, second = pipeline("first"), pipeline("second")
+    assert first.build_chain() is second.build_chain()
+    assert registry.graphs.misses == misses + 1
+
+    # Nodes run on the pipeline of the request, not the one that compiled the graph
+    history = ChatHistory(uuid4(), uuid4())
+    assert second.answer("question", history, []).answer == "second"
+    assert first.answer("question", history, []).answer == "first"
+
+
+def test_mark_served_and_ttft_metrics():
+    endpoint, graph = FakeTokenizer(), FakeTokenizer()
+    assert registry.mark_served(endpoint, graph)
+    assert not registry.mark_served(endpoint, graph)
+
+    metrics = registry.TTFTMetrics()
+    metrics.record(cold=True, seconds=2.0)
+    metrics.record(cold=False, seconds=0.5)
+    metrics.record(cold=False, seconds=0.7)
+    stats = metrics.stats()
+    assert stats["cold"]["count"] == 1
+    assert stats["warm"] == {"count": 2, "mean_s": 0.6, "p50_s": 0.6}
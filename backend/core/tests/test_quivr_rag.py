@@ -1,9 +1,10 @@
 from uuid import uuid4
 
 import pytest
+from langchain_core.language_models import FakeListChatModel
 from quivr_core.chat import ChatHistory
 from quivr_core.config import LLMEndpointConfig, RetrievalConfig
-from quivr_core.llm import LLMEndpoint
+from quivr_core.llm import LLMEndpoint, registry
 from quivr_core.models import ParsedRAGChunkResponse, RAGResponseMetadata
 from quivr_core.quivr_rag_langgraph import QuivrQARAGLangGraph
 
@@ -70,3 +71,43 @@ async def test_quivrqaraglanggraph(
 
     # Assert whole response makes sense
     assert "".join([r.answer for r in stream_responses]) == full_response
+
+
+class AsyncOnlyChatModel(FakeListChatModel):
+    """Fails on the blocking code paths, so the test proves the graph runs async."""
+
+    def _call(self, *args, **kwargs):
+        raise AssertionError("blocking LLM call")
+
+    def _stream(self, *args, **kwargs):
+        raise AssertionError("blocking LLM stream")
+
+
+@pytest.mark.asyncio
+async def test_quivrqaraglanggraph_astream_runs_async_nodes(mem_vector_store):
+    registry.invalidate()
+    llm_config = LLMEndpointConfig(model="fake_model")
+    # Avoid downloading the tiktoken encoding
+    registry.tokenizers.get_or_create(
+        (llm_config.tokenizer_hub, llm_config.fallback_tokenizer), lambda: str
+    )
+    llm = LLMEndpoint(
+        llm=AsyncOnlyChatModel(responses=["async answer"]), llm_config=llm_config
+    )
+    rag_pipeline = QuivrQARAGLangGraph(
+        retrieval_config=RetrievalConfig(llm_config=llm_config),
+        llm=llm,
+        vector_store=mem_vector_store,
+        rewrite_llm=AsyncOnlyChatModel(responses=["rewritten question"]),
+    )
+
+    stream_responses = [
+        resp
+        async for resp in rag_pipeline.answer_astream(
+            "tell me something", ChatHistory(uuid4(), uuid4()), []
+        )
+    ]
+    registry.invalidate()
+
+    assert "".join(r.answer for r in stream_responses) == "async answer"
+    assert stream_responses[-1].last_chunk
@@ -0,0 +1 @@
+alter table "public"."syncs_files" add column "content_hash" text;
@@ -0,0 +1,21 @@
+create table "public"."embedding_cache" (
+    "key" text not null,
+    "model" text not null,
+    "embedding" vector not null,
+    "created_at" timestamp with time zone not null default now()
+);
+
+
+alter table "public"."embedding_cache" enable row level security;
+
+CREATE UNIQUE INDEX embedding_cache_pkey ON public.embedding_cache USING btree (key);
+
+alter table "public"."embedding_cache" add constraint "embedding_cache_pkey" PRIMARY KEY using index "embedding_cache_pkey";
+
+grant delete on table "public"."embedding_cache" to "service_role";
+
+grant insert on table "public"."embedding_cache" to "service_role";
+
+grant select on table "public"."embedding_cache" to "service_role";
+
+grant update on table "public"."embedding_cache" to "service_role";
@@ -0,0 +1,15 @@
+-- HNSW index for top-k cosine similarity search on vectors.embedding.
+-- HNSW needs a fixed dimension: skip it when the column was made dimensionless
+-- (see local_20240107152745_ollama.sql).
+DO $$
+BEGIN
+    IF (
+        SELECT atttypmod
+        FROM pg_attribute
+        WHERE attrelid = 'public.vectors'::regclass AND attname = 'embedding'
+    ) > 0 THEN
+        CREATE INDEX IF NOT EXISTS vectors_embedding_hnsw_idx
+            ON public.vectors USING hnsw (embedding vector_cosine_ops)
+            WITH (m = 16, ef_construction = 64);
+    END IF;
+END $$;
@@ -0,0 +1,39 @@
+-- Existence index of the files stored under <brain_id>/ in the "quivr" bucket,
+-- so existence checks don't have to list the brain folder.
+create table "public"."storage_files" (
+    "brain_id" uuid not null,
+    "file_name" text not null,
+    "path_key" text not null,
+    "storage_path" text not null,
+    "updated_at" timestamp with time zone not null default now()
+);
+
+
+alter table "public"."storage_files" enable row level security;
+
+CREATE UNIQUE INDEX storage_files_pkey ON public.storage_files USING btree (brain_id, file_name);
+
+CREATE INDEX storage_files_path_key_idx ON public.storage_files USING btree (brain_id, path_key);
+
+alter table "public"."storage_files" add constraint "storage_files_pkey" PRIMARY KEY using index "storage_files_pkey";
+
+grant delete on table "public"."storage_files" to "service_role";
+
+grant insert on table "public"."storage_files" to "service_role";
+
+grant select on table "public"."storage_files" to "service_role";
+
+grant update on table "public"."storage_files" to "service_role";
+
+
+-- Backfill from the objects already in the bucket, the reconcile task keeps it in sync
+INSERT INTO public.storage_files (brain_id, file_name, path_key, storage_path)
+SELECT
+    split_part(o.name, '/', 1)::uuid,
+    split_part(o.name, '/', 2),
+    split_part(split_part(o.name, '/', 2), '.', 1),
+    o.name
+FROM storage.objects o
+WHERE o.bucket_id = 'quivr'
+  AND o.name ~ '^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}/[^/]+$'
+ON CONFLICT DO NOTHING;
@@ -0,0 +1,61 @@
+-- Leases on active syncs: the scheduler claims due syncs with row locks instead of
+-- asking every celery worker what it is running.
+alter table "public"."syncs_active" add column "lease_until" timestamp with time zone;
+
+CREATE INDEX syncs_active_last_synced_idx ON public.syncs_active USING btree (last_synced);
+
+set check_function_bodies = off;
+
+-- Claims the due syncs (not synced for 6 hours, or forced) that nobody holds a lease on,
+-- keeping at most max_running leases alive. Concurrent schedulers are serialised by an
+-- advisory lock, so they never claim the same row nor overshoot max_running together.
+CREATE OR REPLACE FUNCTION public.claim_due_syncs(max_running integer, lease_seconds integer)
+ RETURNS TABLE(sync_id bigint, lag_seconds double precision)
+ LANGUAGE plpgsql
+AS $function$
+DECLARE
+    running integer;
+BEGIN
+    -- Held until commit: the next scheduler counts the leases taken here
+    PERFORM pg_advisory_xact_lock(hashtext('claim_due_syncs'));
+
+    SELECT count(*) INTO running
+    FROM syncs_active sa
+    WHERE sa.lease_until > now();
+
+    RETURN QUERY
+    WITH due AS (
+        SELECT sa.id
+        FROM syncs_active sa
+        WHERE (sa.force_sync OR sa.last_synced < now() - interval '360 minutes')
+          AND (sa.lease_until IS NULL OR sa.lease_until <= now())
+        ORDER BY sa.force_sync DESC, sa.last_synced
+        LIMIT greatest(max_running - running, 0)
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE syncs_active sa
+    SET lease_until = now() + make_interval(secs => lease_seconds)
+    FROM due
+    WHERE sa.id = due.id
+    RETURNING
+        sa.id,
+        CASE
+            WHEN sa.force_sync THEN 0
+            ELSE extract(epoch FROM now() - (sa.last_synced + interval '360 minutes'))
+        END::double precision;
+END;
+$function$;
+
+-- Takes the lease of one sync (direct syncs of selected files), false if it is already held.
+CREATE OR REPLACE FUNCTION public.claim_sync_lease(p_sync_id bigint, lease_seconds integer)
+ RETURNS boolean
+ LANGUAGE plpgsql
+AS $function$
+BEGIN
+    UPDATE syncs_active sa
+    SET lease_until = now() + make_interval(secs => lease_seconds)
+    WHERE sa.id = p_sync_id
+      AND (sa.lease_until IS NULL OR sa.lease_until <= now());
+    RETURN FOUND;
+END;
+$function$;
@@ -0,0 +1,43 @@
+-- Watermarks of the premium reconciliation: between full sweeps, check_is_premium only
+-- looks at the subscriptions and customers that changed since the last run.
+create table "public"."premium_reconciliation_state" (
+    "id" integer not null default 1,
+    "watermark" timestamp with time zone,
+    "last_full_sweep" timestamp with time zone
+);
+
+
+alter table "public"."premium_reconciliation_state" enable row level security;
+
+CREATE UNIQUE INDEX premium_reconciliation_state_pkey ON public.premium_reconciliation_state USING btree (id);
+
+alter table "public"."premium_reconciliation_state" add constraint "premium_reconciliation_state_pkey" PRIMARY KEY using index "premium_reconciliation_state_pkey";
+
+alter table "public"."premium_reconciliation_state" add constraint "premium_reconciliation_state_single_row" CHECK ((id = 1));
+
+grant insert on table "public"."premium_reconciliation_state" to "service_role";
+
+grant select on table "public"."premium_reconciliation_state" to "service_role";
+
+grant update on table "public"."premium_reconciliation_state" to "service_role";
+
+CREATE INDEX user_settings_is_premium_idx ON public.user_settings USING btree (user_id) WHERE is_premium;
+
+set check_function_bodies = off;
+
+-- Drops the premium settings of users who lost their subscription in one statement,
+-- the ids are sent in the request body instead of the URL.
+CREATE OR REPLACE FUNCTION public.delete_premium_settings(user_ids uuid[])
+ RETURNS integer
+ LANGUAGE plpgsql
+AS $function$
+DECLARE
+    deleted integer;
+BEGIN
+    DELETE FROM user_settings us
+    WHERE us.user_id = ANY(user_ids)
+      AND us.is_premium;
+    GET DIAGNOSTICS deleted = ROW_COUNT;
+    RETURN deleted;
+END;
+$function$;
@@ -0,0 +1,86 @@
+-- Brain usage analytics are counted in the database instead of downloading every
+-- chat_history row: a grouped count over a date range, or a per-day rollup kept up
+-- to date by a trigger, whose cost doesn't depend on the size of the history.
+CREATE INDEX chat_history_brain_id_message_time_idx ON public.chat_history USING btree (brain_id, message_time);
+
+create table "public"."brain_usage_daily" (
+    "brain_id" uuid not null,
+    "day" date not null,
+    "usage_count" integer not null default 0
+);
+
+
+alter table "public"."brain_usage_daily" enable row level security;
+
+CREATE UNIQUE INDEX brain_usage_daily_pkey ON public.brain_usage_daily USING btree (brain_id, day);
+
+alter table "public"."brain_usage_daily" add constraint "brain_usage_daily_pkey" PRIMARY KEY using index "brain_usage_daily_pkey";
+
+alter table "public"."brain_usage_daily" add constraint "brain_usage_daily_brain_id_fkey" FOREIGN KEY (brain_id) REFERENCES brains(brain_id) ON UPDATE CASCADE ON DELETE CASCADE not valid;
+
+alter table "public"."brain_usage_daily" validate constraint "brain_usage_daily_brain_id_fkey";
+
+grant delete on table "public"."brain_usage_daily" to "service_role";
+
+grant insert on table "public"."brain_usage_daily" to "service_role";
+
+grant select on table "public"."brain_usage_daily" to "service_role";
+
+grant update on table "public"."brain_usage_daily" to "service_role";
+
+set check_function_bodies = off;
+
+CREATE OR REPLACE FUNCTION public.update_brain_usage_daily()
+ RETURNS trigger
+ LANGUAGE plpgsql
+AS $function$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.brain_id IS NOT NULL THEN
+        UPDATE brain_usage_daily
+        SET usage_count = usage_count - 1
+        WHERE brain_id = OLD.brain_id
+          AND day = date_trunc('day', OLD.message_time)::date;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.brain_id IS NOT NULL THEN
+        INSERT INTO brain_usage_daily (brain_id, day, usage_count)
+        VALUES (NEW.brain_id, date_trunc('day', NEW.message_time)::date, 1)
+        ON CONFLICT (brain_id, day)
+        DO UPDATE SET usage_count = brain_usage_daily.usage_count + 1;
+    END IF;
+    RETURN NULL;
+END;
+$function$;
+
+CREATE TRIGGER update_brain_usage_daily_trigger AFTER INSERT OR DELETE OR UPDATE OF brain_id, message_time ON public.chat_history FOR EACH ROW EXECUTE FUNCTION update_brain_usage_daily();
+
+INSERT INTO brain_usage_daily (brain_id, day, usage_count)
+SELECT ch.brain_id, date_trunc('day', ch.message_time)::date, count(*)
+FROM chat_history ch
+JOIN brains b ON b.brain_id = ch.brain_id
+WHERE ch.message_time IS NOT NULL
+GROUP BY 1, 2;
+
+-- Messages per day of the given brains, between start_date and end_date included.
+CREATE OR REPLACE FUNCTION public.get_brains_usages(brain_ids uuid[], start_date date, end_date date, use_rollup boolean DEFAULT true)
+ RETURNS TABLE(day date, usage_count bigint)
+ LANGUAGE plpgsql
+AS $function$
+BEGIN
+    IF use_rollup THEN
+        RETURN QUERY
+        SELECT bud.day, sum(bud.usage_count)::bigint
+        FROM brain_usage_daily bud
+        WHERE bud.brain_id = ANY(brain_ids)
+          AND bud.day BETWEEN start_date AND end_date
+        GROUP BY bud.day;
+    ELSE
+        RETURN QUERY
+        SELECT date_trunc('day', ch.message_time)::date, count(*)
+        FROM chat_history ch
+        WHERE ch.brain_id = ANY(brain_ids)
+          AND ch.message_time >= start_date
+          AND ch.message_time < end_date + 1
+        GROUP BY 1;
+    END IF;
+END;
+$function$;
@@ -1,7 +1,11 @@
 import asyncio
+import json
+import os
 import threading
+import time
 from enum import Enum
-from queue import Queue
+from pathlib import Path
+from queue import Empty, Queue
 from uuid import UUID
 
 from attr import dataclass
@@ -18,6 +22,9 @@ from quivr_api.modules.notification.entity.notification import NotificationsStat
 from quivr_api.modules.notification.service.notification_service import (
     NotificationService,
 )
+from quivr_api.modules.notification.service.notification_writer import (
+    NotificationWriter,
+)
 from quivr_core.models import KnowledgeStatus
 from sqlmodel.ext.asyncio.session import AsyncSession
 
@@ -26,6 +33,14 @@ logger = get_logger("notifier_service")
 notification_service = NotificationService()
 queue = Queue()
 
+# Events are applied by batches of EVENT_BATCH_SIZE, or every EVENT_BATCH_SECONDS
+EVENT_BATCH_SIZE = 100
+EVENT_BATCH_SECONDS = 1.0
+MAX_BATCH_ATTEMPTS = 5
+JOURNAL_PATH = Path(
+    os.getenv("NOTIFIER_JOURNAL_PATH", "/tmp/quivr_notifier_journal.jsonl")
+)
+
 
 class TaskStatus(str, Enum):
     FAILED = "task-failed"
@@ -47,6 +62,155 @@ class TaskEvent:
     knowledge_id: UUID | None
     status: TaskStatus
 
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "task_id": self.task_id,
+                "brain_id": str(self.brain_id) if self.brain_id else None,
+                "task_name": self.task_name.value,
+                "notification_id": self.notification_id,
+                "knowledge_id": str(self.knowledge_id) if self.knowledge_id else None,
+                "status": self.status.value,
+            }
+        )
+
+    @classmethod
+    def from_json(cls, line: str) -> "TaskEvent":
+        data = json.loads(line)
+        return cls(
+            task_id=data["task_id"],
+            brain_id=data["brain_id"],
+            task_name=TaskIdentifier(data["task_name"]),
+            notification_id=data["notification_id"],
+            knowledge_id=data["knowledge_id"],
+            status=TaskStatus(data["status"]),
+        )
+
+
+class EventJournal:
+    """
+    Events received but not applied yet, one JSON line each, in the order they were queued.
+    Events left over by a crash or restart are queued again when the notifier starts,
+    so a batch held in memory never loses terminal states.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def append(self, event: TaskEvent) -> None:
+        with self._lock, open(self.path, "a") as f:
+            f.write(event.to_json() + "\n")
+
+    def pending(self) -> list[TaskEvent]:
+        with self._lock:
+            if not self.path.exists():
+                return []
+            return [
+                TaskEvent.from_json(line)
+                for line in self.path.read_text().splitlines()
+                if line
+            ]
+
+    def commit(self, n_events: int) -> None:
+        """Drop the first `n_events` events, once they are applied."""
+        with self._lock:
+            if not self.path.exists():
+                return
+            lines = self.path.read_text().splitlines(keepends=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            tmp_path.write_text("".join(lines[n_events:]))
+            os.replace(tmp_path, self.path)
+
+
+journal = EventJournal(JOURNAL_PATH)
+
+
+def _drain(max_events: int, timeout: float) -> list[TaskEvent]:
+    """Wait for events until `max_events` are received or `timeout` seconds passed."""
+    events: list[TaskEvent] = []
+    deadline = time.monotonic() + timeout
+    while len(events) < max_events:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            events.append(queue.get(timeout=remaining))
+        except Empty:
+            break
+    return events
+
+
+async def apply_events(
+    events: list[TaskEvent],
+    knowledge_service: KnowledgeService,
+    task_service: TasksService,
+):
+    """
+    Apply a batch of task events: notification transitions are written in bulk and
+    knowledge statuses with one update per status. The last event of a file wins.
+    """
+    notification_writer = NotificationWriter(
+        notification_service, max_batch_size=EVENT_BATCH_SIZE
+    )
+    knowledge_statuses: dict[UUID, KnowledgeStatus] = {}
+    for event in events:
+        if event.task_name == TaskIdentifier.PROCESS_ASSISTANT_TASK:
+            if event.status == TaskStatus.FAILED:
+                # Update the task status to error
+                logger.info(
+                    f"task {event.task_id} process_assistant_task failed. Updating task {event.notification_id} to error"
+                )
+                await task_service.update_task(
+                    int(event.notification_id), {"status": "error"}
+                )
+            continue
+
+        if event.status == TaskStatus.FAILED:
+            logger.error(
+                f"task {event.task_id} {event.task_name.value} failed. Updating notification {event.notification_id} and knowledge {event.knowledge_id} to error"
+            )
+            await notification_writer.update(
+                event.notification_id,
+                NotificationUpdatableProperties(
+                    status=NotificationsStatusEnum.ERROR,
+                    description=(
+                        "An error occurred while processing the file"
+                        if event.task_name == TaskIdentifier.PROCESS_FILE_TASK
+                        else "An error occurred while processing the URL"
+                    ),
+                ),
+            )
+            knowledge_status = KnowledgeStatus.ERROR
+        else:
+            logger.info(
+                f"task {event.task_id} {event.task_name.value} succeeded. Updating notification {event.notification_id} and knowledge {event.knowledge_id} to uploaded"
+            )
+            await notification_writer.update(
+                event.notification_id,
+                NotificationUpdatableProperties(
+                    status=NotificationsStatusEnum.SUCCESS,
+                    description=(
+                        "Your file has been properly uploaded!"
+                        if event.task_name == TaskIdentifier.PROCESS_FILE_TASK
+                        else "Your URL has been properly crawled!"
+                    ),
+                ),
+            )
+            knowledge_status = KnowledgeStatus.UPLOADED
+
+        if event.knowledge_id:
+            knowledge_id = UUID(str(event.knowledge_id))
+            knowledge_statuses.pop(knowledge_id, None)
+            knowledge_statuses[knowledge_id] = knowledge_status
+
+    await notification_writer.flush()
+    for status in (KnowledgeStatus.ERROR, KnowledgeStatus.UPLOADED):
+        await knowledge_service.update_status_knowledges(
+            [kid for kid, kstatus in knowledge_statuses.items() if kstatus == status],
+            status,
+        )
+
 
 async def handler_loop():
     session = AsyncSession(async_engine, expire_on_commit=False, autoflush=False)
@@ -54,67 +218,29 @@ async def handler_loop():
     task_service = TasksService(TasksRepository(session))
 
     logger.info("Initialized knowledge_service. Listening to task event...")
+    batch: list[TaskEvent] = []
+    attempts = 0
     while True:
+        batch.extend(_drain(EVENT_BATCH_SIZE - len(batch), EVENT_BATCH_SECONDS))
+        if not batch:
+            continue
         try:
-            event: TaskEvent = queue.get()
-            if event.status == TaskStatus.FAILED:
-                if event.task_name == TaskIdentifier.PROCESS_ASSISTANT_TASK:
-                    # Update the task status to error
-                    logger.info(f"task {event.task_id} process_assistant_task failed. Updating task {event.notification_id} to error")
-                    await task_service.update_task(int(event.notification_id), {"status": "error"})
-                else:
-                    logger.error(
-                        f"task {event.task_id} process_file_task. Sending notifition {event.notification_id}"
-                    )
-                    notification_service.update_notification_by_id(
-                        event.notification_id,
-                        NotificationUpdatableProperties(
-                            status=NotificationsStatusEnum.ERROR,
-                            description=(
-                                "An error occurred while processing the file"
-                                if event.task_name == TaskIdentifier.PROCESS_FILE_TASK
-                                else "An error occurred while processing the URL"
-                            ),
-                        ),
-                    )
-                    logger.error(
-                        f"task {event.task_id} process_file_task  failed. Updating knowledge {event.knowledge_id} to Error"
-                    )
-                    if event.knowledge_id:
-                        await knowledge_service.update_status_knowledge(
-                            event.knowledge_id, KnowledgeStatus.ERROR
-                        )
-                    logger.error(
-                        f"task {event.task_id} process_file_task . Updating knowledge {event.knowledge_id} status to Error"
-                    )
-
-            if event.status == TaskStatus.SUCCESS:
-                logger.info(
-                    f"task {event.task_id} process_file_task succeeded. Sending notification {event.notification_id}"
-                )
-                notification_service.update_notification_by_id(
-                    event.notification_id,
-                    NotificationUpdatableProperties(
-                        status=NotificationsStatusEnum.SUCCESS,
-                        description=(
-                            "Your file has been properly uploaded!"
-                            if event.task_name == TaskIdentifier.PROCESS_FILE_TASK
-                            else "Your URL has been properly crawled!"
-                        ),
-                    ),
-                )
-                if event.knowledge_id:
-                    await knowledge_service.update_status_knowledge(
-                        knowledge_id=event.knowledge_id,
-                        status=KnowledgeStatus.UPLOADED,
-                        brain_id=event.brain_id,
-                    )
-                logger.info(
-                    f"task {event.task_id} process_file_task failed. Updating knowledge {event.knowledge_id} to UPLOADED"
-                )
-
+            await apply_events(batch, knowledge_service, task_service)
         except Exception as e:
-            logger.error(f"Excpetion occured handling event {event}: {e}")
+            attempts += 1
+            logger.error(f"Exception occured handling {len(batch)} events: {e}")
+            if attempts < MAX_BATCH_ATTEMPTS:
+                # Events stay in the journal and in the batch, retried with the next ones
+                await asyncio.sleep(attempts)
+                continue
+            # Isolate the events that can't be applied
+            for event in batch:
+                try:
+                    await apply_events([event], knowledge_service, task_service)
+                except Exception as e:
+                    logger.error(f"Exception occured handling event {event}: {e}")
+        journal.commit(len(batch))
+        batch, attempts = [], 0
 
 
 def notifier(app):
@@ -133,26 +259,28 @@ def notifier(app):
                 knowledge_id = task_kwargs.get("knowledge_id", None)
                 brain_id = task_kwargs.get("brain_id", None)
                 event = TaskEvent(
-                    task_id=task,
+                    task_id=task.id,
                     task_name=TaskIdentifier(task_name),
                     knowledge_id=knowledge_id,
                     brain_id=brain_id,
                     notification_id=notification_id,
                     status=TaskStatus(event["type"]),
                 )
+                journal.append(event)
                 queue.put(event)
             elif task_name == "process_assistant_task":
                 logger.debug(f"Received Event : {task} - {task_name} {task_kwargs} ")
                 notification_uuid = task_kwargs["notification_uuid"]
                 task_id = task_kwargs["task_id"]
                 event = TaskEvent(
-                    task_id=task,
+                    task_id=task.id,
                     task_name=TaskIdentifier(task_name),
                     knowledge_id=None,
                     brain_id=None,
                     notification_id=task_id,
                     status=TaskStatus(event["type"]),
                 )
+                journal.append(event)
                 queue.put(event)
 
         except Exception as e:
@@ -192,6 +320,12 @@ def is_being_executed(task_name: str) -> bool:
 if __name__ == "__main__":
     logger.info("Started  quivr-notifier service...")
 
+    replayed = journal.pending()
+    if replayed:
+        logger.info(f"Replaying {len(replayed)} events received before the last restart")
+    for event in replayed:
+        queue.put(event)
+
     def start_handler():
         asyncio.run(handler_loop())
 
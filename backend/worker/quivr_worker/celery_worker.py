@@ -1,5 +1,6 @@
 import asyncio
 import os
+import time
 from uuid import UUID
 
 import structlog
@@ -11,7 +12,7 @@ from celery.utils.log import get_task_logger
 from dotenv import load_dotenv
 from quivr_api.celery_config import celery
 from quivr_api.logger import setup_logger
-from quivr_api.models.settings import settings
+from quivr_api.models.settings import SyncSchedulerSettings, settings
 from quivr_api.modules.assistant.repository.tasks import TasksRepository
 from quivr_api.modules.assistant.services.tasks_service import TasksService
 from quivr_api.modules.brain.integrations.Notion.Notion_connector import NotionConnector
@@ -28,6 +29,7 @@ from quivr_api.modules.sync.dto.inputs import SyncsUserStatus
 from quivr_api.modules.sync.repository.sync_files import SyncFilesRepository
 from quivr_api.modules.sync.service.sync_notion import SyncNotionService
 from quivr_api.modules.sync.service.sync_service import SyncService, SyncUserService
+from quivr_api.modules.upload.service.storage_index import get_storage_index
 from quivr_api.modules.vector.repository.vectors_repository import VectorRepository
 from quivr_api.modules.vector.service.vector_service import VectorService
 from quivr_api.utils.telemetry import maybe_send_telemetry
@@ -37,13 +39,13 @@ from sqlmodel import Session, text
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from quivr_worker.assistants.assistants import process_assistant
-from quivr_worker.celery_monitor import is_being_executed
 from quivr_worker.check_premium import check_is_premium
 from quivr_worker.process.process_s3_file import process_uploaded_file
 from quivr_worker.process.process_url import process_url_func
 from quivr_worker.syncs.process_active_syncs import (
     SyncServices,
-    process_all_active_syncs,
+    claim_due_syncs,
+    process_active_sync,
     process_notion_sync,
     process_sync,
 )
@@ -71,6 +73,7 @@ sync_files_repo_service = SyncFilesRepository()
 brain_service = BrainService()
 brain_vectors = BrainsVectors()
 storage = SupabaseS3Storage()
+sync_scheduler_settings = SyncSchedulerSettings()
 notion_service: SyncNotionService | None = None
 async_engine: AsyncEngine | None = None
 engine: Engine | None = None
@@ -319,55 +322,71 @@ def check_is_premium_task():
     check_is_premium(supabase_client)
 
 
-@celery.task(name="process_sync_task")
-def process_sync_task(
-    sync_id: int, user_id: str, files_ids: list[str], folder_ids: list[str]
-):
-    global async_engine
+def _sync_services() -> SyncServices:
     assert async_engine
-    sync = next(
-        filter(lambda s: s.id == sync_id, sync_active_service.get_syncs_active(user_id))
+    return SyncServices(
+        async_engine=async_engine,
+        sync_active_service=sync_active_service,
+        sync_user_service=sync_user_service,
+        sync_files_repo_service=sync_files_repo_service,
+        storage=storage,
+        brain_vectors=brain_vectors,
+        notification_service=notification_service,
     )
-    loop = asyncio.get_event_loop()
-    loop.run_until_complete(
-        process_sync(
-            sync=sync,
-            files_ids=files_ids,
-            folder_ids=folder_ids,
-            services=SyncServices(
-                async_engine=async_engine,
-                sync_active_service=sync_active_service,
-                sync_user_service=sync_user_service,
-                sync_files_repo_service=sync_files_repo_service,
-                storage=storage,
-                brain_vectors=brain_vectors,
-                notification_service=notification_service,
-            ),
+
+
+@celery.task(bind=True, name="process_sync_task", max_retries=60)
+def process_sync_task(
+    self, sync_id: int, user_id: str, files_ids: list[str], folder_ids: list[str]
+):
+    # Don't run a direct sync while the periodic sync of the same sync is running
+    if not sync_active_service.claim_sync_lease(
+        sync_id, sync_scheduler_settings.sync_lease_seconds
+    ):
+        logger.info(f"Sync {sync_id} is already running, retrying later")
+        raise self.retry(countdown=60)
+    try:
+        sync = next(
+            filter(
+                lambda s: s.id == sync_id,
+                sync_active_service.get_syncs_active(user_id),
+            )
         )
-    )
+        loop = asyncio.get_event_loop()
+        loop.run_until_complete(
+            process_sync(
+                sync=sync,
+                files_ids=files_ids,
+                folder_ids=folder_ids,
+                services=_sync_services(),
+            )
+        )
+    finally:
+        sync_active_service.release_sync_lease(sync_id)
 
 
 @celery.task(name="process_active_syncs_task")
 def process_active_syncs_task():
-    sync_already_running = is_being_executed("process_sync_task")
+    # Claims are row leases in syncs_active: no need to ask every worker what it runs,
+    # and each sync is processed by its own task
+    claimed_at = time.time()
+    for claim in claim_due_syncs(sync_active_service, sync_scheduler_settings):
+        process_active_sync_task.delay(
+            sync_id=claim.sync_id, lag_seconds=claim.lag_seconds, claimed_at=claimed_at
+        )
 
-    if sync_already_running:
-        logger.info("Sync already running, skipping")
-        return
-    global async_engine
-    assert async_engine
+
+@celery.task(name="process_active_sync_task")
+def process_active_sync_task(
+    sync_id: int, lag_seconds: float = 0, claimed_at: float | None = None
+):
     loop = asyncio.get_event_loop()
     loop.run_until_complete(
-        process_all_active_syncs(
-            SyncServices(
-                async_engine=async_engine,
-                sync_active_service=sync_active_service,
-                sync_user_service=sync_user_service,
-                sync_files_repo_service=sync_files_repo_service,
-                storage=storage,
-                brain_vectors=brain_vectors,
-                notification_service=notification_service,
-            ),
+        process_active_sync(
+            sync_id,
+            _sync_services(),
+            lag_seconds=lag_seconds,
+            claimed_at=claimed_at,
         )
     )
 
@@ -411,6 +430,12 @@ def clean_notion_user_syncs():
     sync_user_service.clean_notion_user_syncs()
 
 
+@celery.task(name="reconcile_storage_index_task")
+def reconcile_storage_index_task():
+    logger.debug("Reconciling storage index")
+    get_storage_index().reconcile_all()
+
+
 celery.conf.beat_schedule = {
     "ping_telemetry": {
         "task": f"{__name__}.ping_telemetry",
@@ -432,4 +457,8 @@ celery.conf.beat_schedule = {
         "task": "clean_notion_user_syncs",
         "schedule": crontab(minute="0", hour="0"),
     },
+    "reconcile_storage_index": {
+        "task": "reconcile_storage_index_task",
+        "schedule": crontab(minute="0", hour="3"),
+    },
 }
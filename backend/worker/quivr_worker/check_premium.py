@@ -1,141 +1,278 @@
 import os
-from datetime import datetime, timedelta
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any
 
 from postgrest.exceptions import APIError
-from pytz import timezone
 from quivr_api.logger import get_logger
 
 from supabase import Client
 
 logger = get_logger("celery_worker")
 
+# Watermarks only see new, renewed and expired subscriptions. Full sweeps catch the
+# rest: cancellations, past due payments, users signing up after paying, product changes
+FULL_SWEEP_INTERVAL = timedelta(hours=1)
+# Rescan a little before the watermark for late Stripe writes and clock skew
+WATERMARK_OVERLAP = timedelta(minutes=5)
+# Emails per users query, they are sent in the URL
+USERS_BATCH_SIZE = 100
 
-# TODO: Remove all this code and use Stripe Webhooks
-def check_is_premium(supabase_client: Client):
-    if os.getenv("DEACTIVATE_STRIPE") == "true":
-        logger.info("Stripe deactivated, skipping check for premium users")
-        return True
+PREMIUM_STATUSES = ("active", "trialing")
+PRODUCT_FEATURES = ("max_brains", "max_brain_size", "monthly_chat_credit", "api_access")
 
-    paris_tz = timezone("Europe/Paris")
-    current_time = datetime.now(paris_tz)
-    current_time_str = current_time.strftime("%Y-%m-%d %H:%M:%S.%f")
-    logger.debug(f"Current time: {current_time_str}")
+Row = dict[str, Any]
 
-    # Define the memoization period (e.g., 1 hour)
-    memoization_period = timedelta(hours=1)
-    memoization_cutoff = current_time - memoization_period
 
-    # Fetch all necessary data in bulk
-    try:
-        subscriptions = (
-            supabase_client.table("subscriptions")
-            .select("*")
-            .filter("current_period_end", "gt", current_time_str)
-            .execute()
-        ).data
-    except APIError as e:
-        logger.error(f"Error fetching subscribtions : {e}")
-        return
+@dataclass
+class PremiumCheckReport:
+    full_sweep: bool
+    subscriptions: int = 0
+    customers: int = 0
+    upserted: int = 0
+    deleted: int = 0
+    duration_seconds: float = 0.0
 
-    customers = (supabase_client.table("customers").select("*").execute()).data
+    def __str__(self) -> str:
+        return (
+            f"{'full sweep' if self.full_sweep else 'incremental'}: "
+            f"{self.subscriptions} subscriptions, {self.customers} customers, "
+            f"upserted {self.upserted} premium users, deleted {self.deleted} "
+            f"in {self.duration_seconds:.2f}s"
+        )
 
-    customer_emails = [customer["email"] for customer in customers]
 
-    # Split customer emails into batches of 50
-    email_batches = [
-        customer_emails[i : i + 20] for i in range(0, len(customer_emails), 20)
-    ]
+def _stripe_time(value: datetime) -> str:
+    # Stripe foreign tables hold naive UTC timestamps
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
 
-    users = []
-    for email_batch in email_batches:
-        batch_users = (
-            supabase_client.table("users")
-            .select("id, email")
-            .in_("email", email_batch)
-            .execute()
-        ).data
-        users.extend(batch_users)
 
-    product_features = (
-        supabase_client.table("product_to_features").select("*").execute()
-    ).data
+def _parse_time(value: str | None) -> datetime | None:
+    return datetime.fromisoformat(value) if value else None
 
-    user_settings = (supabase_client.table("user_settings").select("*").execute()).data
 
-    # Create lookup dictionaries for faster access
-    user_dict = {user["email"]: user["id"] for user in users}
+def premium_settings(
+    subscriptions: list[Row],
+    customers: list[Row],
+    users: list[Row],
+    products: list[Row],
+) -> dict[str, Row]:
+    """The features of the users holding a running subscription, by user id."""
+    user_dict = {user["email"]: str(user["id"]) for user in users}
     customer_dict = {customer["id"]: customer for customer in customers}
-    product_dict = {
-        product["stripe_product_id"]: product for product in product_features
-    }
-    settings_dict = {setting["user_id"]: setting for setting in user_settings}
+    product_dict = {product["stripe_product_id"]: product for product in products}
 
-    # Process subscriptions and update user settings
-    premium_user_ids = set()
-    settings_to_upsert = {}
+    settings: dict[str, Row] = {}
     for sub in subscriptions:
-        logger.info(f"Subscription {sub['id']}")
-        if sub["attrs"]["status"] != "active" and sub["attrs"]["status"] != "trialing":
-            logger.info(f"Subscription {sub['id']} is not active or trialing")
+        if sub["attrs"]["status"] not in PREMIUM_STATUSES:
+            logger.debug(f"Subscription {sub['id']} is not active or trialing")
             continue
 
         customer = customer_dict.get(sub["customer"])
         if not customer:
-            logger.info(f"No customer found for subscription: {sub['customer']}")
+            logger.debug(f"No customer found for subscription: {sub['customer']}")
             continue
 
         user_id = user_dict.get(customer["email"])
         if not user_id:
-            logger.info(f"No user found for customer: {customer['email']}")
+            logger.debug(f"No user found for customer: {customer['email']}")
             continue
 
-        current_settings = settings_dict.get(user_id, {})
-        last_check = current_settings.get("last_stripe_check")
-
-        # Skip if the user was checked recently
-        if last_check and datetime.fromisoformat(last_check) > memoization_cutoff:
-            premium_user_ids.add(user_id)
-            logger.info(f"User {user_id} was checked recently")
-            continue
-
-        user_id = str(user_id)  # Ensure user_id is a string
-        premium_user_ids.add(user_id)
-
         product_id = sub["attrs"]["items"]["data"][0]["plan"]["product"]
         product = product_dict.get(product_id)
         if not product:
             logger.warning(f"No matching product found for subscription: {sub['id']}")
             continue
 
-        settings_to_upsert[user_id] = {
+        settings[user_id] = {
             "user_id": user_id,
-            "max_brains": product["max_brains"],
-            "max_brain_size": product["max_brain_size"],
-            "monthly_chat_credit": product["monthly_chat_credit"],
-            "api_access": product["api_access"],
+            **{feature: product[feature] for feature in PRODUCT_FEATURES},
             "is_premium": True,
-            "last_stripe_check": current_time_str,
         }
-        logger.info(f"Upserting settings for user {user_id}")
-
-    # Bulk upsert premium user settings in batches of 10
-    settings_list = list(settings_to_upsert.values())
-    logger.info(f"Upserting {len(settings_list)} settings")
-    for i in range(0, len(settings_list), 10):
-        batch = settings_list[i : i + 10]
-        supabase_client.table("user_settings").upsert(batch).execute()
-
-    # Delete settings for non-premium users in batches of 10
-    settings_to_delete = [
-        setting["user_id"]
-        for setting in user_settings
-        if setting["user_id"] not in premium_user_ids and setting.get("is_premium")
+    return settings
+
+
+def settings_changes(
+    premium: dict[str, Row], current: list[Row]
+) -> tuple[list[Row], list[str]]:
+    """
+    Diff the wanted premium settings against the current premium rows: the rows to
+    upsert, skipping users already up to date, and the users to downgrade.
+    """
+    current_dict = {str(row["user_id"]): row for row in current}
+    to_upsert = [
+        settings
+        for user_id, settings in premium.items()
+        if any(
+            current_dict.get(user_id, {}).get(feature) != settings[feature]
+            for feature in PRODUCT_FEATURES
+        )
     ]
-    for i in range(0, len(settings_to_delete), 10):
-        batch = settings_to_delete[i : i + 10]
-        supabase_client.table("user_settings").delete().in_("user_id", batch).execute()
+    to_delete = [user_id for user_id in current_dict if user_id not in premium]
+    return to_upsert, to_delete
+
+
+def _load_state(supabase_client: Client) -> tuple[datetime | None, datetime | None]:
+    rows = (
+        supabase_client.table("premium_reconciliation_state")
+        .select("watermark, last_full_sweep")
+        .eq("id", 1)
+        .execute()
+    ).data
+    if not rows:
+        return None, None
+    return _parse_time(rows[0]["watermark"]), _parse_time(rows[0]["last_full_sweep"])
+
+
+def _save_state(
+    supabase_client: Client, watermark: datetime, last_full_sweep: datetime | None
+):
+    state: Row = {"id": 1, "watermark": watermark.isoformat()}
+    if last_full_sweep:
+        state["last_full_sweep"] = last_full_sweep.isoformat()
+    supabase_client.table("premium_reconciliation_state").upsert(state).execute()
+
+
+def _changed_customer_ids(
+    supabase_client: Client, since: datetime, now: datetime
+) -> set[str]:
+    since_str, now_str = _stripe_time(since), _stripe_time(now)
+    # New subscriptions and renewals move the period start
+    started = (
+        supabase_client.table("subscriptions")
+        .select("customer")
+        .filter("current_period_start", "gt", since_str)
+        .execute()
+    ).data
+    # Periods that ended since the last run without being renewed
+    ended = (
+        supabase_client.table("subscriptions")
+        .select("customer")
+        .filter("current_period_end", "gt", since_str)
+        .filter("current_period_end", "lte", now_str)
+        .execute()
+    ).data
+    created = (
+        supabase_client.table("customers")
+        .select("id")
+        .filter("created", "gt", since_str)
+        .execute()
+    ).data
+    return {sub["customer"] for sub in started + ended} | {
+        customer["id"] for customer in created
+    }
+
+
+def _fetch_users(supabase_client: Client, emails: list[str]) -> list[Row]:
+    users = []
+    for i in range(0, len(emails), USERS_BATCH_SIZE):
+        users.extend(
+            (
+                supabase_client.table("users")
+                .select("id, email")
+                .in_("email", emails[i : i + USERS_BATCH_SIZE])
+                .execute()
+            ).data
+        )
+    return users
+
 
-    logger.info(
-        f"Updated {len(settings_to_upsert)} premium users, deleted settings for {len(settings_to_delete)} non-premium users"
+def reconcile_premium_users(
+    supabase_client: Client, now: datetime, since: datetime | None
+) -> PremiumCheckReport:
+    """
+    Align `user_settings` on the running Stripe subscriptions. With `since`, only the
+    customers whose subscriptions started, renewed or ended after it are looked at,
+    otherwise every customer is.
+    """
+    report = PremiumCheckReport(full_sweep=since is None)
+    now_str = _stripe_time(now)
+
+    subscriptions_query = (
+        supabase_client.table("subscriptions")
+        .select("id, customer, attrs")
+        .filter("current_period_end", "gt", now_str)
+    )
+    customers_query = supabase_client.table("customers").select("id, email")
+    if since is not None:
+        customer_ids = list(_changed_customer_ids(supabase_client, since, now))
+        if not customer_ids:
+            return report
+        changed = customers_query.in_("id", customer_ids).execute().data
+        # A user can be several customers, all their subscriptions count
+        emails = list({customer["email"] for customer in changed})
+        customers_query = (
+            supabase_client.table("customers").select("id, email").in_("email", emails)
+        )
+
+    customers = customers_query.execute().data
+    if since is not None:
+        subscriptions_query = subscriptions_query.in_(
+            "customer", [customer["id"] for customer in customers]
+        )
+    subscriptions = subscriptions_query.execute().data
+    report.subscriptions, report.customers = len(subscriptions), len(customers)
+
+    users = _fetch_users(
+        supabase_client, list({customer["email"] for customer in customers})
     )
-    return True
+    if since is not None and not users:
+        return report
+    products = (
+        supabase_client.table("product_to_features")
+        .select("stripe_product_id, " + ", ".join(PRODUCT_FEATURES))
+        .execute()
+    ).data
+    premium = premium_settings(subscriptions, customers, users, products)
+
+    current_query = (
+        supabase_client.table("user_settings")
+        .select("user_id, " + ", ".join(PRODUCT_FEATURES))
+        .eq("is_premium", True)
+    )
+    if since is not None:
+        current_query = current_query.in_("user_id", [user["id"] for user in users])
+    current = current_query.execute().data
+
+    to_upsert, to_delete = settings_changes(premium, current)
+    if to_upsert:
+        for settings in to_upsert:
+            settings["last_stripe_check"] = now.isoformat()
+        supabase_client.table("user_settings").upsert(to_upsert).execute()
+        report.upserted = len(to_upsert)
+    if to_delete:
+        report.deleted = (
+            supabase_client.rpc(
+                "delete_premium_settings", {"user_ids": to_delete}
+            ).execute()
+        ).data
+    return report
+
+
+# TODO: Remove all this code and use Stripe Webhooks
+def check_is_premium(supabase_client: Client) -> PremiumCheckReport | None:
+    if os.getenv("DEACTIVATE_STRIPE") == "true":
+        logger.info("Stripe deactivated, skipping check for premium users")
+        return None
+
+    start = time.perf_counter()
+    now = datetime.now(timezone.utc)
+    try:
+        watermark, last_full_sweep = _load_state(supabase_client)
+        full_sweep = (
+            watermark is None
+            or last_full_sweep is None
+            or now - last_full_sweep >= FULL_SWEEP_INTERVAL
+        )
+        since = None if full_sweep else watermark - WATERMARK_OVERLAP  # type: ignore
+        report = reconcile_premium_users(supabase_client, now, since)
+        _save_state(supabase_client, now, now if full_sweep else None)
+    except APIError as e:
+        # Watermarks are left as is, the next run covers this one
+        logger.error(f"Error checking premium users: {e}")
+        return None
+
+    report.duration_seconds = time.perf_counter() - start
+    logger.info(f"Checked premium users, {report}")
+    return report
@@ -3,40 +3,67 @@ import time
 from contextlib import contextmanager
 from pathlib import Path
 from tempfile import NamedTemporaryFile
-from typing import Any
+from typing import Any, Iterable, Iterator
 from uuid import UUID
 
+import httpx
 from quivr_api.logger import get_logger
 from quivr_core.files.file import FileExtension, QuivrFile
 
 from quivr_worker.utils.utils import get_tmp_name
+from supabase import Client
 
 logger = get_logger("celery_worker")
 
 
+# Storage objects are downloaded and hashed by chunks of this size
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+
 def compute_sha1(content: bytes) -> str:
     m = hashlib.sha1()
     m.update(content)
     return m.hexdigest()
 
 
+def stream_storage_file(
+    supabase_client: Client,
+    file_name: str,
+    bucket_name: str = "quivr",
+    chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """Download a storage object by chunks instead of loading it in memory."""
+    signed_url = supabase_client.storage.from_(bucket_name).create_signed_url(
+        file_name, expires_in=60
+    )["signedURL"]
+    with httpx.stream("GET", signed_url, timeout=httpx.Timeout(30, read=300)) as resp:
+        resp.raise_for_status()
+        yield from resp.iter_bytes(chunk_size)
+
+
 @contextmanager
-def build_file(
-    file_data: bytes,
+def build_file_from_stream(
+    chunks: Iterable[bytes],
     knowledge_id: UUID,
     file_name: str,
     original_file_name: str | None = None,
 ):
+    """
+    Write the chunks to a temporary file, computing its size and sha1 on the way.
+    Memory usage only depends on the chunk size, not on the size of the file.
+    """
+    tmp_name, base_file_name, file_extension = get_tmp_name(file_name)
+    tmp_file = NamedTemporaryFile(
+        suffix="_" + tmp_name,  # pyright: ignore reportPrivateUsage=none
+    )
     try:
-        # TODO(@aminediro) : Maybe use fsspec file to be agnostic to where files are stored :?
-        # We are reading the whole file to memory, which doesn't scale
-        tmp_name, base_file_name, file_extension = get_tmp_name(file_name)
-        tmp_file = NamedTemporaryFile(
-            suffix="_" + tmp_name,  # pyright: ignore reportPrivateUsage=none
-        )
-        tmp_file.write(file_data)
+        sha1 = hashlib.sha1()
+        file_size = 0
+        for chunk in chunks:
+            tmp_file.write(chunk)
+            sha1.update(chunk)
+            file_size += len(chunk)
         tmp_file.flush()
-        file_sha1 = compute_sha1(file_data)
 
         file_instance = File(
             knowledge_id=knowledge_id,
@@ -45,16 +72,28 @@ def build_file(
                 original_file_name if original_file_name else base_file_name
             ),
             tmp_file_path=Path(tmp_file.name),
-            file_size=len(file_data),
+            file_size=file_size,
             file_extension=file_extension,
-            file_sha1=file_sha1,
+            file_sha1=sha1.hexdigest(),
         )
         yield file_instance
     finally:
-        # Code to release resource, e.g.:
         tmp_file.close()
 
 
+@contextmanager
+def build_file(
+    file_data: bytes,
+    knowledge_id: UUID,
+    file_name: str,
+    original_file_name: str | None = None,
+):
+    with build_file_from_stream(
+        [file_data], knowledge_id, file_name, original_file_name
+    ) as file_instance:
+        yield file_instance
+
+
 class File:
     __slots__ = [
         "id",
@@ -6,7 +6,7 @@ from quivr_api.modules.knowledge.entity.knowledge import KnowledgeUpdate
 from quivr_api.modules.knowledge.service.knowledge_service import KnowledgeService
 from quivr_api.modules.vector.service.vector_service import VectorService
 
-from quivr_worker.files import build_file
+from quivr_worker.files import build_file_from_stream, stream_storage_file
 from quivr_worker.process.process_file import process_file
 from supabase import Client
 
@@ -34,13 +34,15 @@ async def process_uploaded_file(
         )
         raise ValueError("unknown brain")
     assert brain
-    file_data = supabase_client.storage.from_(bucket_name).download(file_name)
+    file_chunks = stream_storage_file(supabase_client, file_name, bucket_name)
     # TODO: Have the whole logic on do we process file or not
     # Don't process a file that already exists (file_sha1 in the table with STATUS=UPLOADED)
     #
     # - Check on file_sha1 and status
     # If we have some knowledge with error
-    with build_file(file_data, knowledge_id, file_name) as file_instance:
+    with build_file_from_stream(
+        file_chunks, knowledge_id, file_name
+    ) as file_instance:
         knowledge = await knowledge_service.get_knowledge(knowledge_id=knowledge_id)
         await knowledge_service.update_knowledge(
             knowledge,
@@ -1,3 +1,3 @@
-from .process_active_syncs import process_all_active_syncs
+from .process_active_syncs import claim_due_syncs, process_active_sync
 
-__all__ = ["process_all_active_syncs"]
+__all__ = ["claim_due_syncs", "process_active_sync"]
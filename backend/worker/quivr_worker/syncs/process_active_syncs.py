@@ -1,13 +1,15 @@
+import time
 from datetime import datetime, timedelta
 from uuid import UUID
 
 from notion_client import Client
 from quivr_api.celery_config import celery
 from quivr_api.logger import get_logger
+from quivr_api.models.settings import SyncSchedulerSettings
 from quivr_api.modules.notification.service.notification_service import (
     NotificationService,
 )
-from quivr_api.modules.sync.entity.sync_models import SyncsActive
+from quivr_api.modules.sync.entity.sync_models import SyncClaim, SyncsActive
 from quivr_api.modules.sync.repository.sync_repository import NotionRepository
 from quivr_api.modules.sync.service.sync_notion import (
     SyncNotionService,
@@ -58,40 +60,71 @@ async def process_sync(
             raise e
 
 
-async def process_all_active_syncs(sync_services: SyncServices):
-    async with build_syncs_utils(sync_services) as mapping_sync_utils:
-        await _process_all_active_syncs(
-            sync_active_service=sync_services.sync_active_service,
-            sync_user_service=sync_services.sync_user_service,
-            mapping_syncs_utils=mapping_sync_utils,
-            notification_service=sync_services.notification_service,
+def claim_due_syncs(
+    sync_active_service: SyncService, scheduler_settings: SyncSchedulerSettings
+) -> list[SyncClaim]:
+    """
+    Lease the due syncs, at most `sync_max_running` running at once across workers.
+    A lease is released when its sync finishes, or expires if the worker dies.
+    """
+    claims = sync_active_service.claim_due_syncs(
+        max_running=scheduler_settings.sync_max_running,
+        lease_seconds=scheduler_settings.sync_lease_seconds,
+    )
+    for claim in claims:
+        logger.info(f"Claimed sync {claim.sync_id}, due for {claim.lag_seconds:.0f}s")
+    return claims
+
+
+async def process_active_sync(
+    sync_id: int,
+    services: SyncServices,
+    lag_seconds: float = 0,
+    claimed_at: float | None = None,
+):
+    """Run one claimed periodic sync and release its lease."""
+    queued_seconds = time.time() - claimed_at if claimed_at else 0
+    start = time.perf_counter()
+    try:
+        sync = services.sync_active_service.get_sync_active(sync_id)
+        if sync is None:
+            logger.warning(f"Active sync {sync_id} was deleted before it ran")
+            return
+        async with build_syncs_utils(services) as mapping_syncs_utils:
+            await _process_active_sync(
+                sync=sync,
+                sync_user_service=services.sync_user_service,
+                mapping_syncs_utils=mapping_syncs_utils,
+                notification_service=services.notification_service,
+            )
+    finally:
+        services.sync_active_service.release_sync_lease(sync_id)
+        logger.info(
+            f"Sync {sync_id} metrics: lag={lag_seconds:.0f}s queued={queued_seconds:.1f}s "
+            f"duration={time.perf_counter() - start:.1f}s"
         )
 
 
-async def _process_all_active_syncs(
-    sync_active_service: SyncService,
+async def _process_active_sync(
+    sync: SyncsActive,
     sync_user_service: SyncUserService,
     mapping_syncs_utils: dict[str, SyncUtils],
     notification_service: NotificationService,
 ):
-    active_syncs = await sync_active_service.get_syncs_active_in_interval()
-    logger.debug(f"Found active syncs: {active_syncs}")
-    for sync in active_syncs:
-        try:
-            user_sync = sync_user_service.get_sync_user_by_id(sync.syncs_user_id)
-            # TODO: this should be global
-            # NOTE: Remove the global notification
-            notification_service.remove_notification_by_id(sync.notification_id)
-            assert user_sync, f"No user sync found for active sync: {sync}"
-            sync_util = mapping_syncs_utils[user_sync.provider.lower()]
-            await sync_util.sync(sync_active=sync, user_sync=user_sync)
-        except KeyError as e:
-            logger.error(
-                f"Provider not supported: {e}",
-            )
-        except Exception as e:
-            logger.error(f"Error syncing: {e}")
-            continue
+    try:
+        user_sync = sync_user_service.get_sync_user_by_id(sync.syncs_user_id)
+        # TODO: this should be global
+        # NOTE: Remove the global notification
+        notification_service.remove_notification_by_id(sync.notification_id)
+        assert user_sync, f"No user sync found for active sync: {sync}"
+        sync_util = mapping_syncs_utils[user_sync.provider.lower()]
+        await sync_util.sync(sync_active=sync, user_sync=user_sync)
+    except KeyError as e:
+        logger.error(
+            f"Provider not supported: {e}",
+        )
+    except Exception as e:
+        logger.error(f"Error syncing {sync.id}: {e}")
 
 
 async def process_notion_sync(
@@ -71,7 +71,10 @@ async def build_syncs_utils(
                     "notion",
                     NotionSync(notion_service=notion_service),
                 ),
-                ("moodle", MoodleSync()),
+                (
+                    "moodle",
+                    MoodleSync(sync_user_service=deps.sync_user_service),
+                ),
             ]:
                 provider_sync_util = SyncUtils(
                     sync_user_service=deps.sync_user_service,
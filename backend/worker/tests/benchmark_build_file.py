@@ -0,0 +1,70 @@
+"""
+Memory benchmark of build_file (whole object in memory) against
+build_file_from_stream (object written and hashed by chunks).
+
+Peak memory is measured with tracemalloc while materializing files of each size.
+The in-memory path is skipped above --max-in-memory MB.
+
+    cd backend/worker && python -m tests.benchmark_build_file --sizes 10 500 2048
+"""
+
+import argparse
+import os
+import time
+import tracemalloc
+from typing import Callable, Iterator
+from uuid import uuid4
+
+from quivr_worker.files import DOWNLOAD_CHUNK_SIZE, build_file, build_file_from_stream
+
+MB = 1024 * 1024
+
+
+def _chunks(size: int) -> Iterator[bytes]:
+    # Simulates the storage download, one network chunk at a time
+    block = os.urandom(DOWNLOAD_CHUNK_SIZE)
+    for offset in range(0, size, DOWNLOAD_CHUNK_SIZE):
+        yield block[: min(DOWNLOAD_CHUNK_SIZE, size - offset)]
+
+
+def _in_memory(size: int) -> None:
+    file_data = b"".join(_chunks(size))
+    with build_file(file_data, uuid4(), "brain/file.pdf") as file:
+        assert file.file_size == size
+
+
+def _streaming(size: int) -> None:
+    with build_file_from_stream(_chunks(size), uuid4(), "brain/file.pdf") as file:
+        assert file.file_size == size
+
+
+def _measure(fn: Callable[[int], None], size: int) -> tuple[float, float]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn(size)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / MB, elapsed
+
+
+def main(sizes: list[int], max_in_memory: int) -> None:
+    print(f"{'size':>8} | {'in memory peak':>15} | {'streaming peak':>15} | streaming time")
+    for size_mb in sizes:
+        size = size_mb * MB
+        in_memory = "skipped"
+        if size_mb <= max_in_memory:
+            peak, _ = _measure(_in_memory, size)
+            in_memory = f"{peak:.1f} MB"
+        peak, elapsed = _measure(_streaming, size)
+        print(
+            f"{size_mb:>5} MB | {in_memory:>15} | {peak:>12.1f} MB | {elapsed:.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 500, 2048])
+    parser.add_argument("--max-in-memory", type=int, default=500)
+    args = parser.parse_args()
+    main(args.sizes, args.max_in_memory)
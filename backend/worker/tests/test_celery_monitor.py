@@ -0,0 +1,76 @@
+from uuid import uuid4
+
+import pytest
+from quivr_core.models import KnowledgeStatus
+from quivr_worker import celery_monitor
+from quivr_worker.celery_monitor import (
+    EventJournal,
+    TaskEvent,
+    TaskIdentifier,
+    TaskStatus,
+    apply_events,
+)
+
+
+def _event(status: TaskStatus, knowledge_id=None, notification_id=None) -> TaskEvent:
+    return TaskEvent(
+        task_id=str(uuid4()),
+        brain_id=uuid4(),
+        task_name=TaskIdentifier.PROCESS_FILE_TASK,
+        notification_id=str(notification_id or uuid4()),
+        knowledge_id=knowledge_id or uuid4(),
+        status=status,
+    )
+
+
+def test_journal_replays_uncommitted_events(tmp_path):
+    journal = EventJournal(tmp_path / "journal.jsonl")
+    events = [_event(TaskStatus.SUCCESS), _event(TaskStatus.FAILED)]
+    for event in events:
+        journal.append(event)
+
+    journal.commit(1)
+    # A restarted notifier gets back the event that wasn't applied
+    [pending] = EventJournal(tmp_path / "journal.jsonl").pending()
+    assert pending.task_id == events[1].task_id
+    assert pending.status == TaskStatus.FAILED
+    assert pending.knowledge_id == str(events[1].knowledge_id)
+
+
+class RecordingKnowledgeService:
+    def __init__(self):
+        self.updates = []
+
+    async def update_status_knowledges(self, knowledge_ids, status):
+        if knowledge_ids:
+            self.updates.append((knowledge_ids, status))
+
+
+class RecordingNotificationService:
+    def __init__(self):
+        self.updates = []
+
+    def update_notifications_by_ids(self, notification_ids, notification):
+        self.updates.append((notification_ids, notification.status))
+
+
+@pytest.mark.asyncio
+async def test_apply_events_in_bulk(monkeypatch):
+    notification_service = RecordingNotificationService()
+    monkeypatch.setattr(celery_monitor, "notification_service", notification_service)
+    knowledge_service = RecordingKnowledgeService()
+
+    retried_id, retried_notification = uuid4(), uuid4()
+    events = [
+        _event(TaskStatus.SUCCESS),
+        _event(TaskStatus.FAILED, retried_id, retried_notification),
+        _event(TaskStatus.SUCCESS),
+        # The same file, retried and succeeded: its last event wins
+        _event(TaskStatus.SUCCESS, retried_id, retried_notification),
+    ]
+    await apply_events(events, knowledge_service, None)  # type: ignore
+
+    assert len(notification_service.updates) == 1
+    assert len(notification_service.updates[0][0]) == 3
+    uploaded = [events[0].knowledge_id, events[2].knowledge_id, retried_id]
+    assert knowledge_service.updates == [(uploaded, KnowledgeStatus.UPLOADED)]
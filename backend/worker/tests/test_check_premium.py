@@ -0,0 +1,65 @@
+from uuid import uuid4
+
+from quivr_worker.check_premium import premium_settings, settings_changes
+
+PRO = {
+    "stripe_product_id": "prod_pro",
+    "max_brains": 20,
+    "max_brain_size": 100_000_000,
+    "monthly_chat_credit": 1000,
+    "api_access": True,
+}
+
+
+def subscription(id: str, customer: str, status: str = "active"):
+    return {
+        "id": id,
+        "customer": customer,
+        "attrs": {
+            "status": status,
+            "items": {"data": [{"plan": {"product": "prod_pro"}}]},
+        },
+    }
+
+
+def test_premium_settings_and_changes():
+    alice, bob, carol, dave = (str(uuid4()) for _ in range(4))
+    customers = [
+        {"id": "cus_alice", "email": "alice@example.com"},
+        {"id": "cus_alice_2", "email": "alice@example.com"},
+        {"id": "cus_bob", "email": "bob@example.com"},
+        {"id": "cus_carol", "email": "carol@example.com"},
+    ]
+    users = [
+        {"id": alice, "email": "alice@example.com"},
+        {"id": bob, "email": "bob@example.com"},
+        {"id": carol, "email": "carol@example.com"},
+    ]
+    subscriptions = [
+        subscription("sub_1", "cus_alice", status="canceled"),
+        subscription("sub_2", "cus_alice_2"),
+        subscription("sub_3", "cus_bob", status="trialing"),
+        subscription("sub_4", "cus_carol", status="past_due"),
+        subscription("sub_5", "cus_unknown"),
+    ]
+
+    premium = premium_settings(subscriptions, customers, users, [PRO])
+    assert set(premium) == {alice, bob}
+    assert premium[alice]["max_brains"] == 20 and premium[alice]["is_premium"]
+
+    features = {k: v for k, v in PRO.items() if k != "stripe_product_id"}
+    current = [
+        # Up to date, not rewritten
+        {"user_id": alice, **features},
+        # Lost the subscription
+        {"user_id": carol, **features},
+        {"user_id": dave, **features},
+    ]
+    to_upsert, to_delete = settings_changes(premium, current)
+    assert [row["user_id"] for row in to_upsert] == [bob]
+    assert sorted(to_delete) == sorted([carol, dave])
+
+    # Product features changed: premium users are rewritten
+    current[0]["max_brains"] = 10
+    to_upsert, _ = settings_changes(premium, current)
+    assert {row["user_id"] for row in to_upsert} == {alice, bob}
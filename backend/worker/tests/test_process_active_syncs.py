@@ -0,0 +1,69 @@
+import time
+
+import pytest
+from quivr_api.models.settings import SyncSchedulerSettings
+from quivr_api.modules.sync.entity.sync_models import SyncClaim
+from quivr_worker.syncs.process_active_syncs import (
+    claim_due_syncs,
+    process_active_sync,
+)
+from quivr_worker.syncs.utils import SyncServices
+
+
+class FakeSyncActiveService:
+    def __init__(self, due: list[int]):
+        self.due = due
+        self.leases: set[int] = set()
+        self.released: list[int] = []
+
+    def claim_due_syncs(self, max_running: int, lease_seconds: int):
+        free = [id for id in self.due if id not in self.leases]
+        claimed = free[: max(max_running - len(self.leases), 0)]
+        self.leases.update(claimed)
+        return [SyncClaim(sync_id=id, lag_seconds=60) for id in claimed]
+
+    def get_sync_active(self, sync_active_id: int):
+        return None
+
+    def release_sync_lease(self, sync_active_id: int):
+        self.leases.discard(sync_active_id)
+        self.released.append(sync_active_id)
+
+
+def _services(sync_active_service) -> SyncServices:
+    return SyncServices(
+        async_engine=None,  # type: ignore
+        sync_active_service=sync_active_service,
+        sync_user_service=None,  # type: ignore
+        sync_files_repo_service=None,  # type: ignore
+        notification_service=None,  # type: ignore
+        brain_vectors=None,  # type: ignore
+        storage=None,  # type: ignore
+    )
+
+
+def test_claim_due_syncs_bounded():
+    service = FakeSyncActiveService(due=[1, 2, 3, 4, 5])
+    scheduler_settings = SyncSchedulerSettings(sync_max_running=2)
+
+    first = claim_due_syncs(service, scheduler_settings)  # type: ignore
+    assert [claim.sync_id for claim in first] == [1, 2]
+    # Running syncs keep their lease: nothing is claimed twice or above the bound
+    assert claim_due_syncs(service, scheduler_settings) == []  # type: ignore
+
+
+@pytest.mark.asyncio
+async def test_process_active_sync_releases_lease():
+    service = FakeSyncActiveService(due=[1, 2])
+    scheduler_settings = SyncSchedulerSettings(sync_max_running=1)
+    [claim] = claim_due_syncs(service, scheduler_settings)  # type: ignore
+
+    await process_active_sync(
+        claim.sync_id,
+        _services(service),
+        lag_seconds=claim.lag_seconds,
+        claimed_at=time.time(),
+    )
+
+    assert service.released == [1]
+    assert service.leases == set()
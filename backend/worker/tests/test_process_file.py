@@ -6,7 +6,7 @@ from uuid import uuid4
 import pytest
 from quivr_api.modules.brain.entity.brain_entity import BrainEntity, BrainType
 from quivr_core.files.file import FileExtension
-from quivr_worker.files import File, build_file
+from quivr_worker.files import File, build_file, build_file_from_stream, compute_sha1
 from quivr_worker.parsers.crawler import URL, slugify
 from quivr_worker.process.process_file import parse_file
 
@@ -24,6 +24,20 @@ def test_build_file():
         assert file.file_extension == FileExtension.txt
 
 
+def test_build_file_from_stream():
+    chunks = [os.urandom(1000) for _ in range(5)]
+    knowledge_id = uuid4()
+
+    with build_file_from_stream(
+        iter(chunks), knowledge_id, f"{uuid4()}/test_file.pdf"
+    ) as file:
+        assert file.file_size == 5000
+        assert file.file_sha1 == compute_sha1(b"".join(chunks))
+        assert file.file_extension == FileExtension.pdf
+        assert file.tmp_file_path.read_bytes() == b"".join(chunks)
+    assert not file.tmp_file_path.exists()
+
+
 def test_build_url():
     random_bytes = os.urandom(128)
     crawl_website = URL(url="http://url.url")